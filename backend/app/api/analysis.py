@@ -3,7 +3,7 @@ API endpoints for the refactored video analysis flow.
 Implements UUID-based two-step upload process.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Dict, Any, Optional
@@ -16,7 +16,7 @@ from app.models.video_analysis import VideoAnalysis, AnalysisStatus
 from app.middleware.auth_middleware import get_current_user
 from app.config.api import API_VERSION_PREFIX
 from app.services.storage_service import get_storage_service
-from app.services.video_analysis_service import AnalysisOrchestrator
+from app.services.video_analysis_service import get_analysis_orchestrator
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +25,6 @@ router = APIRouter(
     tags=["analysis"]
 )
 
-# Initialize the orchestrator
-orchestrator = AnalysisOrchestrator()
-
 
 @router.post("/create")
 async def create_analysis(
@@ -70,7 +67,6 @@ async def create_analysis(
 @router.put("/{uuid}/video")
 async def upload_video_to_analysis(
     uuid: str,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     # current_user: User = Depends(get_current_user),  # TODO: Re-enable auth
     db: AsyncSession = Depends(get_db_session)
@@ -147,12 +143,18 @@ async def upload_video_to_analysis(
         # Get status value before exiting session context
         status_value = analysis.status.value
         
-        # Spawn background task for analysis
+        # Queue analysis for the background worker pool
         logger.info(f"Queuing background analysis for UUID: {analysis_uuid}")
-        background_tasks.add_task(
-            orchestrator.analyze_video_background,
-            str(analysis_uuid)
-        )
+        if not await get_analysis_orchestrator().start_background_analysis(str(analysis_uuid)):
+            # Hand the entry back so the client's retry can upload again
+            analysis.originalVideoURL = None
+            analysis.status = AnalysisStatus.PENDING
+            await db.commit()
+            await storage_service.delete_file(blob_name)
+            raise HTTPException(
+                status_code=503,
+                detail="Analysis queue is full, please try again later"
+            )
         
         return {
             "success": True,
@@ -7,7 +7,7 @@ from app.config.api import API_VERSION_PREFIX
 
 
 from app.database.utils import get_db_session
-from app.core.providers.vision_gemini import GeminiVisionProvider
+from app.services.video_analysis_service import get_clean_video_analysis_service
 
 
 router = APIRouter(prefix=API_VERSION_PREFIX, tags=["system"])
@@ -52,7 +52,7 @@ async def full_health(session: AsyncSession = Depends(get_db_session), openai_ap
     # Gemini health check
     gemini_health = {"status": "unhealthy"}
     try:
-        gemini_provider = GeminiVisionProvider()
+        gemini_provider = get_clean_video_analysis_service().vision_provider
         if await gemini_provider.is_healthy():
             gemini_health["status"] = "healthy"
     except Exception as e:
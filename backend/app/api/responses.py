@@ -0,0 +1,14 @@
+"""
+Shared response classes for the FutureGolf API.
+"""
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class APIJSONResponse(JSONResponse):
+    """JSON response encoded with orjson instead of the stdlib json module."""
+
+    def render(self, content) -> bytes:
+        # Non-str keys are stringified, matching the stdlib encoder
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
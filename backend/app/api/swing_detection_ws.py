@@ -19,7 +19,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.container import container, configure_container
 from app.core.interfaces import VisionModel, PromptLoader, ConfigProvider
-import app.config.swing_detection as swing_config
+from app.config.swing_detection import get_swing_settings
 from app.config.api import API_VERSION_PREFIX
 
 router = APIRouter(prefix=f"{API_VERSION_PREFIX}/ws", tags=["swing_detection"])
@@ -28,6 +28,32 @@ router = APIRouter(prefix=f"{API_VERSION_PREFIX}/ws", tags=["swing_detection"])
 logger = logging.getLogger(__name__)
 
 
+def frame_dhash(image_bytes: bytes) -> Optional[int]:
+    """64-bit difference hash of an encoded frame, or None if it can't be decoded"""
+    try:
+        with Image.open(BytesIO(image_bytes)) as image:
+            pixels = list(image.convert("L").resize((9, 8), Image.Resampling.BILINEAR).getdata())
+    except Exception:
+        return None
+    
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            bits = (bits << 1) | (left > pixels[row * 9 + col + 1])
+    return bits
+
+
+def _cached_frame_hash(frame: Dict[str, Any]) -> Optional[int]:
+    """dHash of a buffered frame, computed on first use and kept on the frame"""
+    if "hash" not in frame:
+        try:
+            frame["hash"] = frame_dhash(base64.b64decode(frame["image"]))
+        except ValueError:
+            frame["hash"] = None
+    return frame["hash"]
+
+
 class SwingDetectionSession:
     """Manages a single swing detection session"""
     
@@ -44,6 +70,9 @@ class SwingDetectionSession:
         self.analysis_start_time: Optional[float] = None
         self.analysis_task: Optional[asyncio.Task] = None
         self.analysis_result: Optional[Dict[str, Any]] = None
+        # Newest frame timestamp seen by the last analysis, so the motion check only
+        # looks at frames that arrived since
+        self.last_analyzed_timestamp: Optional[float] = None
         
         # Get dependencies from container
         self.vision_model = container.get(VisionModel)
@@ -109,12 +138,39 @@ class SwingDetectionSession:
             "context_size": context_size_kb
         }
     
+    def frames_since_last_analysis(self, frames: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Frames newer than the last analysis, led by the last frame it already saw"""
+        if self.last_analyzed_timestamp is None:
+            return frames
+        
+        start = 0
+        for index, frame in enumerate(frames):
+            if frame["timestamp"] > self.last_analyzed_timestamp:
+                break
+            start = index
+        else:
+            return frames[-1:]
+        return frames[start:]
+    
+    def is_motionless(self, frames: List[Dict[str, Any]]) -> bool:
+        """Check whether every consecutive pair of frames looks the same (decodes frames; run off the event loop)"""
+        threshold = self.config.get("MOTION_HASH_THRESHOLD", 3)
+        if threshold <= 0 or len(frames) < 2:
+            return False
+        
+        hashes = [_cached_frame_hash(frame) for frame in frames]
+        if None in hashes:
+            return False
+        
+        return all(bin(a ^ b).count("1") < threshold for a, b in zip(hashes, hashes[1:]))
+    
     def clear_context(self):
         """Clear memory and image buffer after swing detection"""
         self.image_buffer = []
         self.first_timestamp = None
         self.last_timestamp = None
         self.conversation_history = []
+        self.last_analyzed_timestamp = None
     
     async def analyze_for_swing(self) -> Dict[str, Any]:
         """Analyze image sequence for golf swing using vision model"""
@@ -129,22 +185,30 @@ class SwingDetectionSession:
                 "reason": "No images in buffer"
             }
         
+        # Nothing moved since the last analysis, so there is no new swing to find; skip the
+        # LLM call. Earlier motion (e.g. walking into frame) stays in the buffer, so only the
+        # new frames are compared.
+        recent_frames = self.frames_since_last_analysis(snapshot_buffer)
+        self.last_analyzed_timestamp = snapshot_buffer[-1]["timestamp"]
+        if await asyncio.to_thread(self.is_motionless, recent_frames):
+            logger.debug(f"Skipping analysis: {len(recent_frames)} new frames are motionless")
+            return {
+                "swing_detected": False,
+                "confidence": 0.0,
+                "skipped": True,
+                "reason": "No motion between frames"
+            }
+        
         try:
-            # Prepare PIL images from snapshot
-            pil_images = []
-            
-            for img_data in snapshot_buffer:
-                # Images are already resized and compressed by client
-                # Just decode for analysis
-                image_bytes = base64.b64decode(img_data["image"])
-                image = Image.open(BytesIO(image_bytes))
-                pil_images.append(image)
+            # Images are already resized and compressed by client, so the
+            # encoded bytes go to the model as they are
+            frames = [base64.b64decode(img_data["image"]) for img_data in snapshot_buffer]
             
             # Time the LLM call
             start_time = datetime.now()
             
             # Use vision model to analyze
-            result = await self.vision_model.analyze_images(pil_images, self.swing_prompt)
+            result = await self.vision_model.analyze_images(frames, self.swing_prompt)
             
             # Calculate response time
             response_time = (datetime.now() - start_time).total_seconds()
@@ -249,7 +313,7 @@ async def detect_golf_swing_websocket(websocket: WebSocket):
     
     # Configure container on first use (lazy initialization)
     if not container.has(ConfigProvider):
-        configure_container(swing_config)
+        configure_container(get_swing_settings())
     
     # Accept connection and create session
     await websocket.accept()
@@ -6,7 +6,11 @@ Provides streaming audio generation for real-time playback
 from fastapi import APIRouter, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Iterator
+from typing import Optional, Iterator, Tuple
+from pathlib import Path
+import asyncio
+import hashlib
+import tempfile
 import openai
 import os
 import io
@@ -34,7 +38,9 @@ try:
         logger.warning("OPENAI_API_KEY not found in environment variables")
         client = None
     else:
-        client = openai.OpenAI(api_key=api_key)
+        # One async client for the process: its connection pool keeps the TLS
+        # session to OpenAI alive between requests and calls don't block the loop
+        client = openai.AsyncOpenAI(api_key=api_key)
 except Exception as e:
     logger.error(f"Failed to initialize OpenAI client: {e}")
     client = None
@@ -45,11 +51,135 @@ class TTSRequest(BaseModel):
     voice: Optional[str] = "alloy"  # alloy, echo, fable, onyx, nova, shimmer
     model: Optional[str] = "tts-1-hd"  # tts-1 or tts-1-hd
     speed: Optional[float] = 1.0    # 0.25 to 4.0
-    response_format: Optional[str] = "mp3"  # mp3, opus, aac, flac
+    response_format: Optional[str] = "mp3"  # mp3, opus, aac, flac, wav, pcm
 
 # Supported voices
 AVAILABLE_VOICES = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
 
+# Content type for each supported response format. wav and pcm are uncompressed,
+# so players can start without a decode step; pcm is raw 24kHz 16-bit mono.
+CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "opus": "audio/opus",
+    "aac": "audio/aac",
+    "flac": "audio/flac",
+    "wav": "audio/wav",
+    "pcm": "audio/pcm"
+}
+
+# Bytes relayed to the client per chunk while streaming
+STREAM_CHUNK_SIZE = 4096
+
+# On-disk cache of generated audio; identical requests skip the OpenAI call
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "futuregolf_tts")))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(40 * 1024 * 1024)))
+
+
+def _cache_path(model: str, voice: str, speed: float, response_format: str, text: str) -> Path:
+    """Cache file for a request, keyed by everything that affects the audio"""
+    key = hashlib.sha256(f"{model}|{voice}|{speed}|{response_format}|{text}".encode()).hexdigest()
+    return TTS_CACHE_DIR / f"{key}.{response_format}"
+
+
+def _read_cached_audio(path: Path) -> Optional[bytes]:
+    """Return cached audio and mark it recently used, or None on a miss"""
+    try:
+        audio_data = path.read_bytes()
+        os.utime(path)
+        return audio_data
+    except OSError:
+        return None
+
+
+def _write_cached_audio(path: Path, audio_data: bytes):
+    """Store audio in the cache, evicting least recently used files over the size cap"""
+    try:
+        TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # A unique temp name per writer, so concurrent requests for the same audio don't collide
+        with tempfile.NamedTemporaryFile(dir=TTS_CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            tmp.write(audio_data)
+        os.replace(tmp.name, path)
+        
+        # In-flight .tmp files belong to other writers and are not cache entries
+        entries = []
+        for entry in TTS_CACHE_DIR.iterdir():
+            if entry.suffix == ".tmp" or not entry.is_file():
+                continue
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                continue  # Evicted by a concurrent writer
+        total_bytes = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in sorted(entries, key=lambda item: item[0].st_mtime):
+            if total_bytes <= TTS_CACHE_MAX_BYTES:
+                break
+            entry.unlink(missing_ok=True)
+            total_bytes -= stat.st_size
+    except OSError as e:
+        logger.warning(f"Failed to cache TTS audio: {e}")
+
+
+def _validate_tts_request(request: TTSRequest):
+    """Reject requests the TTS service can't serve, raising HTTPException"""
+    # Check if OpenAI client is available
+    if client is None:
+        raise HTTPException(
+            status_code=503,
+            detail="TTS service unavailable. OpenAI API key not configured."
+        )
+    
+    # Validate voice
+    if request.voice not in AVAILABLE_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid voice. Available voices: {', '.join(AVAILABLE_VOICES)}"
+        )
+    
+    # Validate speed
+    if not 0.25 <= request.speed <= 4.0:
+        raise HTTPException(
+            status_code=400,
+            detail="Speed must be between 0.25 and 4.0"
+        )
+    
+    # Validate text length
+    if len(request.text) > 4096:
+        raise HTTPException(
+            status_code=400,
+            detail="Text must be 4096 characters or less"
+        )
+    
+    # Validate response format; it also names the cache file
+    if request.response_format not in CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid response format. Supported formats: {', '.join(CONTENT_TYPES)}"
+        )
+
+
+async def synthesize_speech(model: str, voice: str, text: str, speed: float, response_format: str) -> Tuple[bytes, bool]:
+    """
+    Generate speech audio, serving repeated requests from the disk cache
+    
+    Returns:
+        Tuple of (audio bytes, whether it came from the cache)
+    """
+    path = _cache_path(model, voice, speed, response_format, text)
+    audio_data = await asyncio.to_thread(_read_cached_audio, path)
+    if audio_data is not None:
+        return audio_data, True
+    
+    response = await client.audio.speech.create(
+        model=model,
+        voice=voice,
+        input=text,
+        speed=speed,
+        response_format=response_format
+    )
+    audio_data = response.content
+    await asyncio.to_thread(_write_cached_audio, path, audio_data)
+    return audio_data, False
+
 @router.post("/stream")
 async def stream_tts(request: TTSRequest):
     """
@@ -59,62 +189,33 @@ async def stream_tts(request: TTSRequest):
     as audio data that can be played in real-time.
     """
     try:
-        # Check if OpenAI client is available
-        if client is None:
-            raise HTTPException(
-                status_code=503,
-                detail="TTS service unavailable. OpenAI API key not configured."
-            )
-        
-        # Validate voice
-        if request.voice not in AVAILABLE_VOICES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid voice. Available voices: {', '.join(AVAILABLE_VOICES)}"
-            )
-        
-        # Validate speed
-        if not 0.25 <= request.speed <= 4.0:
-            raise HTTPException(
-                status_code=400,
-                detail="Speed must be between 0.25 and 4.0"
-            )
-        
-        # Validate text length
-        if len(request.text) > 4096:
-            raise HTTPException(
-                status_code=400,
-                detail="Text must be 4096 characters or less"
-            )
+        _validate_tts_request(request)
         
         logger.info(f"Generating TTS for {len(request.text)} characters with voice '{request.voice}'")
         
-        # Generate speech using OpenAI
-        response = client.audio.speech.create(
+        # Open a streaming response so audio is relayed as OpenAI produces it,
+        # rather than after the whole file has been downloaded. The request is
+        # made up front so API errors still surface as HTTP errors.
+        upstream = client.audio.speech.with_streaming_response.create(
             model=request.model,
             voice=request.voice,
             input=request.text,
             speed=request.speed,
             response_format=request.response_format
         )
+        response = await upstream.__aenter__()
         
         # Stream the audio data
-        def generate_audio():
-            # OpenAI returns an iterator of bytes
-            for chunk in response.iter_bytes(chunk_size=1024):
-                yield chunk
-        
-        # Set appropriate content type based on format
-        content_types = {
-            "mp3": "audio/mpeg",
-            "opus": "audio/opus",
-            "aac": "audio/aac",
-            "flac": "audio/flac"
-        }
+        async def generate_audio():
+            try:
+                async for chunk in response.iter_bytes(chunk_size=STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                await upstream.__aexit__(None, None, None)
         
         return StreamingResponse(
             generate_audio(),
-            media_type=content_types.get(request.response_format, "audio/mpeg"),
+            media_type=CONTENT_TYPES.get(request.response_format, "audio/mpeg"),
             headers={
                 "Cache-Control": "no-cache",
                 "X-Content-Type-Options": "nosniff",
@@ -123,6 +224,8 @@ async def stream_tts(request: TTSRequest):
             }
         )
         
+    except HTTPException:
+        raise
     except openai.APIError as e:
         logger.error(f"OpenAI API error: {str(e)}")
         raise HTTPException(
@@ -162,64 +265,28 @@ async def generate_tts(request: TTSRequest):
     that don't need streaming.
     """
     try:
-        # Check if OpenAI client is available
-        if client is None:
-            raise HTTPException(
-                status_code=503,
-                detail="TTS service unavailable. OpenAI API key not configured."
-            )
-        
-        # Validate inputs (same as stream endpoint)
-        if request.voice not in AVAILABLE_VOICES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid voice. Available voices: {', '.join(AVAILABLE_VOICES)}"
-            )
-        
-        if not 0.25 <= request.speed <= 4.0:
-            raise HTTPException(
-                status_code=400,
-                detail="Speed must be between 0.25 and 4.0"
-            )
-        
-        if len(request.text) > 4096:
-            raise HTTPException(
-                status_code=400,
-                detail="Text must be 4096 characters or less"
-            )
+        _validate_tts_request(request)
         
         logger.info(f"Generating complete TTS for {len(request.text)} characters")
         
         # Generate speech
-        response = client.audio.speech.create(
-            model=request.model,
-            voice=request.voice,
-            input=request.text,
-            speed=request.speed,
-            response_format=request.response_format
+        audio_data, cache_hit = await synthesize_speech(
+            request.model, request.voice, request.text, request.speed, request.response_format
         )
         
-        # Get all audio data
-        audio_data = response.content
-        
-        # Set appropriate content type
-        content_types = {
-            "mp3": "audio/mpeg",
-            "opus": "audio/opus",
-            "aac": "audio/aac",
-            "flac": "audio/flac"
-        }
-        
         return Response(
             content=audio_data,
-            media_type=content_types.get(request.response_format, "audio/mpeg"),
+            media_type=CONTENT_TYPES.get(request.response_format, "audio/mpeg"),
             headers={
                 "Content-Length": str(len(audio_data)),
                 "X-TTS-Voice": request.voice,
                 "X-TTS-Model": request.model,
+                "X-TTS-Cache": "hit" if cache_hit else "miss",
             }
         )
         
+    except HTTPException:
+        raise
     except openai.APIError as e:
         logger.error(f"OpenAI API error: {str(e)}")
         raise HTTPException(
@@ -241,43 +308,34 @@ async def generate_coaching_tts(request: TTSRequest):
     Uses optimized voice settings for clear, professional coaching delivery.
     """
     try:
-        # Check if OpenAI client is available
-        if client is None:
-            raise HTTPException(
-                status_code=503,
-                detail="TTS service unavailable. OpenAI API key not configured."
-            )
+        _validate_tts_request(request)
         
         # Override with coaching-optimized settings
         coaching_voice = "onyx"  # Deep, authoritative male voice
-        coaching_model = "tts-1-hd"  # Higher quality
+        coaching_model = "tts-1"  # Low-latency model; coaching lines are short
         coaching_speed = 1.2  # Balanced speed for energy and clarity
         
         logger.info(f"🗣️ Generating coaching TTS for text \"{request.text}\"")
         
         # Generate speech with coaching settings
-        response = client.audio.speech.create(
-            model=coaching_model,
-            voice=coaching_voice,
-            input=request.text,
-            speed=coaching_speed,
-            response_format="mp3"
+        audio_data, cache_hit = await synthesize_speech(
+            coaching_model, coaching_voice, request.text, coaching_speed, request.response_format
         )
         
-        # Get all audio data
-        audio_data = response.content
-        
         return Response(
             content=audio_data,
-            media_type="audio/mpeg",
+            media_type=CONTENT_TYPES.get(request.response_format, "audio/mpeg"),
             headers={
                 "Content-Length": str(len(audio_data)),
                 "X-TTS-Voice": coaching_voice,
                 "X-TTS-Model": coaching_model,
                 "X-TTS-Type": "coaching",
+                "X-TTS-Cache": "hit" if cache_hit else "miss",
             }
         )
         
+    except HTTPException:
+        raise
     except openai.APIError as e:
         logger.error(f"OpenAI API error in coaching TTS: {str(e)}")
         raise HTTPException(
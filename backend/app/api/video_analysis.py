@@ -66,14 +66,17 @@ async def get_video_analysis(
                 "video_id": video_id
             }
         
-        if analysis.is_completed and analysis.ai_analysis:
+        # Rows written before analysis_json became canonical only have the legacy column
+        analysis_json = analysis.analysisJSON or analysis.ai_analysis
+        
+        if analysis.is_completed and analysis_json:
             # Analysis complete - return full results (same format as analyze_video.py)
             return {
                 "success": True,
                 "analysis": {
                     "id": analysis.id,
                     "status": "completed",
-                    "ai_analysis": analysis.ai_analysis,  # Contains the full JSON from Gemini
+                    "ai_analysis": analysis_json,  # Contains the full JSON from Gemini
                     "video_duration": analysis.video_duration,
                     "analysis_confidence": analysis.analysis_confidence,
                     "created_at": analysis.created_at.isoformat(),
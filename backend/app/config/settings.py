@@ -0,0 +1,17 @@
+"""
+Process-wide environment loading.
+"""
+
+from functools import lru_cache
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def load_environment() -> bool:
+    """
+    Load variables from .env into os.environ, once per process.
+
+    Every module that needs the environment calls this at import time; only
+    the first call reads and parses the file.
+    """
+    return load_dotenv()
@@ -7,6 +7,7 @@ from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError
 from typing import Optional, Dict, Any
 import logging
+from functools import cached_property
 from urllib.parse import urlparse
 from google.auth.credentials import AnonymousCredentials
 from google.auth.api_key import Credentials as APIKeyCredentials
@@ -52,15 +53,30 @@ class StorageConfig:
         self.thumbnail_folder = "thumbnails"
         self.processed_folder = "processed"
         self.temp_folder = "temp"
+        self._folder_map = {
+            "video": self.video_folder,
+            "thumbnail": self.thumbnail_folder,
+            "processed": self.processed_folder,
+            "temp": self.temp_folder
+        }
         
         # Upload settings
         self.max_file_size = int(os.getenv("MAX_VIDEO_SIZE_MB", "500")) * 1024 * 1024  # 500MB default
         self.chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", "8192"))  # 8KB default
         self.resumable_threshold = int(os.getenv("RESUMABLE_THRESHOLD_MB", "50")) * 1024 * 1024  # 50MB
+        self.parallel_chunk_size = int(os.getenv("PARALLEL_UPLOAD_CHUNK_SIZE_MB", "8")) * 1024 * 1024  # 8MB
+        self.parallel_upload_workers = int(os.getenv("PARALLEL_UPLOAD_WORKERS", "8"))
+        self.parallel_download_threshold = int(os.getenv("PARALLEL_DOWNLOAD_THRESHOLD_MB", "16")) * 1024 * 1024  # 16MB
+        self.parallel_download_workers = int(os.getenv("PARALLEL_DOWNLOAD_WORKERS", "8"))
+        self.io_workers = int(os.getenv("GCS_IO_WORKERS", "32"))  # Threads for blocking GCS client calls
         
         # CDN settings
         self.cdn_enabled = os.getenv("GCS_CDN_ENABLED", "true").lower() == "true"
         self.cdn_base_url = os.getenv("GCS_CDN_BASE_URL", "")
+        if self.cdn_enabled and self.cdn_base_url:
+            self._public_url_base = f"{self.cdn_base_url}/"
+        else:
+            self._public_url_base = f"https://storage.googleapis.com/{self.bucket_name}/"
         
         # Security settings
         self.signed_url_expiration = int(os.getenv("SIGNED_URL_EXPIRATION_HOURS", "24"))
@@ -92,8 +108,33 @@ class StorageConfig:
             else:
                 logger.info("Using Google Cloud service account authentication")
     
+    @cached_property
+    def client(self) -> storage.Client:
+        """Google Cloud Storage client, created once per process."""
+        return self._create_storage_client()
+    
+    @cached_property
+    def bucket(self) -> storage.Bucket:
+        """The storage bucket handle, bound to the shared client."""
+        # Don't try to create the bucket automatically - it should exist
+        # This avoids permission issues during initialization
+        logger.info(f"Using bucket: {self.bucket_name}")
+        return self.client.bucket(self.bucket_name)
+    
+    def refresh_bucket(self):
+        """Drop the cached bucket handle so the next access rebuilds it."""
+        self.__dict__.pop("bucket", None)
+    
     def get_storage_client(self) -> storage.Client:
-        """Get Google Cloud Storage client."""
+        """Get the shared Google Cloud Storage client."""
+        return self.client
+    
+    def get_bucket(self) -> storage.Bucket:
+        """Get the shared storage bucket (assumes it already exists)."""
+        return self.bucket
+    
+    def _create_storage_client(self) -> storage.Client:
+        """Create a Google Cloud Storage client."""
         try:
             # Note: API Keys have limited GCS functionality. Prefer service account for full access.
             # For now, prioritize service account if available
@@ -120,17 +161,6 @@ class StorageConfig:
             logger.error(f"Failed to create storage client: {e}")
             raise
     
-    def get_bucket(self) -> storage.Bucket:
-        """Get the storage bucket (assumes it already exists)."""
-        client = self.get_storage_client()
-        bucket = client.bucket(self.bucket_name)
-        
-        # Don't try to create the bucket automatically - it should exist
-        # This avoids permission issues during initialization
-        logger.info(f"Using bucket: {self.bucket_name}")
-        
-        return bucket
-    
     def _configure_bucket_lifecycle(self, bucket: storage.Bucket):
         """Configure bucket lifecycle rules."""
         lifecycle_rules = [
@@ -156,22 +186,12 @@ class StorageConfig:
     
     def get_file_path(self, user_id: int, video_id: int, file_type: str, filename: str) -> str:
         """Generate standardized file path."""
-        folder_map = {
-            "video": self.video_folder,
-            "thumbnail": self.thumbnail_folder,
-            "processed": self.processed_folder,
-            "temp": self.temp_folder
-        }
-        
-        folder = folder_map.get(file_type, self.video_folder)
+        folder = self._folder_map.get(file_type, self.video_folder)
         return f"{folder}/user_{user_id}/video_{video_id}/{filename}"
     
     def get_public_url(self, blob_name: str) -> str:
         """Get public URL for a file."""
-        if self.cdn_enabled and self.cdn_base_url:
-            return f"{self.cdn_base_url}/{blob_name}"
-        else:
-            return f"https://storage.googleapis.com/{self.bucket_name}/{blob_name}"
+        return self._public_url_base + blob_name
     
     def is_valid_video_type(self, content_type: str) -> bool:
         """Check if content type is allowed."""
@@ -4,26 +4,47 @@ Based on AI_SWING_DETECTION.md specification
 """
 
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 
-load_dotenv()
+from app.config.settings import load_environment
 
-# LLM Configuration
-LLM_MODEL = os.getenv("SWING_DETECTION_LLM_MODEL", "gemini/gemini-1.5-flash-002")
 
-# Timing thresholds (in seconds)
-LLM_SUBMISSION_THRESHOLD = float(os.getenv("LLM_SUBMISSION_THRESHOLD", "1.0"))
+class SwingDetectionSettings:
+    """Swing detection settings resolved from the environment"""
 
-# Frame rate from iOS app (for testing)
-IOS_FRAME_INTERVAL = float(os.getenv("IOS_FRAME_INTERVAL", "0.2"))
+    def __init__(self):
+        load_environment()
 
-# Image processing settings
-IMAGE_MAX_SIZE = (128, 128)  # Target box size for resizing images (maintains aspect ratio)
-IMAGE_WEBP_QUALITY = 40  # WebP compression quality (1-100)
-IMAGE_CONVERT_BW = True
+        # LLM Configuration
+        self.LLM_MODEL = os.getenv("SWING_DETECTION_LLM_MODEL", "gemini/gemini-1.5-flash-002")
 
-# Confidence threshold for swing detection
-CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.75"))
+        # Request batching: concurrent sessions share one LLM call (1 disables batching)
+        self.VISION_BATCH_SIZE = int(os.getenv("VISION_BATCH_SIZE", "4"))
+        self.VISION_MAX_INFLIGHT_BATCHES = int(os.getenv("VISION_MAX_INFLIGHT_BATCHES", "2"))
 
-# Post-detection cooldown (seconds)
-POST_DETECTION_COOLDOWN = float(os.getenv("POST_DETECTION_COOLDOWN", "2.0"))
\ No newline at end of file
+        # Timing thresholds (in seconds)
+        self.LLM_SUBMISSION_THRESHOLD = float(os.getenv("LLM_SUBMISSION_THRESHOLD", "1.0"))
+
+        # Frame rate from iOS app (for testing)
+        self.IOS_FRAME_INTERVAL = float(os.getenv("IOS_FRAME_INTERVAL", "0.2"))
+
+        # Image processing settings
+        self.IMAGE_MAX_SIZE = (128, 128)  # Target box size for resizing images (maintains aspect ratio)
+        self.IMAGE_WEBP_QUALITY = 40  # WebP compression quality (1-100)
+        self.IMAGE_CONVERT_BW = True
+
+        # Frame sets whose consecutive frames all differ by fewer than this many
+        # difference-hash bits are treated as motionless and not sent (0 disables)
+        self.MOTION_HASH_THRESHOLD = int(os.getenv("MOTION_HASH_THRESHOLD", "3"))
+
+        # Confidence threshold for swing detection
+        self.CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.75"))
+
+        # Post-detection cooldown (seconds)
+        self.POST_DETECTION_COOLDOWN = float(os.getenv("POST_DETECTION_COOLDOWN", "2.0"))
+
+
+@lru_cache(maxsize=1)
+def get_swing_settings() -> SwingDetectionSettings:
+    """Get the swing detection settings, reading the environment only once"""
+    return SwingDetectionSettings()
@@ -6,6 +6,7 @@ import logging
 
 from app.core.interfaces import VisionModel, PromptLoader, ConfigProvider
 from app.core.providers.vision_gemini import GeminiVisionProvider
+from app.core.providers.vision_batching import BatchingVisionModel
 from app.core.providers.prompt_loader import FilePromptLoader
 from app.core.providers.config_provider import EnvironmentConfigProvider
 
@@ -65,6 +66,7 @@ def configure_container(config_module: Optional[Any] = None):
     
     # Register prompt loader
     prompt_loader = FilePromptLoader()
+    prompt_loader.preload()
     container.register(PromptLoader, prompt_loader)
     
     # Register vision model factory
@@ -83,11 +85,21 @@ def configure_container(config_module: Optional[Any] = None):
         if model_name.startswith("gemini/"):
             model_name = model_name.replace("gemini/", "")
         
-        return GeminiVisionProvider(
+        model = GeminiVisionProvider(
             model_name=model_name,
             temperature=0.1,
             max_tokens=300
         )
+        
+        batch_size = int(config.get("VISION_BATCH_SIZE", 1))
+        if batch_size > 1:
+            logger.info(f"Batching vision requests (up to {batch_size} per call)")
+            return BatchingVisionModel(
+                model,
+                max_batch_size=batch_size,
+                max_inflight_batches=int(config.get("VISION_MAX_INFLIGHT_BATCHES", 2))
+            )
+        return model
     
     container.register_factory(VisionModel, create_vision_model)
     
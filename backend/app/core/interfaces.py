@@ -1,21 +1,31 @@
 """
 Core interfaces for dependency injection
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple, Union
 from PIL import Image
 
+# A frame as a PIL image or as already-encoded image file bytes (WebP, JPEG, PNG)
+ImageInput = Union[Image.Image, bytes]
+
+
+class VisionRequest(NamedTuple):
+    """One image sequence and the prompt to analyze it with"""
+    images: List[ImageInput]
+    prompt: str
+
 
 class VisionModel(ABC):
     """Abstract base class for vision models"""
     
     @abstractmethod
-    async def analyze_images(self, images: List[Image.Image], prompt: str) -> Dict[str, Any]:
+    async def analyze_images(self, images: List[ImageInput], prompt: str) -> Dict[str, Any]:
         """
         Analyze a sequence of images with a given prompt
         
         Args:
-            images: List of PIL images to analyze
+            images: List of PIL images or encoded image bytes to analyze
             prompt: Text prompt for analysis
             
         Returns:
@@ -23,6 +33,23 @@ class VisionModel(ABC):
         """
         pass
     
+    async def analyze_image_batches(self, requests: List[VisionRequest]) -> List[Dict[str, Any]]:
+        """
+        Analyze several image sequences, each with its own prompt
+        
+        Providers that can answer multiple requests in one call should
+        override this; the default issues one analyze_images call per request.
+        
+        Args:
+            requests: Image sequences and their prompts
+            
+        Returns:
+            One result dictionary per request, in order
+        """
+        return list(await asyncio.gather(*(
+            self.analyze_images(request.images, request.prompt) for request in requests
+        )))
+    
     @abstractmethod
     def get_model_info(self) -> Dict[str, str]:
         """Get information about the model"""
@@ -3,12 +3,12 @@ Configuration provider implementation
 """
 from typing import Dict, Any
 import os
-from dotenv import load_dotenv
+from app.config.settings import load_environment
 
 from app.core.interfaces import ConfigProvider
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 
 class EnvironmentConfigProvider(ConfigProvider):
@@ -19,10 +19,12 @@ class EnvironmentConfigProvider(ConfigProvider):
         Initialize config provider
         
         Args:
-            config_module: Optional config module to load values from
+            config_module: Optional config module or settings object to load values from
         """
         self.config_module = config_module
         self._cache: Dict[str, Any] = {}
+        # Values already resolved by get(), so lookups on hot paths skip the environment
+        self._resolved: Dict[str, Any] = {}
         
         # Load config from module if provided
         if config_module:
@@ -36,22 +38,32 @@ class EnvironmentConfigProvider(ConfigProvider):
         """
         Get configuration value
         
-        First checks environment variables, then cached config values
+        First checks environment variables, then cached config values.
+        Each key is resolved once; later changes to the environment are not seen.
         """
+        if key in self._resolved:
+            return self._resolved[key]
+        
         # Check environment variable first
         env_value = os.getenv(key)
         if env_value is not None:
             # Try to parse as number
             try:
                 if '.' in env_value:
-                    return float(env_value)
-                return int(env_value)
+                    value = float(env_value)
+                else:
+                    value = int(env_value)
             except ValueError:
-                # Return as string
-                return env_value
+                # Keep as string
+                value = env_value
+        elif key in self._cache:
+            value = self._cache[key]
+        else:
+            # Don't pin the caller's default for keys that aren't configured
+            return default
         
-        # Check cache
-        return self._cache.get(key, default)
+        self._resolved[key] = value
+        return value
     
     def get_all(self) -> Dict[str, Any]:
         """Get all configuration values"""
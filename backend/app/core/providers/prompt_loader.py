@@ -1,6 +1,7 @@
 """
 File-based prompt loader implementation
 """
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 import logging
@@ -10,6 +11,13 @@ from app.core.interfaces import PromptLoader
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=64)
+def _read_prompt(prompt_file: Path) -> str:
+    """Read a prompt file; cached so each file is read from disk once"""
+    with open(prompt_file, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+
 class FilePromptLoader(PromptLoader):
     """Load prompts from text files"""
     
@@ -40,15 +48,23 @@ class FilePromptLoader(PromptLoader):
         """
         prompt_file = self.prompts_dir / f"{prompt_name}.txt"
         
-        if not prompt_file.exists():
+        try:
+            prompt = _read_prompt(prompt_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
         
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            prompt = f.read().strip()
-        
         logger.debug(f"Loaded prompt '{prompt_name}' from {prompt_file}")
         return prompt
     
+    def preload(self):
+        """Read every available prompt into the cache"""
+        for prompt_name in self.list_prompts():
+            self.load_prompt(prompt_name)
+    
+    def reload(self):
+        """Drop cached prompts so edited files are read again"""
+        _read_prompt.cache_clear()
+    
     def list_prompts(self) -> List[str]:
         """List available prompts"""
         prompt_files = self.prompts_dir.glob("*.txt")
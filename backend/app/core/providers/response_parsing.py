@@ -0,0 +1,40 @@
+"""
+Shared parsing of vision model responses
+"""
+import re
+from typing import Dict, Any
+
+import orjson
+
+# Outermost {...} span: first opening brace through the last closing brace
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_vision_json(response_text: str) -> Dict[str, Any]:
+    """
+    Parse the JSON object out of a vision model response.
+
+    Responses requested as JSON parse directly; otherwise the outermost
+    object is sliced out of the surrounding prose. Text without any object
+    yields a negative swing result carrying the raw response.
+
+    Raises:
+        orjson.JSONDecodeError: If the object found is not valid JSON
+    """
+    try:
+        parsed = orjson.loads(response_text)
+        if isinstance(parsed, dict):
+            return parsed
+    except orjson.JSONDecodeError:
+        pass
+
+    match = _JSON_OBJECT_RE.search(response_text)
+    if match:
+        return orjson.loads(match.group(0))
+
+    # Fallback if no JSON found
+    return {
+        "swing_detected": False,
+        "confidence": 0.0,
+        "raw_response": response_text
+    }
@@ -0,0 +1,131 @@
+"""
+Batching wrapper that coalesces concurrent vision requests
+"""
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from app.core.interfaces import VisionModel, ImageInput, VisionRequest
+
+logger = logging.getLogger(__name__)
+
+# (request, future awaiting the result, loop time the request arrived)
+PendingRequest = Tuple[VisionRequest, asyncio.Future, float]
+
+
+class BatchingVisionModel(VisionModel):
+    """
+    Vision model that schedules analyze_images calls onto the wrapped model
+    as analyze_image_batches calls, using continuous batching.
+
+    A scheduler admits requests whenever a provider slot is free: under low
+    load each request goes out on its own without waiting, and while every
+    slot is busy new requests accumulate so the next call picks up all of
+    them at once.
+    """
+
+    def __init__(self, model: VisionModel, max_batch_size: int = 4, max_inflight_batches: int = 2):
+        """
+        Initialize batching wrapper
+
+        Args:
+            model: Vision model that executes the batches
+            max_batch_size: Maximum number of requests sent in one call
+            max_inflight_batches: Provider calls allowed to run at once
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_inflight_batches = max_inflight_batches
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._scheduler: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._running = 0
+
+    async def analyze_images(self, images: List[ImageInput], prompt: str) -> Dict[str, Any]:
+        """
+        Queue images for the next batch and wait for their result
+
+        Args:
+            images: List of PIL images or encoded image bytes
+            prompt: Analysis prompt
+
+        Returns:
+            Analysis results as dictionary
+        """
+        self._ensure_scheduler()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        await self._queue.put((VisionRequest(images, prompt), future, loop.time()))
+        return await future
+
+    def get_stats(self) -> Dict[str, int]:
+        """Requests currently inside a provider call and waiting to be admitted"""
+        return {
+            "running": self._running,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "inflight_batches": len(self._inflight)
+        }
+
+    async def aclose(self):
+        """Stop the scheduler; requests still queued are cancelled"""
+        if self._scheduler:
+            self._scheduler.cancel()
+            await asyncio.gather(self._scheduler, return_exceptions=True)
+            self._scheduler = None
+        while self._queue and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+
+    def _ensure_scheduler(self):
+        """Start the scheduler on first use"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_inflight_batches)
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def _schedule(self):
+        """Admit everything queued into the next free provider slot"""
+        while True:
+            await self._slots.acquire()
+            try:
+                batch: List[PendingRequest] = [await self._queue.get()]
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[PendingRequest]):
+        """Send one batch as a single provider call and resolve its futures"""
+        now = asyncio.get_running_loop().time()
+        oldest_wait = max(now - arrival for _, _, arrival in batch)
+        logger.debug(f"Dispatching batch of {len(batch)} vision requests (oldest waited {oldest_wait * 1000:.0f}ms)")
+
+        self._running += len(batch)
+        try:
+            results = await self.model.analyze_image_batches([request for request, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._running -= len(batch)
+            self._slots.release()
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_model_info(self) -> Dict[str, str]:
+        """Get model information"""
+        info = dict(self.model.get_model_info())
+        info["max_batch_size"] = str(self.max_batch_size)
+        return info
@@ -1,15 +1,24 @@
 """
 Google Gemini vision model provider (direct API)
 """
+import io
 import asyncio
-import json
-from typing import List, Dict, Any
+import functools
+import hashlib
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
 from PIL import Image
 import logging
 import google.generativeai as genai
+from google.api_core import exceptions as gax
+from google.generativeai.types import generation_types
+import orjson
 import os
 
-from app.core.interfaces import VisionModel
+from app.core.interfaces import VisionModel, ImageInput, VisionRequest
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +38,275 @@ def get_api_key():
     return _api_key
 
 
+# Threads for the blocking calls the SDK has no async form of (File API uploads,
+# polling and deletes, model listing, PIL encoding), kept apart from the event loop's default
+# executor so long video uploads can't starve other to_thread users
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEMINI_IO_WORKERS", "8")),
+    thread_name_prefix="gemini-io"
+)
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a blocking SDK call on the Gemini I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+# At most GEMINI_MAX_CONCURRENT image generate calls are in flight per process, so a
+# burst of frames queues here instead of tripping the API's rate limits. Whole-video
+# analyses run for much longer and get their own gate, so they never hold the slots
+# that real-time swing detection waits on.
+GEMINI_MAX_CONCURRENT = int(os.getenv("GEMINI_MAX_CONCURRENT", "8"))
+GEMINI_MAX_CONCURRENT_VIDEO = int(os.getenv("GEMINI_MAX_CONCURRENT_VIDEO", "2"))
+
+# Generate retry policy: only transient upstream failures are retried
+GENERATE_MAX_RETRIES = 3
+GENERATE_MAX_BACKOFF_SECONDS = 8
+TRANSIENT_GENERATE_ERRORS = (
+    gax.ResourceExhausted,
+    gax.ServiceUnavailable,
+    gax.InternalServerError,
+    gax.DeadlineExceeded,
+)
+
+_gates = {
+    "image": asyncio.Semaphore(GEMINI_MAX_CONCURRENT),
+    "video": asyncio.Semaphore(GEMINI_MAX_CONCURRENT_VIDEO),
+}
+_gate_in_flight = {name: 0 for name in _gates}
+_gate_waiting = {name: 0 for name in _gates}
+
+
+def get_gate_stats() -> Dict[str, Dict[str, int]]:
+    """Generate calls currently running and waiting for a slot, per gate"""
+    return {
+        name: {"in_flight": _gate_in_flight[name], "waiting": _gate_waiting[name]}
+        for name in _gates
+    }
+
+
+async def _generate(
+    model: genai.GenerativeModel,
+    parts: List[Any],
+    gate: str = "image",
+    retries: int = GENERATE_MAX_RETRIES,
+    **kwargs
+):
+    """generate_content_async behind the named concurrency gate, retrying transient failures
+    
+    Args:
+        gate: Name of the concurrency gate to wait on ("image" or "video")
+        retries: Total attempts; pass 1 when the caller has its own retry policy
+    """
+    semaphore = _gates[gate]
+    
+    for attempt in range(retries):
+        _gate_waiting[gate] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            _gate_waiting[gate] -= 1
+        
+        _gate_in_flight[gate] += 1
+        try:
+            return await model.generate_content_async(parts, **kwargs)
+        except TRANSIENT_GENERATE_ERRORS as e:
+            logger.warning(f"Gemini generate attempt {attempt + 1}/{retries} failed: {e!r}")
+            if attempt == retries - 1:
+                raise
+        finally:
+            _gate_in_flight[gate] -= 1
+            semaphore.release()
+        
+        # Back off outside the gate so waiting retries don't hold a slot
+        await asyncio.sleep(min(GENERATE_MAX_BACKOFF_SECONDS, 2 ** attempt + random.random()))
+
+
+# Parsed image-analysis results are reused for identical (model, prompt, frames)
+RESPONSE_CACHE_SIZE = int(os.getenv("GEMINI_RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("GEMINI_RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+
+class ResponseCache:
+    """Bounded map of parsed vision results whose entries expire after a TTL"""
+    
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+    
+    @staticmethod
+    def key(model_name: str, prompt: str, image_parts: List[Dict[str, Any]]) -> tuple:
+        """Cache key from the model, a prompt digest and one digest per frame"""
+        return (
+            model_name,
+            hashlib.blake2b(prompt.encode(), digest_size=16).digest(),
+            tuple(hashlib.blake2b(part["data"], digest_size=16).digest() for part in image_parts),
+        )
+    
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        # Hand out copies so callers can't alter the cached result
+        return dict(result)
+    
+    def put(self, key: tuple, result: Dict[str, Any]):
+        # Failures and unparsed replies are worth retrying, so only real answers are kept
+        if "error" in result or "raw_response" in result:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+        self._evict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _evict(self):
+        # Entries are kept in write order, so expired and overflow entries are at the front
+        now = time.monotonic()
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.maxsize:
+                break
+            del self._entries[key]
+
+
+_response_cache = ResponseCache()
+
+
+# Shared models keyed by (model_name, temperature, max_tokens). Providers with the
+# same settings reuse one model and therefore one client; the SDK keeps that
+# client's gRPC channel open between calls.
+_models: Dict[Tuple[str, float, int], genai.GenerativeModel] = {}
+
+
+def _get_generative_model(model_name: str, temperature: float, max_tokens: int) -> genai.GenerativeModel:
+    """Get the shared GenerativeModel for these settings, creating it on first use"""
+    key = (model_name, temperature, max_tokens)
+    model = _models.get(key)
+    if model is None:
+        model = genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=genai.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                response_mime_type="application/json",
+            )
+        )
+        _models[key] = model
+    return model
+
+
+# Response shape for image analysis; Gemini's constrained decoding guarantees a
+# reply in this form, so it parses directly without searching for the JSON
+SWING_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "swing_detected": {"type": "boolean"},
+        "confidence": {"type": "number"},
+    },
+    "required": ["swing_detected", "confidence"],
+}
+
+def _compile_schema(schema: Dict[str, Any]):
+    """Convert a JSON schema dict to the SDK's Schema proto"""
+    return generation_types.to_generation_config_dict({"response_schema": schema})["response_schema"]
+
+
+# Per-call generation overrides, with schemas compiled once; the SDK would
+# otherwise rebuild the Schema proto from the dict on every request
+SWING_RESULT_CONFIG = {"response_schema": _compile_schema(SWING_RESULT_SCHEMA)}
+_SWING_RESULTS_SCHEMA = _compile_schema({"type": "array", "items": SWING_RESULT_SCHEMA})
+
+
+@functools.lru_cache(maxsize=32)
+def _batch_generation_config(max_output_tokens: int) -> Dict[str, Any]:
+    """Generation overrides for a batched call with the given output budget"""
+    return {"max_output_tokens": max_output_tokens, "response_schema": _SWING_RESULTS_SCHEMA}
+
+
+# Appended after the caller's prompt when several frame sets share one request
+BATCH_INSTRUCTIONS = (
+    "You will receive {count} independent frame sets, each introduced by a "
+    "\"Frame set N:\" marker. Evaluate each set on its own; a set whose marker is "
+    "followed by its own instructions is evaluated with those. Respond with a JSON "
+    "array containing exactly {count} result objects, in frame set order."
+)
+
+
+# Lossy quality used when a PIL image has to be encoded before upload
+WEBP_QUALITY = 40
+
+# Longest edge sent to Gemini; swing detection needs far less than a full frame,
+# and larger images only cost more image tokens and upload time
+MAX_IMAGE_EDGE = int(os.getenv("GEMINI_MAX_IMAGE_EDGE", "384"))
+
+# Leading bytes of the image formats clients send, and their MIME types
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
+
+
+def _image_mime_type(data: bytes) -> str:
+    """Detect the MIME type of encoded image bytes"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    raise ValueError("Unsupported image format, expected WebP, JPEG or PNG bytes")
+
+
+def _is_oversized(data: bytes) -> bool:
+    """Check encoded image dimensions against MAX_IMAGE_EDGE (reads only the header)"""
+    with Image.open(io.BytesIO(data)) as image:
+        return max(image.size) > MAX_IMAGE_EDGE
+
+
+def _encode_webp(image: Image.Image) -> bytes:
+    """Encode a PIL image as lossy WebP, downscaled to MAX_IMAGE_EDGE"""
+    if max(image.size) > MAX_IMAGE_EDGE:
+        image = image.copy()
+        image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _to_image_parts(images: List[ImageInput]) -> List[Dict[str, Any]]:
+    """
+    Build inline image parts for generate_content.
+    
+    Encoded bytes are sent as they are unless larger than MAX_IMAGE_EDGE. Left
+    to itself the SDK would re-encode every PIL image as lossless WebP, which
+    is larger than the lossy frames clients upload, so PIL images and oversized
+    frames are encoded here as downscaled lossy WebP instead.
+    """
+    parts = []
+    for image in images:
+        if isinstance(image, bytes):
+            if not _is_oversized(image):
+                parts.append({"mime_type": _image_mime_type(image), "data": image})
+                continue
+            image = Image.open(io.BytesIO(image))
+        parts.append({"mime_type": "image/webp", "data": _encode_webp(image)})
+    return parts
+
+
+async def _prepare_image_parts(batches: List[List[ImageInput]]) -> List[List[Dict[str, Any]]]:
+    """Build image parts per sequence, encoding any images off the event loop"""
+    if all(isinstance(image, bytes) and not _is_oversized(image) for images in batches for image in images):
+        return [_to_image_parts(images) for images in batches]
+    return await _run_blocking(lambda: [_to_image_parts(images) for images in batches])
+
+
 class GeminiVisionProvider(VisionModel):
     """Direct Gemini API implementation of vision model"""
     
@@ -45,41 +323,41 @@ class GeminiVisionProvider(VisionModel):
         self.temperature = temperature
         self.max_tokens = max_tokens
         
-        self.model = genai.GenerativeModel(
-            model_name=model_name,
-            generation_config=genai.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-                response_mime_type="application/json",
-            )
-        )
+        self.model = _get_generative_model(model_name, temperature, max_tokens)
 
-    async def analyze_video(self, video_path: str, prompt: str) -> Dict[str, Any]:
+    async def analyze_video(self, video: Union[str, bytes], prompt: str, mime_type: Optional[str] = None) -> Dict[str, Any]:
         """
-        Analyze a video file using Gemini.
+        Analyze a video file path or in-memory video bytes using Gemini.
         """
         try:
-            logger.info(f"Uploading video to Gemini: {video_path}")
-            video_file = genai.upload_file(path=video_path)
+            # The File API has no async client, so uploads and polling run on the I/O pool
+            if isinstance(video, bytes):
+                logger.info(f"Uploading in-memory video to Gemini ({len(video)} bytes)")
+                video_file = await _run_blocking(
+                    genai.upload_file, path=io.BytesIO(video), mime_type=mime_type or "video/mp4"
+                )
+            else:
+                logger.info(f"Uploading video to Gemini: {video}")
+                video_file = await _run_blocking(genai.upload_file, path=video, mime_type=mime_type)
             
             # Wait for the file to be processed
-            import time
             while video_file.state.name == "PROCESSING":
                 logger.info("Waiting for video to be processed...")
-                time.sleep(1)
-                video_file = genai.get_file(video_file.name)
+                await asyncio.sleep(1)
+                video_file = await _run_blocking(genai.get_file, video_file.name)
             
             if video_file.state.name != "ACTIVE":
                 raise ValueError(f"File failed to process. State: {video_file.state.name}")
 
             logger.info(f"Calling Gemini API with model: {self.model_name}")
-            response = self.model.generate_content([prompt, video_file])
+            # The analysis orchestrator retries whole video analyses, upload included
+            response = await _generate(self.model, [prompt, video_file], gate="video", retries=1)
             
             # Try to parse as JSON, if it fails return the raw text
             try:
-                parsed_result = json.loads(response.text.strip())
+                parsed_result = orjson.loads(response.text.strip())
                 return parsed_result
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 logger.warning(f"Failed to parse Gemini response as JSON: {e}")
                 logger.debug(f"Raw response: {response.text[:500]}...")
                 # Return a structured error response
@@ -93,6 +371,9 @@ class GeminiVisionProvider(VisionModel):
                     }
                 }
 
+        except gax.GoogleAPICallError:
+            # API errors propagate so callers can tell transient failures from permanent ones
+            raise
         except Exception as e:
             logger.error(f"Error in Gemini video analysis: {e}", exc_info=True)
             return {
@@ -105,7 +386,7 @@ class GeminiVisionProvider(VisionModel):
             }
         finally:
             if 'video_file' in locals():
-                genai.delete_file(video_file.name)
+                await _run_blocking(genai.delete_file, video_file.name)
 
     async def is_healthy(self) -> bool:
         """Check if the Gemini API is healthy by listing available models."""
@@ -115,18 +396,18 @@ class GeminiVisionProvider(VisionModel):
                 logger.error("Cannot check Gemini health: No API key configured")
                 return False
             
-            models = [m for m in genai.list_models()]
+            models = await _run_blocking(lambda: list(genai.list_models()))
             return len(models) > 0
         except Exception as e:
             logger.error(f"Gemini health check failed: {e}", exc_info=True)
             return False
     
-    async def analyze_images(self, images: List[Image.Image], prompt: str) -> Dict[str, Any]:
+    async def analyze_images(self, images: List[ImageInput], prompt: str) -> Dict[str, Any]:
         """
         Analyze images using Gemini
         
         Args:
-            images: List of PIL images
+            images: List of PIL images or encoded image bytes
             prompt: Analysis prompt
             
         Returns:
@@ -146,33 +427,25 @@ class GeminiVisionProvider(VisionModel):
             logger.info(f"Analyzing {len(images)} images with Gemini {self.model_name}")
             
             # Prepare parts for Gemini
+            image_parts = (await _prepare_image_parts([images]))[0]
+            cache_key = ResponseCache.key(self.model_name, prompt, image_parts)
+            cached_result = _response_cache.get(cache_key)
+            if cached_result is not None:
+                logger.info(f"Gemini analysis result (cached): {cached_result}")
+                return cached_result
+            
             parts = [prompt]
-            parts.extend(images)
+            parts.extend(image_parts)
             
             # Run generation
             logger.debug("Calling Gemini generate_content...")
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                parts
-            )
+            response = await _generate(self.model, parts, generation_config=SWING_RESULT_CONFIG)
             
             # Parse response
             response_text = response.text.strip()
             logger.debug(f"Gemini response: {response_text}")
-            
-            # Try to extract JSON from response
-            if "{" in response_text and "}" in response_text:
-                json_start = response_text.find("{")
-                json_end = response_text.rfind("}") + 1
-                json_str = response_text[json_start:json_end]
-                parsed_result = json.loads(json_str)
-            else:
-                # Fallback if no JSON found
-                parsed_result = {
-                    "swing_detected": False,
-                    "confidence": 0.0,
-                    "raw_response": response_text
-                }
+            parsed_result = orjson.loads(response_text)
+            _response_cache.put(cache_key, parsed_result)
             
             logger.info(f"Gemini analysis result: {parsed_result}")
             return parsed_result
@@ -192,6 +465,89 @@ class GeminiVisionProvider(VisionModel):
                 "error": str(e)
             }
     
+    async def analyze_image_batches(self, requests: List[VisionRequest]) -> List[Dict[str, Any]]:
+        """
+        Analyze several image sequences in a single Gemini request
+        
+        Each sequence is introduced by a "Frame set N:" marker and the model is
+        asked for a JSON array with one result per set. A prompt shared by every
+        request is sent once up front; otherwise each set carries its own. Sets
+        with a cached result are not sent again. If the reply does not line up
+        with the sets, each request is re-run on its own.
+        
+        Args:
+            requests: Image sequences and their prompts
+            
+        Returns:
+            One analysis result per request, in order
+        """
+        if len(requests) == 1:
+            return [await self.analyze_images(requests[0].images, requests[0].prompt)]
+        
+        try:
+            api_key = get_api_key()
+            if not api_key:
+                logger.error("Cannot analyze images: No API key configured")
+                return [{
+                    "swing_detected": False,
+                    "confidence": 0.0,
+                    "error": "No API key configured"
+                } for _ in requests]
+            
+            image_parts = await _prepare_image_parts([request.images for request in requests])
+            cache_keys = [
+                ResponseCache.key(self.model_name, request.prompt, images)
+                for request, images in zip(requests, image_parts)
+            ]
+            results = [_response_cache.get(key) for key in cache_keys]
+            
+            # Only frame sets without a cached answer are sent
+            pending = [index for index, result in enumerate(results) if result is None]
+            if not pending:
+                return results
+            if len(pending) == 1:
+                index = pending[0]
+                results[index] = await self.analyze_images(requests[index].images, requests[index].prompt)
+                return results
+            
+            logger.info(f"Analyzing {len(pending)} frame sets in one Gemini {self.model_name} call")
+            
+            shared_prompt = len({requests[index].prompt for index in pending}) == 1
+            parts = [requests[pending[0]].prompt] if shared_prompt else []
+            parts.append(BATCH_INSTRUCTIONS.format(count=len(pending)))
+            for number, index in enumerate(pending, start=1):
+                parts.append(f"Frame set {number}:")
+                if not shared_prompt:
+                    parts.append(requests[index].prompt)
+                parts.extend(image_parts[index])
+            
+            # Every set needs its own answer, so scale the output budget with the batch
+            response = await _generate(
+                self.model,
+                parts,
+                generation_config=_batch_generation_config(self.max_tokens * len(pending))
+            )
+            batch_results = orjson.loads(response.text.strip())
+        except Exception as e:
+            logger.error(f"Error in batched Gemini vision analysis: {e}", exc_info=True)
+            return [{
+                "swing_detected": False,
+                "confidence": 0.0,
+                "error": str(e)
+            } for _ in requests]
+        
+        if not isinstance(batch_results, list) or len(batch_results) != len(pending) or not all(isinstance(r, dict) for r in batch_results):
+            logger.warning(f"Batched Gemini response did not match {len(pending)} frame sets, analyzing individually")
+            batch_results = await super().analyze_image_batches([requests[index] for index in pending])
+        else:
+            logger.info(f"Gemini batched analysis results: {batch_results}")
+            for index, result in zip(pending, batch_results):
+                _response_cache.put(cache_keys[index], result)
+        
+        for index, result in zip(pending, batch_results):
+            results[index] = result
+        return results
+    
     def get_model_info(self) -> Dict[str, str]:
         """Get model information"""
         return {
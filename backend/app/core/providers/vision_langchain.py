@@ -2,7 +2,7 @@
 LangChain-based vision model provider
 """
 import asyncio
-import json
+from io import BytesIO
 from typing import List, Dict, Any
 from PIL import Image
 import logging
@@ -14,7 +14,8 @@ os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY", "")
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.core.interfaces import VisionModel
+from app.core.interfaces import VisionModel, ImageInput
+from app.core.providers.response_parsing import parse_vision_json
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +43,12 @@ class LangChainVisionModel(VisionModel):
             max_output_tokens=max_tokens
         )
     
-    async def analyze_images(self, images: List[Image.Image], prompt: str) -> Dict[str, Any]:
+    async def analyze_images(self, images: List[ImageInput], prompt: str) -> Dict[str, Any]:
         """
         Analyze images using LangChain
         
         Args:
-            images: List of PIL images
+            images: List of PIL images or encoded image bytes
             prompt: Analysis prompt
             
         Returns:
@@ -59,6 +60,8 @@ class LangChainVisionModel(VisionModel):
             
             # Add images to the message
             for image in images:
+                if isinstance(image, bytes):
+                    image = Image.open(BytesIO(image))
                 message_content.append({
                     "type": "image",
                     "image": image
@@ -73,19 +76,7 @@ class LangChainVisionModel(VisionModel):
             # Parse response
             response_text = result.content.strip()
             
-            # Try to extract JSON from response
-            if "{" in response_text and "}" in response_text:
-                json_start = response_text.find("{")
-                json_end = response_text.rfind("}") + 1
-                json_str = response_text[json_start:json_end]
-                parsed_result = json.loads(json_str)
-            else:
-                # Fallback if no JSON found
-                parsed_result = {
-                    "swing_detected": False,
-                    "confidence": 0.0,
-                    "raw_response": response_text
-                }
+            parsed_result = parse_vision_json(response_text)
             
             logger.info(f"LangChain analysis result: {parsed_result}")
             return parsed_result
@@ -2,9 +2,8 @@
 import asyncio
 import logging
 from typing import List, Dict, Any
-from PIL import Image
 
-from app.core.interfaces import VisionModel
+from app.core.interfaces import VisionModel, ImageInput
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +25,7 @@ class MockVisionModel(VisionModel):
         self.call_count = 0
         self.response_delay = 0.1  # Simulate API delay
         
-    async def analyze_images(self, images: List[Image.Image], prompt: str) -> Dict[str, Any]:
+    async def analyze_images(self, images: List[ImageInput], prompt: str) -> Dict[str, Any]:
         """
         Mock analyze images - returns predetermined responses
         
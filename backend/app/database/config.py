@@ -11,10 +11,10 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.pool import StaticPool, NullPool
 import logging
 from urllib.parse import urlparse
-from dotenv import load_dotenv
+from app.config.settings import load_environment
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
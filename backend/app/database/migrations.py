@@ -9,6 +9,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any
 import json
+import orjson
 
 # Add the backend directory to the Python path
 backend_dir = Path(__file__).parent.parent
@@ -132,8 +133,7 @@ def load_migration(filename: str) -> Migration:
     if not migration_file.exists():
         raise FileNotFoundError(f"Migration file not found: {filename}")
     
-    with open(migration_file, 'r') as f:
-        data = json.load(f)
+    data = orjson.loads(migration_file.read_bytes())
     
     return Migration.from_dict(data)
 
@@ -237,20 +237,18 @@ def migrate_down(steps: int = 1):
     # Get the last N migrations to rollback
     to_rollback = applied[-steps:]
     
+    # Parse each migration file once, rather than once per migration being rolled back
+    migrations_by_name = {}
+    for file in MIGRATIONS_DIR.glob("*.json"):
+        migration = load_migration(file.name)
+        migrations_by_name[migration.name] = migration
+    
     for migration_name in reversed(to_rollback):
-        # Find the migration file
-        migration_file = None
-        for file in MIGRATIONS_DIR.glob("*.json"):
-            migration = load_migration(file.name)
-            if migration.name == migration_name:
-                migration_file = file.name
-                break
-        
-        if not migration_file:
+        migration = migrations_by_name.get(migration_name)
+        if migration is None:
             logger.error(f"Migration file not found for: {migration_name}")
             return False
         
-        migration = load_migration(migration_file)
         if not rollback_migration(migration):
             logger.error(f"Rollback failed: {migration_name}")
             return False
@@ -1,11 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from app.config.settings import load_environment
 import os
+import asyncio
 import logging
 
 # Load environment variables FIRST before any other imports
-load_dotenv()
+load_environment()
 
 # Configure logging right after loading environment variables
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -36,12 +37,16 @@ from app.api.analysis import router as analysis_router  # New UUID-based analysi
 from app.api.tts import router as tts_router
 from app.api.swing_detection_ws import router as swing_detection_ws_router
 from app.api.health_check import router as health_check_router
+from app.services.video_analysis_service import init_services, get_analysis_orchestrator
+from app.api.responses import APIJSONResponse
+from app.database.config import async_engine
 from app.config.api import API_TITLE, API_DESCRIPTION, API_VERSION
 
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
-    version=API_VERSION
+    version=API_VERSION,
+    default_response_class=APIJSONResponse
 )
 
 # Add CORS middleware with environment-based origins
@@ -68,6 +73,48 @@ app.include_router(tts_router)
 app.include_router(swing_detection_ws_router)
 app.include_router(health_check_router)
 
+@app.on_event("startup")
+async def start_analysis_services():
+    """Create the shared analysis services and start the background worker pool."""
+    init_services()
+    get_analysis_orchestrator().start_workers()
+
+
+@app.on_event("startup")
+async def warm_up():
+    """Open a pooled DB connection and build the video pipeline before the first request."""
+    try:
+        async with async_engine.connect():
+            pass
+    except Exception as e:
+        logger.warning(f"Database warm-up failed: {e}")
+    
+    # The pipeline depends on the MediaPipe pose service, which may not be installed
+    try:
+        from app.services.video_pipeline_service import get_video_pipeline_service
+    except ImportError as e:
+        logger.warning(f"Video pipeline not available, skipping warm-up: {e}")
+        return
+    pipeline = await asyncio.to_thread(get_video_pipeline_service)
+    pipeline.start_janitor()
+
+
+@app.on_event("shutdown")
+async def stop_analysis_workers():
+    """Stop the background analysis workers."""
+    await get_analysis_orchestrator().stop_workers()
+
+
+@app.on_event("shutdown")
+async def close_video_pipeline():
+    """Release the video pipeline's pooled HTTP connections."""
+    try:
+        from app.services.video_pipeline_service import close_video_pipeline_service
+    except ImportError:
+        return
+    await close_video_pipeline_service()
+
+
 @app.get("/")
 async def root():
     """
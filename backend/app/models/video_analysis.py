@@ -2,12 +2,14 @@
 VideoAnalysis model for storing AI analysis results.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, Enum, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.config import Base
 import enum
+import gzip
+import orjson
 import uuid as uuid_lib
 
 
@@ -52,9 +54,10 @@ class VideoAnalysis(Base):
     errorDescription = Column("error_description", Text, nullable=True)  # New field per spec
     
     # Analysis results stored as JSONB
-    pose_data = Column(JSONB, nullable=True)  # MediaPipe pose detection results
+    pose_data = Column(JSONB, nullable=True)  # MediaPipe pose detection results (legacy, read-only - new results go to pose_data_z)
+    pose_data_z = Column(LargeBinary, nullable=True)  # Gzip-compressed JSON of the MediaPipe pose detection results
     swing_metrics = Column(JSONB, nullable=True)  # Calculated swing metrics
-    ai_analysis = Column(JSONB, nullable=True)  # AI analysis from Gemini (legacy)
+    ai_analysis = Column(JSONB, nullable=True)  # AI analysis from Gemini (legacy, read-only - new results go to analysisJSON)
     analysisJSON = Column("analysis_json", JSONB, nullable=True)  # AI analysis from LLM (new field per spec)
     coaching_script = Column(JSONB, nullable=True)  # Generated coaching script with timestamps
     
@@ -125,6 +128,18 @@ class VideoAnalysis(Base):
         
         return None
     
+    def set_pose_data(self, pose_data):
+        """Store pose detection results compressed; they are large and rarely read."""
+        self.pose_data_z = gzip.compress(
+            orjson.dumps(pose_data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY), compresslevel=6
+        )
+    
+    def get_pose_data(self):
+        """Get pose detection results, falling back to the legacy JSONB column."""
+        if self.pose_data_z is not None:
+            return orjson.loads(gzip.decompress(self.pose_data_z))
+        return self.pose_data
+    
     def get_key_moments_summary(self):
         """Get a summary of key moments from the analysis."""
         if not self.key_moments:
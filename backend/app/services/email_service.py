@@ -10,6 +10,7 @@ from email.mime.multipart import MIMEMultipart
 from typing import Optional, Dict, Any
 import logging
 from datetime import datetime
+from string import Template
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,132 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 VERIFY_URL = f"{FRONTEND_URL}/verify-email"
 RESET_URL = f"{FRONTEND_URL}/reset-password"
 
+# Month names for timestamp formatting (avoids strftime's locale lookup)
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
+def _format_utc_timestamp(now: datetime) -> str:
+    """Format a UTC datetime as e.g. 'March 05, 2024 at 02:30 PM UTC'."""
+    hour = now.hour % 12 or 12
+    meridiem = "AM" if now.hour < 12 else "PM"
+    return f"{_MONTHS[now.month - 1]} {now.day:02d}, {now.year} at {hour:02d}:{now.minute:02d} {meridiem} UTC"
+
+# Shared email layout fragments
+_BASE_CSS = """
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background-color: #2c5530; color: white; padding: 20px; text-align: center; }
+        .content { padding: 30px; background-color: #f9f9f9; }
+        .button { 
+            display: inline-block; 
+            padding: 12px 24px; 
+            background-color: #4CAF50; 
+            color: white; 
+            text-decoration: none; 
+            border-radius: 5px; 
+            margin: 20px 0; 
+        }
+        .button-danger { background-color: #ff6b6b; }
+        .footer { padding: 20px; text-align: center; color: #666; font-size: 12px; }
+        .warning { background-color: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; margin: 20px 0; border-radius: 5px; }
+        .features { background-color: white; padding: 20px; margin: 20px 0; border-radius: 5px; }
+        .info { background-color: #d4edda; border: 1px solid #c3e6cb; padding: 15px; margin: 20px 0; border-radius: 5px; }
+"""
+
+_HEADER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>$title</title>
+    <style>""" + _BASE_CSS + """    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>$heading</h1>
+        </div>
+        <div class="content">
+"""
+
+_FOOTER_HTML = """
+            <p>Best regards,<br>The FutureGolf Team</p>
+        </div>
+        <div class="footer">
+            <p>&copy; 2024 FutureGolf. All rights reserved.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+_VERIFICATION_HTML = Template(_HEADER_HTML + """
+            <h2>Hi $first_name!</h2>
+            <p>Thank you for creating your FutureGolf account. To complete your registration, please verify your email address by clicking the button below:</p>
+            
+            <a href="$link" class="button">Verify Email Address</a>
+            
+            <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
+            <p><a href="$link">$link</a></p>
+            
+            <p>This verification link will expire in 24 hours.</p>
+            
+            <p>If you didn't create this account, you can safely ignore this email.</p>
+""" + _FOOTER_HTML)
+
+_PASSWORD_RESET_HTML = Template(_HEADER_HTML + """
+            <h2>Hi $first_name!</h2>
+            <p>We received a request to reset your password for your FutureGolf account.</p>
+            
+            <a href="$link" class="button button-danger">Reset Password</a>
+            
+            <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
+            <p><a href="$link">$link</a></p>
+            
+            <div class="warning">
+                <strong>Important:</strong> This password reset link will expire in 1 hour for security reasons.
+            </div>
+            
+            <p>If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.</p>
+""" + _FOOTER_HTML)
+
+_WELCOME_HTML = Template(_HEADER_HTML + """
+            <h2>Hi $first_name!</h2>
+            <p>Your email has been successfully verified and your FutureGolf account is now ready to use!</p>
+            
+            <div class="features">
+                <h3>What you can do with FutureGolf:</h3>
+                <ul>
+                    <li>Upload and analyze your golf swing videos</li>
+                    <li>Get personalized coaching feedback</li>
+                    <li>Track your progress over time</li>
+                    <li>Access professional golf tips and techniques</li>
+                </ul>
+            </div>
+            
+            <p>Ready to improve your golf game? Start by uploading your first swing video!</p>
+            
+            <a href="$link" class="button">Go to Dashboard</a>
+            
+            <p>If you have any questions or need help getting started, feel free to contact our support team.</p>
+""" + _FOOTER_HTML)
+
+_PASSWORD_CHANGED_HTML = Template(_HEADER_HTML + """
+            <h2>Hi $first_name!</h2>
+            
+            <div class="info">
+                <strong>Your password has been successfully changed.</strong>
+            </div>
+            
+            <p>This is a confirmation that your FutureGolf account password was changed at $changed_at.</p>
+            
+            <p>If you made this change, no further action is needed.</p>
+            
+            <p>If you did not make this change, please contact our support team immediately and consider changing your password again.</p>
+""" + _FOOTER_HTML)
+
 
 class EmailService:
     """Email service class for handling all email operations."""
@@ -50,7 +177,7 @@ class EmailService:
             server.login(self.username, self.password)
             return server
         except Exception as e:
-            logger.error(f"Failed to create SMTP connection: {e}")
+            logger.error("Failed to create SMTP connection: %s", e)
             return None
     
     def _send_email(self, to_email: str, subject: str, html_content: str, text_content: Optional[str] = None) -> bool:
@@ -79,11 +206,11 @@ class EmailService:
             server.send_message(message)
             server.quit()
             
-            logger.info(f"Email sent successfully to {to_email}")
+            logger.info("Email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {e}")
+            logger.error("Failed to send email to %s: %s", to_email, e)
             return False
     
     def send_verification_email(self, email: str, first_name: str, verification_token: str) -> bool:
@@ -92,56 +219,12 @@ class EmailService:
         
         subject = "Verify Your FutureGolf Account"
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Verify Your Email</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #2c5530; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 30px; background-color: #f9f9f9; }}
-                .button {{ 
-                    display: inline-block; 
-                    padding: 12px 24px; 
-                    background-color: #4CAF50; 
-                    color: white; 
-                    text-decoration: none; 
-                    border-radius: 5px; 
-                    margin: 20px 0; 
-                }}
-                .footer {{ padding: 20px; text-align: center; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Welcome to FutureGolf!</h1>
-                </div>
-                <div class="content">
-                    <h2>Hi {first_name or 'there'}!</h2>
-                    <p>Thank you for creating your FutureGolf account. To complete your registration, please verify your email address by clicking the button below:</p>
-                    
-                    <a href="{verify_link}" class="button">Verify Email Address</a>
-                    
-                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-                    <p><a href="{verify_link}">{verify_link}</a></p>
-                    
-                    <p>This verification link will expire in 24 hours.</p>
-                    
-                    <p>If you didn't create this account, you can safely ignore this email.</p>
-                    
-                    <p>Best regards,<br>The FutureGolf Team</p>
-                </div>
-                <div class="footer">
-                    <p>&copy; 2024 FutureGolf. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = _VERIFICATION_HTML.substitute(
+            title="Verify Your Email",
+            heading="Welcome to FutureGolf!",
+            first_name=first_name or 'there',
+            link=verify_link,
+        )
         
         text_content = f"""
         Welcome to FutureGolf!
@@ -168,59 +251,12 @@ class EmailService:
         
         subject = "Reset Your FutureGolf Password"
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Reset Your Password</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #2c5530; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 30px; background-color: #f9f9f9; }}
-                .button {{ 
-                    display: inline-block; 
-                    padding: 12px 24px; 
-                    background-color: #ff6b6b; 
-                    color: white; 
-                    text-decoration: none; 
-                    border-radius: 5px; 
-                    margin: 20px 0; 
-                }}
-                .footer {{ padding: 20px; text-align: center; color: #666; font-size: 12px; }}
-                .warning {{ background-color: #fff3cd; border: 1px solid #ffeaa7; padding: 15px; margin: 20px 0; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Password Reset Request</h1>
-                </div>
-                <div class="content">
-                    <h2>Hi {first_name or 'there'}!</h2>
-                    <p>We received a request to reset your password for your FutureGolf account.</p>
-                    
-                    <a href="{reset_link}" class="button">Reset Password</a>
-                    
-                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-                    <p><a href="{reset_link}">{reset_link}</a></p>
-                    
-                    <div class="warning">
-                        <strong>Important:</strong> This password reset link will expire in 1 hour for security reasons.
-                    </div>
-                    
-                    <p>If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.</p>
-                    
-                    <p>Best regards,<br>The FutureGolf Team</p>
-                </div>
-                <div class="footer">
-                    <p>&copy; 2024 FutureGolf. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = _PASSWORD_RESET_HTML.substitute(
+            title="Reset Your Password",
+            heading="Password Reset Request",
+            first_name=first_name or 'there',
+            link=reset_link,
+        )
         
         text_content = f"""
         Password Reset Request
@@ -246,64 +282,12 @@ class EmailService:
         """Send welcome email after successful verification."""
         subject = "Welcome to FutureGolf - Your Account is Ready!"
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Welcome to FutureGolf</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #2c5530; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 30px; background-color: #f9f9f9; }}
-                .button {{ 
-                    display: inline-block; 
-                    padding: 12px 24px; 
-                    background-color: #4CAF50; 
-                    color: white; 
-                    text-decoration: none; 
-                    border-radius: 5px; 
-                    margin: 20px 0; 
-                }}
-                .footer {{ padding: 20px; text-align: center; color: #666; font-size: 12px; }}
-                .features {{ background-color: white; padding: 20px; margin: 20px 0; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Welcome to FutureGolf!</h1>
-                </div>
-                <div class="content">
-                    <h2>Hi {first_name or 'there'}!</h2>
-                    <p>Your email has been successfully verified and your FutureGolf account is now ready to use!</p>
-                    
-                    <div class="features">
-                        <h3>What you can do with FutureGolf:</h3>
-                        <ul>
-                            <li>Upload and analyze your golf swing videos</li>
-                            <li>Get personalized coaching feedback</li>
-                            <li>Track your progress over time</li>
-                            <li>Access professional golf tips and techniques</li>
-                        </ul>
-                    </div>
-                    
-                    <p>Ready to improve your golf game? Start by uploading your first swing video!</p>
-                    
-                    <a href="{FRONTEND_URL}/dashboard" class="button">Go to Dashboard</a>
-                    
-                    <p>If you have any questions or need help getting started, feel free to contact our support team.</p>
-                    
-                    <p>Best regards,<br>The FutureGolf Team</p>
-                </div>
-                <div class="footer">
-                    <p>&copy; 2024 FutureGolf. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = _WELCOME_HTML.substitute(
+            title="Welcome to FutureGolf",
+            heading="Welcome to FutureGolf!",
+            first_name=first_name or 'there',
+            link=f"{FRONTEND_URL}/dashboard",
+        )
         
         text_content = f"""
         Welcome to FutureGolf!
@@ -333,49 +317,14 @@ class EmailService:
     def send_password_changed_notification(self, email: str, first_name: str) -> bool:
         """Send notification after password change."""
         subject = "Your FutureGolf Password Has Been Changed"
+        changed_at = _format_utc_timestamp(datetime.utcnow())
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Password Changed</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #2c5530; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 30px; background-color: #f9f9f9; }}
-                .footer {{ padding: 20px; text-align: center; color: #666; font-size: 12px; }}
-                .info {{ background-color: #d4edda; border: 1px solid #c3e6cb; padding: 15px; margin: 20px 0; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Password Changed Successfully</h1>
-                </div>
-                <div class="content">
-                    <h2>Hi {first_name or 'there'}!</h2>
-                    
-                    <div class="info">
-                        <strong>Your password has been successfully changed.</strong>
-                    </div>
-                    
-                    <p>This is a confirmation that your FutureGolf account password was changed at {datetime.utcnow().strftime('%B %d, %Y at %I:%M %p UTC')}.</p>
-                    
-                    <p>If you made this change, no further action is needed.</p>
-                    
-                    <p>If you did not make this change, please contact our support team immediately and consider changing your password again.</p>
-                    
-                    <p>Best regards,<br>The FutureGolf Team</p>
-                </div>
-                <div class="footer">
-                    <p>&copy; 2024 FutureGolf. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = _PASSWORD_CHANGED_HTML.substitute(
+            title="Password Changed",
+            heading="Password Changed Successfully",
+            first_name=first_name or 'there',
+            changed_at=changed_at,
+        )
         
         text_content = f"""
         Password Changed Successfully
@@ -384,7 +333,7 @@ class EmailService:
         
         Your password has been successfully changed.
         
-        This is a confirmation that your FutureGolf account password was changed at {datetime.utcnow().strftime('%B %d, %Y at %I:%M %p UTC')}.
+        This is a confirmation that your FutureGolf account password was changed at {changed_at}.
         
         If you made this change, no further action is needed.
         
@@ -87,32 +87,34 @@ class GoogleOAuthProvider(OAuthProvider):
         self.token_url = "https://oauth2.googleapis.com/token"
         self.user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
         self.scope = "openid email profile"
-    
-    def get_authorization_url(self) -> Tuple[str, str]:
-        """Get Google authorization URL."""
-        state = self.generate_state()
-        params = {
+        self._auth_base = {
             "client_id": self.client_id,
             "redirect_uri": self.redirect_uri,
             "scope": self.scope,
             "response_type": "code",
-            "state": state,
             "access_type": "offline",
             "prompt": "consent"
         }
+        self._token_base = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "authorization_code",
+            "redirect_uri": self.redirect_uri
+        }
+    
+    def get_authorization_url(self) -> Tuple[str, str]:
+        """Get Google authorization URL."""
+        state = self.generate_state()
+        params = self._auth_base.copy()
+        params["state"] = state
         url = f"{self.auth_url}?{urlencode(params)}"
         return url, state
     
     async def exchange_code_for_token(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange Google authorization code for access token."""
         try:
-            data = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": self.redirect_uri
-            }
+            data = self._token_base.copy()
+            data["code"] = code
             
             async with httpx.AsyncClient() as client:
                 response = await client.post(self.token_url, data=data)
@@ -120,7 +122,7 @@ class GoogleOAuthProvider(OAuthProvider):
                 return response.json()
                 
         except Exception as e:
-            logger.error(f"Google token exchange error: {e}")
+            logger.error("Google token exchange error: %s", e)
             return None
     
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
@@ -134,7 +136,7 @@ class GoogleOAuthProvider(OAuthProvider):
                 return response.json()
                 
         except Exception as e:
-            logger.error(f"Google user info error: {e}")
+            logger.error("Google user info error: %s", e)
             return None
 
 
@@ -148,32 +150,34 @@ class MicrosoftOAuthProvider(OAuthProvider):
         self.token_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
         self.user_info_url = "https://graph.microsoft.com/v1.0/me"
         self.scope = "openid email profile User.Read"
-    
-    def get_authorization_url(self) -> Tuple[str, str]:
-        """Get Microsoft authorization URL."""
-        state = self.generate_state()
-        params = {
+        self._auth_base = {
             "client_id": self.client_id,
             "redirect_uri": self.redirect_uri,
             "scope": self.scope,
             "response_type": "code",
-            "state": state,
             "response_mode": "query"
         }
+        self._token_base = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "authorization_code",
+            "redirect_uri": self.redirect_uri,
+            "scope": self.scope
+        }
+    
+    def get_authorization_url(self) -> Tuple[str, str]:
+        """Get Microsoft authorization URL."""
+        state = self.generate_state()
+        params = self._auth_base.copy()
+        params["state"] = state
         url = f"{self.auth_url}?{urlencode(params)}"
         return url, state
     
     async def exchange_code_for_token(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange Microsoft authorization code for access token."""
         try:
-            data = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": self.redirect_uri,
-                "scope": self.scope
-            }
+            data = self._token_base.copy()
+            data["code"] = code
             
             async with httpx.AsyncClient() as client:
                 response = await client.post(self.token_url, data=data)
@@ -181,7 +185,7 @@ class MicrosoftOAuthProvider(OAuthProvider):
                 return response.json()
                 
         except Exception as e:
-            logger.error(f"Microsoft token exchange error: {e}")
+            logger.error("Microsoft token exchange error: %s", e)
             return None
     
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
@@ -195,7 +199,7 @@ class MicrosoftOAuthProvider(OAuthProvider):
                 return response.json()
                 
         except Exception as e:
-            logger.error(f"Microsoft user info error: {e}")
+            logger.error("Microsoft user info error: %s", e)
             return None
 
 
@@ -208,30 +212,32 @@ class LinkedInOAuthProvider(OAuthProvider):
         self.token_url = "https://www.linkedin.com/oauth/v2/accessToken"
         self.user_info_url = "https://api.linkedin.com/v2/userinfo"
         self.scope = "openid email profile"
-    
-    def get_authorization_url(self) -> Tuple[str, str]:
-        """Get LinkedIn authorization URL."""
-        state = self.generate_state()
-        params = {
+        self._auth_base = {
             "client_id": self.client_id,
             "redirect_uri": self.redirect_uri,
             "scope": self.scope,
-            "response_type": "code",
-            "state": state
+            "response_type": "code"
+        }
+        self._token_base = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "authorization_code",
+            "redirect_uri": self.redirect_uri
         }
+    
+    def get_authorization_url(self) -> Tuple[str, str]:
+        """Get LinkedIn authorization URL."""
+        state = self.generate_state()
+        params = self._auth_base.copy()
+        params["state"] = state
         url = f"{self.auth_url}?{urlencode(params)}"
         return url, state
     
     async def exchange_code_for_token(self, code: str) -> Optional[Dict[str, Any]]:
         """Exchange LinkedIn authorization code for access token."""
         try:
-            data = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": self.redirect_uri
-            }
+            data = self._token_base.copy()
+            data["code"] = code
             
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
             
@@ -241,7 +247,7 @@ class LinkedInOAuthProvider(OAuthProvider):
                 return response.json()
                 
         except Exception as e:
-            logger.error(f"LinkedIn token exchange error: {e}")
+            logger.error("LinkedIn token exchange error: %s", e)
             return None
     
     async def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
@@ -255,7 +261,7 @@ class LinkedInOAuthProvider(OAuthProvider):
                 return response.json()
                 
         except Exception as e:
-            logger.error(f"LinkedIn user info error: {e}")
+            logger.error("LinkedIn user info error: %s", e)
             return None
 
 
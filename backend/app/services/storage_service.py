@@ -2,18 +2,45 @@
 Google Cloud Storage service for handling video uploads and management.
 """
 
+import io
 import os
+import time
 import uuid
+import functools
+from functools import lru_cache
+import shutil
+import asyncio
+import tempfile
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, BinaryIO, Tuple, List
 import logging
 from google.cloud import storage
+from google.cloud.storage.transfer_manager import THREAD, upload_chunks_concurrently
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from app.config.storage import storage_config
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of calls the GCS JSON API accepts in one batch request
+DELETE_BATCH_SIZE = 100
+
+# Blobs requested per list page, and the fields each listing needs back from GCS
+LIST_PAGE_SIZE = 500
+USER_FILE_FIELDS = "items(name,size,contentType,timeCreated,metadata),nextPageToken"
+TEMP_FILE_FIELDS = "items(name,timeCreated),nextPageToken"
+
+# Cache-Control for UUID-named (immutable) public derivatives and for private originals
+PUBLIC_CACHE_CONTROL = "public, max-age=86400, immutable"
+PRIVATE_CACHE_CONTROL = "private, max-age=3600"
+
+# Objects larger than this must be copied with a multi-call rewrite
+MAX_SINGLE_COPY_SIZE = 5 * 1024 * 1024 * 1024
+
+# Maximum number of signed URLs kept in the per-service cache
+SIGNED_URL_CACHE_SIZE = 4096
+
 
 class StorageService:
     """Service for handling video storage operations."""
@@ -22,6 +49,63 @@ class StorageService:
         self.config = storage_config
         self.client = self.config.get_storage_client()
         self.bucket = self.config.get_bucket()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.io_workers,
+            thread_name_prefix="gcs-io"
+        )
+        # Signed URLs are reused for a quarter of their lifetime (see generate_signed_url)
+        self._signed_url_for = lru_cache(maxsize=SIGNED_URL_CACHE_SIZE)(self._sign_url)
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking google-cloud-storage call on the service's I/O thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    def _upload_chunks_concurrently(self, file: BinaryIO, blob: storage.Blob, content_type: str) -> None:
+        """Spool a file to disk and upload it to GCS as parallel multipart chunks."""
+        with tempfile.NamedTemporaryFile() as tmp:
+            shutil.copyfileobj(file, tmp)
+            tmp.flush()
+            upload_chunks_concurrently(
+                tmp.name,
+                blob,
+                content_type=content_type,
+                chunk_size=self.config.parallel_chunk_size,
+                max_workers=self.config.parallel_upload_workers,
+                worker_type=THREAD
+            )
+    
+    def _sign_url(self, blob_name: str, expiration_window: int, expiration_hours: int) -> str:
+        """Sign a V4 GET URL; expiration_window only partitions the URL cache."""
+        blob = self.bucket.blob(blob_name)
+        return blob.generate_signed_url(
+            version="v4",
+            expiration=datetime.utcnow() + timedelta(hours=expiration_hours),
+            method="GET"
+        )
+    
+    async def _list_blobs(self, prefix: str, fields: str) -> List[storage.Blob]:
+        """List blobs under a prefix page by page, fetching only the requested fields."""
+        iterator = self.bucket.client.list_blobs(
+            self.bucket,
+            prefix=prefix,
+            fields=fields,
+            page_size=LIST_PAGE_SIZE
+        )
+        pages = iter(iterator.pages)
+        blobs = []
+        while True:
+            page = await self._run_blocking(next, pages, None)
+            if page is None:
+                break
+            blobs.extend(page)
+        return blobs
+    
+    def _delete_blob_batch(self, blobs: List[storage.Blob]) -> None:
+        """Delete blobs using a single GCS batch request."""
+        with self.bucket.client.batch():
+            for blob in blobs:
+                blob.delete()
     
     async def upload_video(
         self, 
@@ -56,6 +140,7 @@ class StorageService:
             # Create blob
             blob = self.bucket.blob(blob_name)
             blob.content_type = content_type
+            blob.cache_control = PRIVATE_CACHE_CONTROL
             
             # Add metadata
             blob.metadata = {
@@ -66,20 +151,25 @@ class StorageService:
                 "file_type": "video"
             }
             
-            # Upload file
-            file.seek(0)
-            file_size = len(file.read())
+            # Determine file size without reading the payload into memory
+            file.seek(0, os.SEEK_END)
+            file_size = file.tell()
             file.seek(0)
             logger.debug(f"File size: {file_size} bytes")
             
-            # Always use simple upload for now (golf videos are typically < 100MB)
-            logger.debug(f"Starting upload to GCS - blob: {blob_name}")
-            blob.upload_from_file(file, content_type=content_type)
+            # Shard larger videos into concurrent chunks; a single chunk isn't worth composing
+            parallel = file_size >= self.config.parallel_chunk_size
+            logger.debug(f"Starting upload to GCS - blob: {blob_name}, parallel: {parallel}")
+            if parallel:
+                await self._run_blocking(self._upload_chunks_concurrently, file, blob, content_type)
+            else:
+                await self._run_blocking(blob.upload_from_file, file, content_type=content_type)
             logger.debug(f"Upload completed successfully")
             upload_result = {
                 "blob_name": blob_name,
                 "size": file_size,
-                "resumable": False
+                "resumable": False,
+                "parallel": parallel
             }
             
             # Get public URL
@@ -122,6 +212,7 @@ class StorageService:
             # Create blob
             blob = self.bucket.blob(blob_name)
             blob.content_type = f"image/{format}"
+            blob.cache_control = PUBLIC_CACHE_CONTROL
             
             # Add metadata
             blob.metadata = {
@@ -133,7 +224,12 @@ class StorageService:
             
             # Upload thumbnail
             logger.debug(f"Uploading thumbnail - blob_name: {blob_name}, size: {len(thumbnail_data)} bytes")
-            blob.upload_from_string(thumbnail_data, content_type=f"image/{format}")
+            await self._run_blocking(
+                blob.upload_from_file,
+                io.BytesIO(thumbnail_data),
+                size=len(thumbnail_data),
+                content_type=f"image/{format}"
+            )
             logger.info(f"Thumbnail uploaded successfully - blob_name: {blob_name}")
             
             return {
@@ -169,6 +265,7 @@ class StorageService:
             # Create blob
             blob = self.bucket.blob(blob_name)
             blob.content_type = "video/mp4"
+            blob.cache_control = PUBLIC_CACHE_CONTROL
             
             # Add metadata
             blob.metadata = {
@@ -181,7 +278,11 @@ class StorageService:
             
             # Upload processed video
             logger.debug(f"Uploading processed video - blob_name: {blob_name}, size: {len(processed_data)} bytes")
-            blob.upload_from_string(processed_data, content_type="video/mp4")
+            processed_file = io.BytesIO(processed_data)
+            if len(processed_data) >= self.config.parallel_chunk_size:
+                await self._run_blocking(self._upload_chunks_concurrently, processed_file, blob, "video/mp4")
+            else:
+                await self._run_blocking(blob.upload_from_file, processed_file, size=len(processed_data), content_type="video/mp4")
             logger.info(f"Processed video uploaded successfully - blob_name: {blob_name}")
             
             return {
@@ -204,15 +305,15 @@ class StorageService:
         try:
             if expiration_hours is None:
                 expiration_hours = self.config.signed_url_expiration
+            if expiration_hours <= 0:
+                raise ValueError(f"expiration_hours must be positive, got {expiration_hours}")
             logger.debug(f"Using expiration: {expiration_hours} hours")
             
-            blob = self.bucket.blob(blob_name)
-            
-            # Generate signed URL
-            url = blob.generate_signed_url(
-                version="v4",
-                expiration=datetime.utcnow() + timedelta(hours=expiration_hours),
-                method="GET"
+            # Reuse a cached URL for the first quarter of its lifetime so it always has >= 75% validity left
+            window_seconds = max(1, int(expiration_hours * 900))
+            expiration_window = int(time.time()) // window_seconds
+            url = await self._run_blocking(
+                self._signed_url_for, blob_name, expiration_window, expiration_hours
             )
             logger.debug(f"Generated signed URL successfully")
             
@@ -222,12 +323,45 @@ class StorageService:
             logger.error(f"Failed to generate signed URL: {e}")
             raise
     
+    async def download_bytes(self, blob_name: str) -> bytes:
+        """Download a file's contents into memory, using parallel ranged reads for large files."""
+        logger.debug(f"Downloading blob into memory: {blob_name}")
+        blob = await self._run_blocking(self.bucket.get_blob, blob_name)
+        if blob is None:
+            raise NotFound(f"Blob not found: {blob_name}")
+        
+        if blob.size and blob.size > self.config.parallel_download_threshold:
+            return await self._download_chunks_concurrently(blob)
+        return await self._run_blocking(blob.download_as_bytes)
+    
+    async def _download_chunks_concurrently(self, blob: storage.Blob) -> bytes:
+        """Download a blob as concurrent byte-range requests pinned to its current generation."""
+        chunk_size = self.config.parallel_chunk_size
+        semaphore = asyncio.Semaphore(self.config.parallel_download_workers)
+        
+        async def download_range(start: int) -> bytes:
+            end = min(start + chunk_size, blob.size) - 1
+            async with semaphore:
+                return await self._run_blocking(
+                    blob.download_as_bytes,
+                    start=start,
+                    end=end,
+                    if_generation_match=blob.generation,
+                    checksum=None
+                )
+        
+        chunks = await asyncio.gather(
+            *(download_range(start) for start in range(0, blob.size, chunk_size))
+        )
+        logger.debug(f"Downloaded {blob.name} in {len(chunks)} parallel chunks")
+        return b"".join(chunks)
+    
     async def delete_file(self, blob_name: str) -> bool:
         """Delete a file from storage."""
         logger.debug(f"Attempting to delete file: {blob_name}")
         try:
             blob = self.bucket.blob(blob_name)
-            blob.delete()
+            await self._run_blocking(blob.delete)
             logger.info(f"Successfully deleted file: {blob_name}")
             return True
             
@@ -243,7 +377,7 @@ class StorageService:
         logger.debug(f"Getting metadata for blob: {blob_name}")
         try:
             blob = self.bucket.blob(blob_name)
-            blob.reload()
+            await self._run_blocking(blob.reload)
             logger.debug(f"Successfully retrieved metadata for blob: {blob_name}")
             
             return {
@@ -279,7 +413,7 @@ class StorageService:
                     prefix = f"{folder}/{prefix}"
             
             logger.debug(f"Listing blobs with prefix: {prefix}")
-            blobs = self.bucket.list_blobs(prefix=prefix)
+            blobs = await self._list_blobs(prefix, USER_FILE_FIELDS)
             
             files = []
             for blob in blobs:
@@ -308,13 +442,26 @@ class StorageService:
             cutoff_date = datetime.utcnow() - timedelta(days=days_old)
             temp_prefix = f"{self.config.temp_folder}/"
             
-            blobs = self.bucket.list_blobs(prefix=temp_prefix)
-            deleted_count = 0
+            blobs = await self._list_blobs(temp_prefix, TEMP_FILE_FIELDS)
+            to_delete = [blob for blob in blobs if blob.time_created < cutoff_date]
+            
+            # Delete in batched requests, running the batches concurrently
+            batches = [
+                to_delete[i:i + DELETE_BATCH_SIZE]
+                for i in range(0, len(to_delete), DELETE_BATCH_SIZE)
+            ]
+            results = await asyncio.gather(
+                *(self._run_blocking(self._delete_blob_batch, batch) for batch in batches),
+                return_exceptions=True
+            )
             
-            for blob in blobs:
-                if blob.time_created < cutoff_date:
-                    blob.delete()
-                    deleted_count += 1
+            deleted_count = 0
+            for batch, result in zip(batches, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to delete temp file batch of {len(batch)}: {result}")
+                    continue
+                deleted_count += len(batch)
+                for blob in batch:
                     logger.info(f"Deleted old temp file: {blob.name}")
             
             return deleted_count
@@ -336,36 +483,32 @@ class StorageService:
         """
         logger.debug(f"Moving file from {source_blob_name} to {dest_blob_name}")
         try:
-            # Get source blob
-            source_blob = self.bucket.blob(source_blob_name)
-            
-            # Check if source exists
-            logger.debug(f"Checking if source blob exists: {source_blob_name}")
-            if not source_blob.exists():
+            # Get source blob (also checks it exists)
+            source_blob = await self._run_blocking(self.bucket.get_blob, source_blob_name)
+            if source_blob is None:
                 logger.error(f"Source blob not found: {source_blob_name}")
                 return False
-            logger.debug(f"Source blob exists, proceeding with copy")
-            
-            # Copy to destination
-            dest_blob = self.bucket.blob(dest_blob_name)
-            dest_blob.content_type = source_blob.content_type
-            
-            # Copy the blob
-            logger.debug(f"Downloading source blob content")
-            source_content = source_blob.download_as_bytes()
-            logger.debug(f"Uploading to destination blob: {dest_blob_name}")
-            dest_blob.upload_from_string(
-                source_content,
-                content_type=source_blob.content_type
-            )
             
-            # Copy metadata if present
-            if source_blob.metadata:
-                dest_blob.metadata = source_blob.metadata
-                dest_blob.patch()
+            # Copy server-side; content type and metadata are carried over by GCS
+            if source_blob.size and source_blob.size > MAX_SINGLE_COPY_SIZE:
+                logger.debug(f"Rewriting large blob ({source_blob.size} bytes) to {dest_blob_name}")
+                dest_blob = self.bucket.blob(dest_blob_name)
+                token = None
+                while True:
+                    token, bytes_rewritten, total_bytes = await self._run_blocking(
+                        dest_blob.rewrite, source_blob, token=token
+                    )
+                    logger.debug(f"Rewrote {bytes_rewritten}/{total_bytes} bytes")
+                    if token is None:
+                        break
+            else:
+                logger.debug(f"Copying blob to {dest_blob_name}")
+                await self._run_blocking(
+                    self.bucket.copy_blob, source_blob, self.bucket, new_name=dest_blob_name
+                )
             
             # Delete source blob
-            source_blob.delete()
+            await self._run_blocking(source_blob.delete)
             
             logger.info(f"Successfully moved file from {source_blob_name} to {dest_blob_name}")
             return True
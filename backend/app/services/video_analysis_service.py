@@ -4,39 +4,111 @@ This service provides the same functionality as analyze_video.py but integrated
 """
 
 import os
-import json
+import orjson
 import logging
 import asyncio
 import time
-import cv2
+import random
 import tempfile
+import mimetypes
 import aiofiles
 import uuid as uuid_lib
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Union
 from datetime import datetime
-from dotenv import load_dotenv
-from sqlalchemy import select
+from fractions import Fraction
+from string import Template
+from app.config.settings import load_environment
+from sqlalchemy import select, update
+from google.api_core import exceptions as gax
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 logger = logging.getLogger(__name__)
 
-from app.core.providers.vision_gemini import GeminiVisionProvider
+from app.core.providers.vision_gemini import GeminiVisionProvider, get_api_key
 from app.database.config import AsyncSessionLocal
 from app.models.video import Video
 from app.models.video_analysis import VideoAnalysis, AnalysisStatus
 from app.services.storage_service import get_storage_service
 
+# Coaching prompt is static, so it is read from disk once and shared across analyses
+COACHING_PROMPT_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "prompts",
+    "video_analysis_swing_coaching.txt"
+)
+_prompt_cache: Optional[Template] = None
+_prompt_lock = asyncio.Lock()
+
+# Probe results for files on disk, keyed by (path, mtime_ns, size) so a rewritten file is re-probed
+PROBE_CACHE_SIZE = 128
+_probe_cache: "OrderedDict[Tuple[str, int, int], Tuple[float, int, float]]" = OrderedDict()
+
+# Analysis retry policy: only transient upstream failures are retried
+ANALYSIS_MAX_RETRIES = 3
+ANALYSIS_TIMEOUT_SECONDS = 300
+ANALYSIS_MAX_BACKOFF_SECONDS = 30
+TRANSIENT_ANALYSIS_ERRORS = (
+    gax.DeadlineExceeded,
+    gax.ServiceUnavailable,
+    gax.ResourceExhausted,
+    gax.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+# Background analysis worker pool: at most ANALYSIS_CONCURRENCY analyses run at once
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "256"))
+
 
 class AnalysisOrchestrator:
     """Orchestrates the video analysis workflow for UUID-based flow"""
     
-    def __init__(self):
-        self.vision_service = CleanVideoAnalysisService()
-        self.storage_service = get_storage_service()
+    def __init__(self, vision_service: Optional["CleanVideoAnalysisService"] = None, storage_service=None):
+        self.vision_service = vision_service if vision_service is not None else CleanVideoAnalysisService()
+        if storage_service is None:
+            try:
+                storage_service = get_storage_service()
+            except Exception as e:
+                logger.warning(f"Storage service not available: {e}")
+        self.storage_service = storage_service
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=ANALYSIS_QUEUE_SIZE)
+        self._pending = set()  # UUIDs queued or being analyzed
+        self._workers = []
         logger.info("AnalysisOrchestrator initialized")
     
+    def start_workers(self, concurrency: int = ANALYSIS_CONCURRENCY):
+        """Spawn the long-lived background analysis workers (idempotent)"""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._analysis_worker(i), name=f"analysis-worker-{i}")
+            for i in range(concurrency)
+        ]
+        logger.info(f"Started {concurrency} background analysis workers")
+    
+    async def stop_workers(self):
+        """Cancel the background analysis workers"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def _analysis_worker(self, worker_id: int):
+        """Consume queued analysis UUIDs one at a time"""
+        while True:
+            uuid = await self._queue.get()
+            try:
+                await self.analyze_video_background(uuid)
+            except Exception as e:
+                logger.error(f"Analysis worker {worker_id} failed for UUID {uuid}: {e}")
+            finally:
+                self._pending.discard(uuid)
+                self._queue.task_done()
+    
     async def create_analysis_entry(self, user_id: int) -> str:
         """Create a new analysis entry and return UUID"""
         async with AsyncSessionLocal() as session:
@@ -67,9 +139,26 @@ class AnalysisOrchestrator:
             await session.commit()
             return True
     
-    async def start_background_analysis(self, uuid: str):
-        """Start background analysis task"""
-        asyncio.create_task(self.analyze_video_background(uuid))
+    async def start_background_analysis(self, uuid: str) -> bool:
+        """
+        Queue a background analysis for the worker pool.
+        
+        Duplicate submissions of a queued/running UUID are ignored.
+        Returns False only if the queue is full.
+        """
+        if uuid in self._pending:
+            logger.info(f"Analysis already queued for UUID: {uuid}")
+            return True
+        
+        self.start_workers()
+        try:
+            self._queue.put_nowait(uuid)
+        except asyncio.QueueFull:
+            logger.error(f"Analysis queue full, rejecting UUID: {uuid}")
+            return False
+        
+        self._pending.add(uuid)
+        return True
     
     async def analyze_video_background(self, uuid: str):
         """
@@ -82,30 +171,29 @@ class AnalysisOrchestrator:
         4. On success: move to processed folder, update DB
         5. On failure: update status and error description
         """
-        temp_video_path = None
-        
         try:
             logger.info(f"Starting background analysis for UUID: {uuid}")
             
-            # Get analysis record
+            # Mark as PROCESSING and fetch the fields we need in one round-trip
             async with AsyncSessionLocal() as session:
-                result = await session.execute(
-                    select(VideoAnalysis).filter(VideoAnalysis.uuid == uuid_lib.UUID(uuid))
+                stmt = (
+                    update(VideoAnalysis)
+                    .where(VideoAnalysis.uuid == uuid_lib.UUID(uuid))
+                    .values(
+                        status=AnalysisStatus.PROCESSING,
+                        processing_started_at=datetime.utcnow()
+                    )
+                    .returning(VideoAnalysis.originalVideoURL, VideoAnalysis.user_id, VideoAnalysis.id)
+                    .execution_options(synchronize_session=False)
                 )
-                analysis = result.scalar_one_or_none()
+                row = (await session.execute(stmt)).one_or_none()
+                await session.commit()
                 
-                if not analysis:
+                if row is None:
                     logger.error(f"Analysis not found: {uuid}")
                     return
                 
-                # Update status to PROCESSING
-                analysis.status = AnalysisStatus.PROCESSING
-                analysis.processing_started_at = datetime.utcnow()
-                await session.commit()
-                
-                original_video_url = analysis.originalVideoURL
-                user_id = analysis.user_id
-                analysis_id = analysis.id
+                original_video_url, user_id, analysis_id = row
             
             # Extract blob name from URL
             if original_video_url.startswith("gcs://"):
@@ -117,27 +205,41 @@ class AnalysisOrchestrator:
             else:
                 source_blob_name = original_video_url
             
-            # Download video from GCS
+            if self.storage_service is None:
+                raise RuntimeError("Storage service not available")
+            
+            # Download video from GCS, loading the prompt while the download is in flight
             logger.info(f"Downloading video from GCS: {source_blob_name}")
-            temp_video_path = await self.vision_service.download_video_from_storage(source_blob_name)
+            video_bytes, prompt_template = await asyncio.gather(
+                self.vision_service.download_video_bytes(source_blob_name),
+                self.vision_service.load_prompt_template()
+            )
+            mime_type = mimetypes.guess_type(source_blob_name)[0] or "video/mp4"
             
-            # Analyze video with retry logic
-            max_retries = 3
+            # Analyze video, retrying transient failures; permanent errors fail fast
             analysis_result = None
             
-            for attempt in range(max_retries):
+            for attempt in range(ANALYSIS_MAX_RETRIES):
                 try:
-                    logger.info(f"Analyzing video, attempt {attempt + 1}/{max_retries}")
-                    analysis_result = await self.vision_service.analyze_video_file(temp_video_path)
+                    logger.info(f"Analyzing video, attempt {attempt + 1}/{ANALYSIS_MAX_RETRIES}")
+                    analysis_result = await asyncio.wait_for(
+                        self.vision_service.analyze_video_file(
+                            video_bytes, mime_type=mime_type, prompt_template=prompt_template
+                        ),
+                        timeout=ANALYSIS_TIMEOUT_SECONDS
+                    )
                     break
-                except Exception as e:
-                    logger.error(f"Analysis attempt {attempt + 1} failed: {e}")
-                    if attempt == max_retries - 1:
+                except TRANSIENT_ANALYSIS_ERRORS as e:
+                    logger.error(f"Analysis attempt {attempt + 1} failed with transient error: {e!r}")
+                    if attempt == ANALYSIS_MAX_RETRIES - 1:
                         raise
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                    # Exponential backoff with jitter
+                    await asyncio.sleep(min(ANALYSIS_MAX_BACKOFF_SECONDS, 2 ** attempt + random.random()))
             
             if not analysis_result:
                 raise RuntimeError("Failed to analyze video after all retries")
+            if "error" in analysis_result:
+                raise RuntimeError(f"Video analysis failed: {analysis_result['error']}")
             
             # Move video from processing to processed folder
             dest_blob_name = f"processed/{uuid}_original"
@@ -154,7 +256,6 @@ class AnalysisOrchestrator:
                     analysis.originalVideoURL = f"gcs://{self.storage_service.config.bucket_name}/{dest_blob_name}"
                     analysis.processedVideoURL = analysis.originalVideoURL  # Same for now
                     analysis.analysisJSON = analysis_result
-                    analysis.ai_analysis = analysis_result  # Keep legacy field updated
                     analysis.video_duration = analysis_result.get('_metadata', {}).get('video_duration', 0)
                     analysis.analysis_confidence = 0.9
                     analysis.status = AnalysisStatus.COMPLETED  # Use COMPLETED which exists in DB
@@ -179,15 +280,6 @@ class AnalysisOrchestrator:
                     analysis.error_message = str(e)
                     analysis.processing_completed_at = datetime.utcnow()
                     await session.commit()
-        
-        finally:
-            # Clean up temporary file
-            if temp_video_path and os.path.exists(temp_video_path):
-                try:
-                    os.unlink(temp_video_path)
-                    logger.info(f"Cleaned up temporary file: {temp_video_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to clean up temp file: {e}")
 
 
 class CleanVideoAnalysisService:
@@ -203,65 +295,151 @@ class CleanVideoAnalysisService:
             logger.warning(f"Storage service not available: {e}")
             self.storage_service = None
         
+        # Resolved once so health checks don't re-read the environment
+        self._ready = get_api_key() is not None
+        
         logger.info(f"Clean VideoAnalysisService initialized with model: {self.model_name}")
     
-    async def load_prompt(self) -> str:
-        """Load the coaching prompt template (exact same as analyze_video.py)"""
+    def is_ready(self) -> bool:
+        """Whether a Gemini API key was configured at init"""
+        return self._ready
+    
+    async def load_prompt_template(self) -> Template:
+        """Load the coaching prompt as a $-placeholder Template, parsing the file only on first use"""
+        global _prompt_cache
         try:
-            prompt_path = os.path.join(
-                os.path.dirname(__file__), 
-                "..",
-                "prompts", 
-                "video_analysis_swing_coaching.txt"
-            )
-            
-            async with aiofiles.open(prompt_path, 'r') as f:
-                return await f.read()
+            async with _prompt_lock:
+                if _prompt_cache is None:
+                    async with aiofiles.open(COACHING_PROMPT_PATH, 'r') as f:
+                        _prompt_cache = Template(await f.read())
+                return _prompt_cache
                 
         except Exception as e:
             logger.error(f"Failed to load coaching prompt: {e}")
             raise RuntimeError(f"Failed to load coaching prompt: {e}")
     
-    async def analyze_video_file(self, video_path: str) -> Dict[str, Any]:
+    async def load_prompt(self) -> str:
+        """Load the raw coaching prompt text"""
+        return (await self.load_prompt_template()).template
+    
+    async def probe_video(self, video: Union[str, bytes]) -> Tuple[float, int, float]:
+        """Read fps, frame count and duration from the container header with ffprobe"""
+        if isinstance(video, str):
+            return await self._probe_cached(video)
+        
+        try:
+            return await self._run_ffprobe("pipe:0", video)
+        except (FileNotFoundError, RuntimeError) as e:
+            # Containers with the moov atom at the end can't always be probed from a pipe
+            logger.warning(f"Could not probe piped video ({e}), retrying from a temp file")
+        
+        with tempfile.NamedTemporaryFile(suffix=".mp4") as tmp:
+            def write_video():
+                tmp.write(video)
+                tmp.flush()
+            await asyncio.to_thread(write_video)
+            return await self._probe_video_path(tmp.name)
+    
+    async def _probe_cached(self, video_path: str) -> Tuple[float, int, float]:
+        """Probe a video file on disk, reusing the result while the file is unchanged"""
+        stat = await asyncio.to_thread(os.stat, video_path)
+        key = (os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+        if key in _probe_cache:
+            _probe_cache.move_to_end(key)
+            return _probe_cache[key]
+        
+        result = await self._probe_video_path(video_path)
+        _probe_cache[key] = result
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+        return result
+    
+    async def _probe_video_path(self, video_path: str) -> Tuple[float, int, float]:
+        """Probe a video file on disk, falling back to OpenCV without ffprobe"""
+        try:
+            return await self._run_ffprobe(video_path)
+        except FileNotFoundError:
+            logger.warning("ffprobe not found, falling back to OpenCV for video properties")
+            return await asyncio.to_thread(self._probe_video_cv2, video_path)
+    
+    async def _run_ffprobe(self, source: str, data: Optional[bytes] = None) -> Tuple[float, int, float]:
+        """Run ffprobe on a path (or pipe:0 with data on stdin) and parse the first video stream"""
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=r_frame_rate,nb_frames,duration",
+            "-of", "json",
+            source,
+            stdin=asyncio.subprocess.PIPE if data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate(data)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffprobe failed: {stderr.decode(errors='replace').strip()}")
+        
+        streams = orjson.loads(stdout).get("streams") or []
+        if not streams:
+            raise RuntimeError("No video stream found")
+        stream = streams[0]
+        
+        rate = Fraction(stream.get("r_frame_rate") or "0/1")
+        fps = float(rate) if rate.denominator else 0.0
+        stream_duration = stream.get("duration")
+        nb_frames = stream.get("nb_frames")
+        if nb_frames and nb_frames.isdigit():
+            frame_count = int(nb_frames)
+        else:
+            frame_count = int(round(float(stream_duration or 0) * fps))
+        duration = float(stream_duration) if stream_duration else (frame_count / fps if fps > 0 else 0)
+        return fps, frame_count, duration
+    
+    def _probe_video_cv2(self, video_path: str) -> Tuple[float, int, float]:
+        """Fallback video probe for hosts without ffprobe"""
+        import cv2
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        duration = frame_count / fps if fps > 0 else 0
+        return fps, frame_count, duration
+    
+    async def analyze_video_file(
+        self,
+        video: Union[str, bytes],
+        mime_type: str = "video/mp4",
+        prompt_template: Optional[Template] = None
+    ) -> Dict[str, Any]:
         """
-        Analyze video file - exact same logic as analyze_video.py but returns parsed JSON
+        Analyze a video file path or in-memory video bytes - same logic as analyze_video.py but returns parsed JSON.
+        Pass a preloaded prompt_template to skip loading the coaching prompt.
         """
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"Video file not found: {video_path}")
-        
-        logger.info(f"Analyzing video: {video_path}")
+        if isinstance(video, str):
+            if not os.path.exists(video):
+                raise FileNotFoundError(f"Video file not found: {video}")
+            logger.info(f"Analyzing video: {video}")
+        else:
+            logger.info(f"Analyzing in-memory video ({len(video)} bytes)")
         
         try:
-            # Get video properties (exact same as analyze_video.py)
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = frame_count / fps if fps > 0 else 0
-            cap.release()
+            # Get video properties from the container header
+            fps, frame_count, duration = await self.probe_video(video)
             
             logger.info(f"Video properties: Duration={duration:.2f}s, FPS={fps:.1f}, Frames={frame_count}")
             
-            # Load prompt (exact same as analyze_video.py)
-            logger.info("Loading coaching prompt...")
-            coaching_prompt = await self.load_prompt()
-            
-            # Format prompt (exact same as analyze_video.py)
-            try:
-                escaped_prompt = coaching_prompt.replace('{', '{{').replace('}', '}}')
-                escaped_prompt = escaped_prompt.replace('{{duration}}', '{duration}')
-                escaped_prompt = escaped_prompt.replace('{{frame_rate}}', '{frame_rate}')
-                
-                enhanced_prompt = escaped_prompt.format(
-                    duration=f"{duration:.2f}",
-                    frame_rate=f"{fps:.1f}"
-                )
-                logger.info(f"Prompt formatted successfully ({len(enhanced_prompt)} chars)")
-            except KeyError as ke:
-                logger.error(f"KeyError during prompt formatting: {ke}")
-                raise RuntimeError(f"Prompt formatting failed: {ke}")
+            # Fill the prompt's $duration / $frame_rate placeholders
+            if prompt_template is None:
+                prompt_template = await self.load_prompt_template()
+            enhanced_prompt = prompt_template.safe_substitute(
+                duration=f"{duration:.2f}",
+                frame_rate=f"{fps:.1f}"
+            )
+            logger.info(f"Prompt formatted successfully ({len(enhanced_prompt)} chars)")
             
             # Analyze video using the vision provider
-            analysis_result = await self.vision_provider.analyze_video(video_path, enhanced_prompt)
+            analysis_result = await self.vision_provider.analyze_video(video, enhanced_prompt, mime_type=mime_type)
+            if "error" in analysis_result:
+                raise RuntimeError(f"Gemini video analysis failed: {analysis_result['error']}")
             
             api_elapsed = analysis_result.get('_metadata', {}).get('analysis_duration', 0)
             logger.info(f"Gemini response received in {api_elapsed:.1f}s")
@@ -276,26 +454,16 @@ class CleanVideoAnalysisService:
             logger.error(f"Video analysis failed: {e}")
             raise
     
-    async def download_video_from_storage(self, video_blob_name: str) -> str:
-        """Download video from storage to temporary file"""
+    async def download_video_bytes(self, video_blob_name: str) -> bytes:
+        """Download video from storage straight into memory"""
         if not self.storage_service:
             raise RuntimeError("Storage service not available")
         
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        temp_path = temp_file.name
-        temp_file.close()
-        
         try:
-            # Get blob and download
-            blob = self.storage_service.bucket.blob(video_blob_name)
-            blob.download_to_filename(temp_path)
-            logger.info(f"Downloaded video from storage: {video_blob_name} -> {temp_path}")
-            return temp_path
+            video_bytes = await self.storage_service.download_bytes(video_blob_name)
+            logger.info(f"Downloaded video from storage: {video_blob_name} ({len(video_bytes)} bytes)")
+            return video_bytes
         except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
             logger.error(f"Failed to download video {video_blob_name}: {e}")
             raise
     
@@ -304,7 +472,6 @@ class CleanVideoAnalysisService:
         Complete analysis flow: get video from DB, download from storage, analyze, save results
         """
         analysis_id = None
-        temp_video_path = None
         
         try:
             # Use database session
@@ -342,17 +509,23 @@ class CleanVideoAnalysisService:
                 
             logger.info(f"Starting analysis for video_id={video_id}, user_id={user_id}, analysis_id={analysis_id}")
             
-            # Download video from storage
-            temp_video_path = await self.download_video_from_storage(video_blob_name)
+            # Download video from storage, loading the prompt while the download is in flight
+            video_bytes, prompt_template = await asyncio.gather(
+                self.download_video_bytes(video_blob_name),
+                self.load_prompt_template()
+            )
+            mime_type = mimetypes.guess_type(video_blob_name)[0] or "video/mp4"
             
             # Analyze video (using exact analyze_video.py logic)
-            analysis_result = await self.analyze_video_file(temp_video_path)
+            analysis_result = await self.analyze_video_file(
+                video_bytes, mime_type=mime_type, prompt_template=prompt_template
+            )
             
             # Save results to database
             async with AsyncSessionLocal() as session:
                 analysis = await session.get(VideoAnalysis, analysis_id)
                 if analysis:
-                    analysis.ai_analysis = analysis_result
+                    analysis.analysisJSON = analysis_result
                     analysis.video_duration = analysis_result.get('_metadata', {}).get('video_duration', 0)
                     analysis.analysis_confidence = 0.9  # High confidence since we got valid JSON
                     analysis.mark_as_completed()
@@ -380,19 +553,31 @@ class CleanVideoAnalysisService:
                     logger.error(f"Failed to update analysis record: {db_error}")
             
             raise
-        finally:
-            # Clean up temporary video file
-            if temp_video_path and os.path.exists(temp_video_path):
-                os.unlink(temp_video_path)
-                logger.info("Cleaned up temporary video file")
 
 
-# Service instance
+# Service instances (created once at app startup via init_services)
 _service_instance = None
+_orchestrator_instance = None
+
+def init_services():
+    """Create the shared analysis service and orchestrator singletons"""
+    global _service_instance, _orchestrator_instance
+    if _service_instance is None:
+        _service_instance = CleanVideoAnalysisService()
+    if _orchestrator_instance is None:
+        _orchestrator_instance = AnalysisOrchestrator(
+            vision_service=_service_instance,
+            storage_service=_service_instance.storage_service
+        )
 
 def get_clean_video_analysis_service() -> CleanVideoAnalysisService:
     """Get singleton instance of the clean video analysis service"""
-    global _service_instance
     if _service_instance is None:
-        _service_instance = CleanVideoAnalysisService()
-    return _service_instance
\ No newline at end of file
+        init_services()
+    return _service_instance
+
+def get_analysis_orchestrator() -> AnalysisOrchestrator:
+    """Get singleton instance of the analysis orchestrator"""
+    if _orchestrator_instance is None:
+        init_services()
+    return _orchestrator_instance
\ No newline at end of file
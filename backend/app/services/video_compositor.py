@@ -8,12 +8,82 @@ import numpy as np
 import os
 import logging
 import asyncio
+import queue
+import threading
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _layout_text(text: str, font: int, font_scale: float, max_width: int, thickness: int = 1) -> Tuple[Tuple[str, ...], int]:
+    """
+    Wrap text to fit within max_width pixels.
+    
+    Tips stay on screen for many frames, so the measured layout is cached
+    instead of re-running cv2.getTextSize for every word on every frame.
+    
+    Returns:
+        The wrapped lines and the pixel width of the widest one
+    """
+    words = text.split(' ')
+    lines = []
+    current_line = []
+    
+    for word in words:
+        # Test adding this word to current line
+        test_line = ' '.join(current_line + [word])
+        text_size = cv2.getTextSize(test_line, font, font_scale, thickness)[0]
+        
+        if text_size[0] <= max_width:
+            # Word fits, add it
+            current_line.append(word)
+        else:
+            # Word doesn't fit, start new line
+            if current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+            else:
+                # Single word is too long, add it anyway
+                lines.append(word)
+    
+    # Add remaining words
+    if current_line:
+        lines.append(' '.join(current_line))
+    
+    max_line_width = max((cv2.getTextSize(line, font, font_scale, thickness)[0][0] for line in lines), default=0)
+    return tuple(lines), max_line_width
+
+
+# Overlay text styles (BGR colors)
+OVERLAY_FONT = cv2.FONT_HERSHEY_SIMPLEX
+OVERLAY_TEXT_COLOR = (255, 255, 255)
+BADGE_BG_COLOR = (50, 50, 50)
+PHASE_TEXT_SCALE = 0.7  # Bigger for better readability
+QUALITY_TEXT_SCALE = 0.5  # 30% smaller as requested
+TIP_TEXT_SCALE = 0.4  # 20% smaller
+TIP_TEXT_THICKNESS = 1
+TIP_LINE_HEIGHT = 20
+TIP_MARGIN_X = 20
+TIP_MARGIN_BOTTOM = 20
+TIP_PRIORITY_COLORS = {
+    'high': (0, 0, 255),     # Red
+    'medium': (0, 165, 255)  # Orange
+}
+TIP_DEFAULT_COLOR = (255, 255, 255)  # White
+
+# Frame rate assumed when the source video doesn't report one
+DEFAULT_FPS = 30.0
+
+# Frames buffered between the decode, overlay and encode stages
+PIPELINE_QUEUE_SIZE = 8
+
+# Rows y1:y2 of a pre-rendered overlay: output = frame * gain + offset
+OverlayBand = Tuple[int, int, np.ndarray, np.ndarray]
+
+
 class VideoCompositor:
     """Service for compositing golf swing videos with pose overlays and text."""
     
@@ -74,7 +144,8 @@ class VideoCompositor:
                 raise ValueError(f"Cannot open video file: {input_video_path}")
             
             # Get video properties
-            fps = cap.get(cv2.CAP_PROP_FPS)
+            # Write at the source frame rate; some containers don't report one
+            fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -82,47 +153,22 @@ class VideoCompositor:
             logger.info(f"Video properties: {width}x{height}, {fps}fps, {total_frames} frames")
             
             # Create video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            
-            # Get pose landmarks data (handle None case)
-            pose_landmarks = pose_data.get('pose_landmarks', []) if pose_data else []
-            pose_by_frame = {landmark['frame_number']: landmark for landmark in pose_landmarks}
-            
-            # Process each frame
-            frame_number = 0
-            frames_processed = 0
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Calculate timestamp
-                timestamp = frame_number / fps
-                
-                # Skip pose skeleton drawing - only using text overlays
-                
-                # Determine current swing phase
-                current_phase = self._get_current_phase(timestamp, coaching_tips, swing_phases)
-                
-                # Add coaching text overlays with phase indicator and quality score
-                frame = self._add_coaching_text(frame, coaching_tips, timestamp, width, height, current_phase, quality_score)
-                
-                # Write frame
-                out.write(frame)
-                frames_processed += 1
-                
-                # Progress logging
-                if frames_processed % 30 == 0:  # Log every 30 frames
-                    progress = (frames_processed / total_frames) * 100
-                    logger.info(f"Compositing progress: {progress:.1f}% ({frames_processed}/{total_frames} frames)")
-                
-                frame_number += 1
-            
-            # Cleanup
-            cap.release()
-            out.release()
+            out = self._open_writer(output_path, fps, width, height)
+            
+            # Decode, draw and encode in a worker thread; OpenCV releases the GIL
+            # for the heavy parts, and the event loop stays free meanwhile.
+            # The worker releases cap and out itself once its threads are done,
+            # so cancelling this task only asks it to stop early.
+            stop = threading.Event()
+            try:
+                frames_processed = await asyncio.to_thread(
+                    self._render_frames,
+                    cap, out, coaching_tips, swing_phases, quality_score,
+                    fps, width, height, total_frames, stop
+                )
+            except asyncio.CancelledError:
+                stop.set()
+                raise
             
             # Verify output file
             if not os.path.exists(output_path):
@@ -157,6 +203,214 @@ class VideoCompositor:
                 "output_path": output_path
             }
     
+    def _open_writer(self, output_path: str, fps: float, width: int, height: int) -> cv2.VideoWriter:
+        """
+        Open the output writer, preferring a hardware H.264 encoder.
+        
+        FFmpeg only has hardware encoders (VideoToolbox, NVENC, QSV, VAAPI) for
+        H.264 and newer codecs, so acceleration is requested with the avc1 fourcc.
+        When no H.264 encoder can be opened, the software MPEG-4 writer is used.
+        """
+        out = cv2.VideoWriter(
+            output_path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'), fps, (width, height),
+            [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        if out.isOpened():
+            accel = int(out.get(cv2.VIDEOWRITER_PROP_HW_ACCELERATION))
+            logger.info(f"Video writer opened with H.264 ({'hardware' if accel != cv2.VIDEO_ACCELERATION_NONE else 'software'} encoding)")
+            return out
+        
+        logger.info("No H.264 encoder available, falling back to software MPEG-4 writer")
+        return cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    
+    def _render_frames(
+        self,
+        cap: cv2.VideoCapture,
+        out: cv2.VideoWriter,
+        coaching_tips: List[Dict[str, Any]],
+        swing_phases: Optional[Dict[str, Any]],
+        quality_score: Optional[int],
+        fps: float,
+        width: int,
+        height: int,
+        total_frames: int,
+        stop: threading.Event
+    ) -> int:
+        """
+        Overlay every frame of cap and write it to out.
+        
+        Decoding and encoding run on their own threads, connected to the
+        overlay loop by bounded queues, so the three stages overlap instead
+        of taking turns. Setting stop ends the render early. cap and out are
+        released here, only after both threads have finished with them.
+        
+        Returns:
+            Number of frames written
+        """
+        try:
+            return self._run_pipeline(
+                cap, out, coaching_tips, swing_phases, quality_score,
+                fps, width, height, total_frames, stop
+            )
+        finally:
+            # Cleanup
+            cap.release()
+            out.release()
+    
+    def _run_pipeline(
+        self,
+        cap: cv2.VideoCapture,
+        out: cv2.VideoWriter,
+        coaching_tips: List[Dict[str, Any]],
+        swing_phases: Optional[Dict[str, Any]],
+        quality_score: Optional[int],
+        fps: float,
+        width: int,
+        height: int,
+        total_frames: int,
+        stop: threading.Event
+    ) -> int:
+        """Run the reader, overlay loop and writer; returns once both threads have exited."""
+        frame_number = 0
+        frames_processed = 0
+        
+        # The overlay only changes when the phase or the set of visible tips does,
+        # so each distinct state is rendered once and then applied to every frame
+        overlay_layers: Dict[Tuple[str, int], List[OverlayBand]] = {}
+        
+        # Tip start times and phase boundaries are fixed for the whole video, so parse them once.
+        # Tips stay visible once shown, so the visible set is always a prefix of the
+        # start-sorted tips and is identified by how many starts are <= the timestamp.
+        tip_starts = np.sort(np.array([float(tip.get('timestamp', 0)) for tip in coaching_tips], dtype=np.float64))
+        phase_ranges = self._parse_phase_ranges(swing_phases)
+        
+        decoded: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        encoded: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        writer_errors: List[Exception] = []
+        
+        reader = threading.Thread(target=self._read_frames, args=(cap, decoded, stop), name="compositor-reader", daemon=True)
+        writer = threading.Thread(target=self._write_frames, args=(out, encoded, writer_errors), name="compositor-writer", daemon=True)
+        reader.start()
+        writer.start()
+        
+        try:
+            while True:
+                frame = decoded.get()
+                if frame is None:
+                    break
+                
+                # Calculate timestamp
+                timestamp = frame_number / fps
+                
+                # Skip pose skeleton drawing - only using text overlays
+                
+                # Determine current swing phase
+                current_phase = self._phase_at(timestamp, phase_ranges)
+                
+                # Add coaching text overlays with phase indicator and quality score
+                visible_tips = int(np.searchsorted(tip_starts, timestamp, side='right'))
+                layer_key = (current_phase, visible_tips)
+                if layer_key not in overlay_layers:
+                    overlay_layers[layer_key] = self._render_overlay_layer(
+                        coaching_tips, timestamp, width, height, current_phase, quality_score
+                    )
+                frame = self._apply_overlay_layer(frame, overlay_layers[layer_key])
+                
+                # Hand frame to the writer
+                encoded.put(frame)
+                frames_processed += 1
+                
+                # Progress logging
+                if frames_processed % 30 == 0:  # Log every 30 frames
+                    progress = (frames_processed / total_frames) * 100
+                    logger.info(f"Compositing progress: {progress:.1f}% ({frames_processed}/{total_frames} frames)")
+                
+                frame_number += 1
+        finally:
+            # Unblock the reader if we stopped early, then flush the writer
+            stop.set()
+            while reader.is_alive():
+                try:
+                    decoded.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            encoded.put(None)
+            writer.join()
+        
+        if writer_errors:
+            raise writer_errors[0]
+        
+        return frames_processed
+    
+    def _read_frames(self, cap: cv2.VideoCapture, decoded: queue.Queue, stop: threading.Event):
+        """Decode frames into the queue, ending with None."""
+        try:
+            while not stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                decoded.put(frame)
+        finally:
+            decoded.put(None)
+    
+    def _write_frames(self, out: cv2.VideoWriter, encoded: queue.Queue, errors: List[Exception]):
+        """Encode frames from the queue until None; keeps draining after a failure so producers never block."""
+        while True:
+            frame = encoded.get()
+            if frame is None:
+                break
+            if errors:
+                continue
+            try:
+                out.write(frame)
+            except Exception as e:
+                errors.append(e)
+    
+    def _render_overlay_layer(
+        self,
+        coaching_tips: List[Dict[str, Any]],
+        timestamp: float,
+        width: int,
+        height: int,
+        current_phase: str = None,
+        quality_score: int = None
+    ) -> List[OverlayBand]:
+        """
+        Pre-render the coaching overlay for one visibility state.
+        
+        Every step of _add_coaching_text (translucent boxes, antialiased text)
+        maps a pixel value p to a * p + b, so drawing onto an all-black and an
+        all-white frame recovers a and b per pixel. Only the horizontal bands
+        the overlay touches are kept.
+        
+        Returns:
+            List of (y1, y2, gain, offset) bands; empty when nothing is drawn
+        """
+        black = self._add_coaching_text(
+            np.zeros((height, width, 3), dtype=np.uint8), coaching_tips, timestamp, width, height, current_phase, quality_score
+        )
+        white = self._add_coaching_text(
+            np.full((height, width, 3), 255, dtype=np.uint8), coaching_tips, timestamp, width, height, current_phase, quality_score
+        )
+        
+        offset = black.astype(np.float32)
+        gain = (white.astype(np.float32) - offset) / 255.0
+        
+        # Group touched rows into contiguous bands
+        touched = np.any((black != 0) | (white != 255), axis=(1, 2))
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], touched.astype(np.int8), [0]))))
+        
+        return [
+            (int(y1), int(y2), gain[y1:y2], offset[y1:y2])
+            for y1, y2 in zip(edges[::2], edges[1::2])
+        ]
+    
+    def _apply_overlay_layer(self, frame: np.ndarray, bands: List[OverlayBand]) -> np.ndarray:
+        """Blend a pre-rendered overlay layer onto frame in place."""
+        for y1, y2, gain, offset in bands:
+            frame[y1:y2] = (frame[y1:y2] * gain + offset + 0.5).astype(np.uint8)
+        return frame
+    
     def _draw_pose_skeleton(self, frame: np.ndarray, pose_data: Dict[str, Any], width: int, height: int) -> np.ndarray:
         """Draw MediaPipe pose skeleton on frame."""
         try:
@@ -229,32 +483,8 @@ class VideoCompositor:
     
     def _wrap_text(self, text: str, font, font_scale: float, max_width: int, thickness: int = 1) -> List[str]:
         """Wrap text to fit within max_width pixels."""
-        words = text.split(' ')
-        lines = []
-        current_line = []
-        
-        for word in words:
-            # Test adding this word to current line
-            test_line = ' '.join(current_line + [word])
-            text_size = cv2.getTextSize(test_line, font, font_scale, thickness)[0]
-            
-            if text_size[0] <= max_width:
-                # Word fits, add it
-                current_line.append(word)
-            else:
-                # Word doesn't fit, start new line
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    # Single word is too long, add it anyway
-                    lines.append(word)
-        
-        # Add remaining words
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        return lines
+        lines, _ = _layout_text(text, font, font_scale, max_width, thickness)
+        return list(lines)
 
     def _add_coaching_text(
         self, 
@@ -283,10 +513,10 @@ class VideoCompositor:
             if current_phase:
                 phase_text = f"Swing Phase: {current_phase.replace('_', ' ').title()}"
                 phase_y = 35
-                phase_scale = 0.7  # Bigger for better readability
+                phase_scale = PHASE_TEXT_SCALE
                 
                 # Phase indicator background
-                phase_size = cv2.getTextSize(phase_text, cv2.FONT_HERSHEY_SIMPLEX, phase_scale, 1)[0]
+                phase_size = cv2.getTextSize(phase_text, OVERLAY_FONT, phase_scale, 1)[0]
                 phase_bg_x1 = 10
                 phase_bg_y1 = phase_y - 20
                 phase_bg_x2 = 20 + phase_size[0] + 10
@@ -294,21 +524,21 @@ class VideoCompositor:
                 
                 # Draw phase background
                 overlay = frame.copy()
-                cv2.rectangle(overlay, (phase_bg_x1, phase_bg_y1), (phase_bg_x2, phase_bg_y2), (50, 50, 50), -1)
+                cv2.rectangle(overlay, (phase_bg_x1, phase_bg_y1), (phase_bg_x2, phase_bg_y2), BADGE_BG_COLOR, -1)
                 frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
                 
                 # Draw phase text (left aligned) with antialiasing
                 cv2.putText(frame, phase_text, (20, phase_y), 
-                           cv2.FONT_HERSHEY_SIMPLEX, phase_scale, (255, 255, 255), 2, cv2.LINE_AA)
+                           OVERLAY_FONT, phase_scale, OVERLAY_TEXT_COLOR, 2, cv2.LINE_AA)
             
             # Add quality score indicator (under swing phase, only during follow-through)
             if quality_score is not None and current_phase == "follow_through":
                 quality_text = f"Quality: {quality_score}"
-                quality_scale = 0.5  # 30% smaller as requested
+                quality_scale = QUALITY_TEXT_SCALE
                 quality_y = 65  # Position under the swing phase indicator
                 
                 # Quality indicator background
-                quality_size = cv2.getTextSize(quality_text, cv2.FONT_HERSHEY_SIMPLEX, quality_scale, 1)[0]
+                quality_size = cv2.getTextSize(quality_text, OVERLAY_FONT, quality_scale, 1)[0]
                 quality_bg_x1 = 10
                 quality_bg_y1 = quality_y - 15
                 quality_bg_x2 = 20 + quality_size[0] + 10
@@ -316,12 +546,12 @@ class VideoCompositor:
                 
                 # Draw quality background
                 overlay = frame.copy()
-                cv2.rectangle(overlay, (quality_bg_x1, quality_bg_y1), (quality_bg_x2, quality_bg_y2), (50, 50, 50), -1)
+                cv2.rectangle(overlay, (quality_bg_x1, quality_bg_y1), (quality_bg_x2, quality_bg_y2), BADGE_BG_COLOR, -1)
                 frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
                 
                 # Draw quality text (left aligned under phase) with antialiasing
                 cv2.putText(frame, quality_text, (20, quality_y), 
-                           cv2.FONT_HERSHEY_SIMPLEX, quality_scale, (255, 255, 255), 2, cv2.LINE_AA)
+                           OVERLAY_FONT, quality_scale, OVERLAY_TEXT_COLOR, 2, cv2.LINE_AA)
             
             # Draw active tips at bottom of screen (better readability)
             if active_tips:
@@ -329,21 +559,22 @@ class VideoCompositor:
                 active_tips.sort(key=lambda x: 0 if x.get('priority') == 'high' else 1)
                 
                 # Text rendering parameters
-                text_scale = 0.4  # 20% smaller
-                line_height = 20
-                margin_x = 20
-                margin_bottom = 20
+                text_scale = TIP_TEXT_SCALE
+                line_height = TIP_LINE_HEIGHT
+                margin_x = TIP_MARGIN_X
+                margin_bottom = TIP_MARGIN_BOTTOM
                 max_text_width = width - (margin_x * 2)  # Leave margins on both sides
-                font = cv2.FONT_HERSHEY_SIMPLEX
+                font = OVERLAY_FONT
                 
                 # Calculate total height needed for all tips
                 all_wrapped_lines = []
                 for tip in active_tips[:3]:  # Show max 3 tips at once
                     text = tip.get('coaching_tip') or tip.get('message', '') or tip.get('text', '')
                     if text:
-                        wrapped_lines = self._wrap_text(text, font, text_scale, max_text_width, 1)
+                        wrapped_lines, wrapped_width = _layout_text(text, font, text_scale, max_text_width, TIP_TEXT_THICKNESS)
                         all_wrapped_lines.append({
                             'lines': wrapped_lines,
+                            'width': wrapped_width,
                             'tip': tip,
                             'text': text
                         })
@@ -362,18 +593,11 @@ class VideoCompositor:
                     priority = tip.get('priority', 'normal')
                     
                     # Choose color based on priority
-                    if priority == 'high':
-                        color = (0, 0, 255)  # Red
-                        thickness = 1
-                    elif priority == 'medium':
-                        color = (0, 165, 255)  # Orange
-                        thickness = 1
-                    else:
-                        color = (255, 255, 255)  # White
-                        thickness = 1
+                    color = TIP_PRIORITY_COLORS.get(priority, TIP_DEFAULT_COLOR)
+                    thickness = TIP_TEXT_THICKNESS
                     
                     # Calculate background for all lines of this tip
-                    max_line_width = max(cv2.getTextSize(line, font, text_scale, thickness)[0][0] for line in lines)
+                    max_line_width = item['width']
                     bg_height = len(lines) * line_height + 5
                     
                     # Draw semi-transparent background for this tip
@@ -399,15 +623,20 @@ class VideoCompositor:
             logger.warning(f"Failed to add coaching text: {e}")
             return frame
     
-    def _get_current_phase(self, timestamp: float, coaching_tips: List[Dict[str, Any]], swing_phases: Dict = None) -> str:
-        """Determine the current swing phase based on timestamp and swing phase data."""
-        # If swing phases data is provided (from Gemini), use that
-        if swing_phases:
-            for phase_name, phase_data in swing_phases.items():
-                start_time = float(phase_data.get('start', 0))
-                end_time = float(phase_data.get('end', 0))
-                if start_time <= timestamp <= end_time:
-                    return phase_name
+    def _parse_phase_ranges(self, swing_phases: Dict = None) -> List[Tuple[str, float, float]]:
+        """Parse swing phase data (from Gemini) into (phase_name, start, end) ranges."""
+        if not swing_phases:
+            return []
+        return [
+            (phase_name, float(phase_data.get('start', 0)), float(phase_data.get('end', 0)))
+            for phase_name, phase_data in swing_phases.items()
+        ]
+    
+    def _phase_at(self, timestamp: float, phase_ranges: List[Tuple[str, float, float]]) -> str:
+        """Determine the current swing phase based on timestamp and parsed phase ranges."""
+        for phase_name, start_time, end_time in phase_ranges:
+            if start_time <= timestamp <= end_time:
+                return phase_name
         
         # Fallback to simple time-based approach
         # if timestamp <= 2.0:
@@ -7,22 +7,100 @@ import os
 import json
 import logging
 import asyncio
+import importlib.util
 import tempfile
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from app.database.config import get_db_session
+import aiofiles
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.storage import storage_config
+from app.database.config import AsyncSessionLocal, async_engine, get_db_session
 from app.models.video import Video
 from app.models.video_analysis import VideoAnalysis, AnalysisStatus
 from app.models.user import User
 from app.services.storage_service import get_storage_service
 from app.services.pose_analysis_service import get_pose_analysis_service
-from app.services.video_analysis_service import get_video_analysis_service
+from app.services.video_analysis_service import get_video_analysis_service, get_clean_video_analysis_service
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Progress entries kept per process; oldest are evicted past the size cap or TTL
+PROGRESS_MAX_ENTRIES = int(os.getenv("PIPELINE_PROGRESS_MAX_ENTRIES", "10000"))
+PROGRESS_TTL_SECONDS = int(os.getenv("PIPELINE_PROGRESS_TTL_SECONDS", "3600"))
+
+# Temp files older than this are removed by the janitor, which runs every TEMP_JANITOR_INTERVAL_SECONDS
+TEMP_FILE_MAX_AGE_SECONDS = int(os.getenv("PIPELINE_TEMP_FILE_MAX_AGE_SECONDS", "600"))
+TEMP_JANITOR_INTERVAL_SECONDS = int(os.getenv("PIPELINE_TEMP_JANITOR_INTERVAL_SECONDS", "300"))
+
+# How long a validate_pipeline_health result is served from memory
+HEALTH_CACHE_TTL_SECONDS = float(os.getenv("PIPELINE_HEALTH_CACHE_TTL_SECONDS", "10"))
+
+# Minimum age of the last successful SELECT 1 before the database is probed again
+DB_PROBE_TTL_SECONDS = float(os.getenv("PIPELINE_DB_PROBE_TTL_SECONDS", "30"))
+
+
+def _format_timestamp_ns(ts_ns: int) -> str:
+    """Format a time.time_ns() value as an ISO-8601 UTC timestamp."""
+    return datetime.fromtimestamp(ts_ns / 1e9, tz=timezone.utc).isoformat()
+
+
+class ProgressStore:
+    """Bounded pipeline progress map whose entries expire after a TTL."""
+    
+    def __init__(self, maxsize: int = PROGRESS_MAX_ENTRIES, ttl: float = PROGRESS_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def __setitem__(self, pipeline_id: str, progress_data: Dict[str, Any]):
+        self._entries.pop(pipeline_id, None)
+        self._entries[pipeline_id] = (time.monotonic() + self.ttl, progress_data)
+        self._evict()
+    
+    def get(self, pipeline_id: str, default: Any = None) -> Any:
+        entry = self._entries.get(pipeline_id)
+        if entry is None:
+            return default
+        expires_at, progress_data = entry
+        if expires_at <= time.monotonic():
+            del self._entries[pipeline_id]
+            return default
+        return progress_data
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _evict(self):
+        # Entries are kept in write order, so expired and overflow entries are at the front
+        now = time.monotonic()
+        while self._entries:
+            pipeline_id, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.maxsize:
+                break
+            del self._entries[pipeline_id]
+
+
+def _service_ready(service: Any, legacy_attr: str) -> bool:
+    """Use the service's is_ready() when it has one, else the attribute it exposes once initialized"""
+    if service is None:
+        return False
+    is_ready = getattr(service, 'is_ready', None)
+    if callable(is_ready):
+        return bool(is_ready())
+    return hasattr(service, legacy_attr)
+
 
 class VideoPipelineService:
     """
@@ -35,35 +113,52 @@ class VideoPipelineService:
     """
     
     def __init__(self):
-        # Initialize services with error handling
-        try:
-            self.storage_service = get_storage_service()
-        except Exception as e:
-            logger.warning(f"Storage service not available: {e}")
-            self.storage_service = None
-        
-        try:
-            self.pose_analysis_service = get_pose_analysis_service()
-        except Exception as e:
-            logger.warning(f"Pose analysis service not available: {e}")
-            self.pose_analysis_service = None
-        
-        try:
-            self.video_analysis_service = get_video_analysis_service()
-        except Exception as e:
-            logger.warning(f"Video analysis service not available: {e}")
-            self.video_analysis_service = None
+        # Initialize services concurrently with error handling; cold start costs the
+        # slowest service rather than the sum of all three
+        service_factories = {
+            'storage_service': ("Storage service", get_storage_service),
+            'pose_analysis_service': ("Pose analysis service", get_pose_analysis_service),
+            'video_analysis_service': ("Video analysis service", get_video_analysis_service),
+        }
+        with ThreadPoolExecutor(max_workers=len(service_factories)) as executor:
+            futures = {
+                attr: executor.submit(factory)
+                for attr, (_, factory) in service_factories.items()
+            }
+        for attr, future in futures.items():
+            try:
+                setattr(self, attr, future.result())
+            except Exception as e:
+                logger.warning(f"{service_factories[attr][0]} not available: {e}")
+                setattr(self, attr, None)
         
         self.temp_dir = tempfile.mkdtemp()
         
+        # Shared HTTP client so signed-URL downloads reuse pooled connections
+        self._http = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(60.0),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+        
         # Progress tracking
-        self.analysis_progress = {}
+        self.analysis_progress = ProgressStore()
+        
+        # (expires_at, result) of the last validate_pipeline_health run
+        self._health_cache: Optional[tuple] = None
+        
+        # Background task sweeping stale files out of temp_dir
+        self._janitor_task: Optional[asyncio.Task] = None
+        
+        # time.monotonic() of the last successful database probe
+        self._db_probed_at: Optional[float] = None
         
         logger.info("Video processing pipeline initialized")
     
     async def process_video_complete(self, video_path: str, user_id: int, 
                                    video_title: str = None, 
-                                   progress_callback: callable = None) -> Dict[str, Any]:
+                                   progress_callback: callable = None,
+                                   upload_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Complete video processing pipeline from local file to final results.
         
@@ -72,6 +167,8 @@ class VideoPipelineService:
             user_id: ID of the user uploading the video
             video_title: Optional title for the video
             progress_callback: Optional callback for progress updates
+            upload_result: Storage location of a video that is already uploaded;
+                skips the upload step
             
         Returns:
             Dict containing complete analysis results
@@ -83,12 +180,14 @@ class VideoPipelineService:
             logger.info(f"[{pipeline_id}] Step 1: Uploading video to storage")
             await self._update_progress(pipeline_id, 10, "Uploading video", progress_callback)
             
-            if self.storage_service is None:
+            if upload_result is not None:
+                logger.info(f"[{pipeline_id}] Video already in storage: {upload_result['blob_name']}")
+            elif self.storage_service is None:
                 # Mock upload for testing without storage
                 upload_result = {
                     'success': True,
                     'blob_name': f"mock_videos/{os.path.basename(video_path)}",
-                    'file_size': os.path.getsize(video_path),
+                    'file_size': await asyncio.to_thread(os.path.getsize, video_path),
                     'storage_url': f"mock://storage/{os.path.basename(video_path)}"
                 }
                 logger.warning("Using mock storage service")
@@ -97,65 +196,45 @@ class VideoPipelineService:
                 if not upload_result['success']:
                     raise Exception(f"Video upload failed: {upload_result.get('error')}")
             
-            # Step 2: Create video record in database
-            logger.info(f"[{pipeline_id}] Step 2: Creating video record")
-            await self._update_progress(pipeline_id, 20, "Creating video record", progress_callback)
-            
-            video_record = await self._create_video_record(
-                user_id, 
-                upload_result['blob_name'], 
-                upload_result['file_size'],
-                video_title
-            )
-            
-            # Step 3: Perform pose analysis
-            logger.info(f"[{pipeline_id}] Step 3: Analyzing pose with MediaPipe")
+            # Step 2: Perform pose analysis, loading the coaching prompt for step 3 meanwhile
+            logger.info(f"[{pipeline_id}] Step 2: Analyzing pose with MediaPipe")
             await self._update_progress(pipeline_id, 30, "Analyzing body pose", progress_callback)
             
-            if self.pose_analysis_service is None:
-                # Mock pose analysis for testing
-                pose_result = {
-                    'success': True,
-                    'analysis_metadata': {'total_frames': 100, 'video_duration': 3.3},
-                    'angle_analysis': {'spine_angle': {'setup': {'angle': 35.0, 'optimal': True}}},
-                    'biomechanical_efficiency': {'overall_score': 75.0}
-                }
-                logger.warning("Using mock pose analysis service")
-            else:
-                pose_result = await self.pose_analysis_service.analyze_video_pose(video_path)
+            pose_result, _ = await asyncio.gather(
+                self._run_pose_analysis(video_path),
+                get_clean_video_analysis_service().load_prompt()
+            )
             
-            # Step 4: Perform AI analysis with Gemini
-            logger.info(f"[{pipeline_id}] Step 4: Analyzing with Google Gemini AI")
+            # Step 3: Perform AI analysis with Gemini, informed by the pose result
+            logger.info(f"[{pipeline_id}] Step 3: Analyzing with Google Gemini AI")
             await self._update_progress(pipeline_id, 60, "Generating AI coaching feedback", progress_callback)
             
-            if self.video_analysis_service is None:
-                # Mock AI analysis for testing
-                ai_result = {
-                    'overall_score': 8,
-                    'confidence': 0.85,
-                    'duration': 3.3,
-                    'coaching_points': [
-                        {'category': 'backswing', 'issue': 'Good rotation', 'suggestion': 'Keep it up', 'priority': 'low'}
-                    ],
-                    'summary': 'Excellent swing mechanics with room for minor improvements'
-                }
-                logger.warning("Using mock AI analysis service")
-            else:
-                ai_result = await self._run_ai_analysis(video_path, pose_result)
+            ai_result = await self._run_ai_analysis(video_path, pose_result)
             
-            # Step 5: Store complete analysis in database
-            logger.info(f"[{pipeline_id}] Step 5: Storing analysis results")
+            # Step 4: Store video and analysis records in a single transaction, opened only
+            # after analysis so no pooled connection is held during the Gemini call
+            logger.info(f"[{pipeline_id}] Step 4: Storing video and analysis records")
             await self._update_progress(pipeline_id, 80, "Storing analysis results", progress_callback)
             
-            analysis_record = await self._store_complete_analysis(
-                video_record['id'], 
-                user_id, 
-                pose_result, 
-                ai_result
-            )
+            async with AsyncSessionLocal() as session:
+                video_record = await self._create_video_record(
+                    session,
+                    user_id, 
+                    upload_result['blob_name'], 
+                    upload_result['file_size'],
+                    video_title
+                )
+                analysis_record = await self._store_complete_analysis(
+                    session,
+                    video_record['id'], 
+                    user_id, 
+                    pose_result, 
+                    ai_result
+                )
+                await session.commit()
             
-            # Step 6: Generate final results
-            logger.info(f"[{pipeline_id}] Step 6: Generating final results")
+            # Step 5: Generate final results
+            logger.info(f"[{pipeline_id}] Step 5: Generating final results")
             await self._update_progress(pipeline_id, 100, "Analysis complete", progress_callback)
             
             final_results = await self._generate_final_results(
@@ -195,7 +274,7 @@ class VideoPipelineService:
             await self.storage_service.upload_file(video_path, blob_name)
             
             # Get file size
-            file_size = os.path.getsize(video_path)
+            file_size = await asyncio.to_thread(os.path.getsize, video_path)
             
             return {
                 'success': True,
@@ -211,54 +290,70 @@ class VideoPipelineService:
                 'error': str(e)
             }
     
-    async def _create_video_record(self, user_id: int, blob_name: str, 
+    async def _create_video_record(self, session: AsyncSession, user_id: int, blob_name: str, 
                                  file_size: int, video_title: str = None) -> Dict[str, Any]:
-        """Create video record in database."""
+        """Add video record to the session; the caller commits."""
         try:
-            async with get_db_session() as session:
-                # Create video record
-                video = Video(
-                    user_id=user_id,
-                    title=video_title or "Golf Swing Analysis",
-                    blob_name=blob_name,
-                    file_size=file_size,
-                    duration=0,  # Will be updated during analysis
-                    view_type="down_the_line",  # Default
-                    status="uploaded"
-                )
-                
-                session.add(video)
-                await session.commit()
-                await session.refresh(video)
-                
-                return {
-                    'id': video.id,
-                    'title': video.title,
-                    'blob_name': video.blob_name,
-                    'created_at': video.created_at.isoformat()
-                }
-                
+            # Create video record
+            video = Video(
+                user_id=user_id,
+                title=video_title or "Golf Swing Analysis",
+                blob_name=blob_name,
+                file_size=file_size,
+                duration=0,  # Will be updated during analysis
+                view_type="down_the_line",  # Default
+                status="uploaded"
+            )
+            
+            session.add(video)
+            # INSERT ... RETURNING populates id and created_at without a refresh
+            await session.flush()
+            
+            return {
+                'id': video.id,
+                'title': video.title,
+                'blob_name': video.blob_name,
+                'created_at': video.created_at.isoformat()
+            }
+            
         except Exception as e:
             logger.error(f"Database video record creation failed: {e}")
             raise
     
+    async def _run_pose_analysis(self, video_path: str) -> Dict[str, Any]:
+        """Run MediaPipe pose analysis, falling back to mock data when unavailable."""
+        if self.pose_analysis_service is None:
+            # Mock pose analysis for testing
+            logger.warning("Using mock pose analysis service")
+            return {
+                'success': True,
+                'analysis_metadata': {'total_frames': 100, 'video_duration': 3.3},
+                'angle_analysis': {'spine_angle': {'setup': {'angle': 35.0, 'optimal': True}}},
+                'biomechanical_efficiency': {'overall_score': 75.0}
+            }
+        
+        return await self.pose_analysis_service.analyze_video_pose(video_path)
+    
     async def _run_ai_analysis(self, video_path: str, pose_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Run AI analysis using the existing video analysis service."""
+        """Run AI analysis using the existing video analysis service, falling back to mock data when unavailable."""
+        if self.video_analysis_service is None:
+            # Mock AI analysis for testing
+            logger.warning("Using mock AI analysis service")
+            return {
+                'overall_score': 8,
+                'confidence': 0.85,
+                'duration': 3.3,
+                'coaching_points': [
+                    {'category': 'backswing', 'issue': 'Good rotation', 'suggestion': 'Keep it up', 'priority': 'low'}
+                ],
+                'summary': 'Excellent swing mechanics with room for minor improvements'
+            }
+        
         try:
-            # Load coaching prompt
-            prompt_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), 
-                "prompts", 
-                "video_analysis_swing_coaching.txt"
-            )
-            
-            with open(prompt_path, 'r') as f:
-                coaching_prompt = f.read()
-            
             # Use the existing video analysis service method
             ai_analysis = await self.video_analysis_service._analyze_with_gemini(
                 video_path, 
-                coaching_prompt, 
+                await get_clean_video_analysis_service().load_prompt(), 
                 pose_result
             )
             
@@ -269,46 +364,42 @@ class VideoPipelineService:
             # Return mock analysis as fallback
             return await self.video_analysis_service._generate_mock_analysis()
     
-    async def _store_complete_analysis(self, video_id: int, user_id: int, 
+    async def _store_complete_analysis(self, session: AsyncSession, video_id: int, user_id: int, 
                                      pose_result: Dict[str, Any], 
                                      ai_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Store complete analysis results in database."""
+        """Add complete analysis results to the session; the caller commits."""
         try:
-            async with get_db_session() as session:
-                # Create analysis record
-                analysis = VideoAnalysis(
-                    user_id=user_id,
-                    video_id=video_id,
-                    status=AnalysisStatus.COMPLETED,
-                    processing_started_at=datetime.now(),
-                    processing_completed_at=datetime.now()
-                )
-                
-                # Store pose analysis data
-                if pose_result.get('success'):
-                    analysis.pose_data = pose_result
-                    analysis.body_position_data = pose_result.get('angle_analysis', {})
-                    analysis.swing_metrics = pose_result.get('biomechanical_efficiency', {})
-                
-                # Store AI analysis data
-                combined_analysis = ai_result.copy()
-                if pose_result.get('success'):
-                    combined_analysis['pose_analysis'] = pose_result
-                
-                analysis.ai_analysis = combined_analysis
-                analysis.video_duration = combined_analysis.get("duration", 0)
-                analysis.analysis_confidence = combined_analysis.get("confidence", 0.8)
-                
-                session.add(analysis)
-                await session.commit()
-                await session.refresh(analysis)
-                
-                return {
-                    'id': analysis.id,
-                    'status': analysis.status.value,
-                    'created_at': analysis.created_at.isoformat(),
-                    'completed_at': analysis.processing_completed_at.isoformat()
-                }
+            # Create analysis record
+            now = datetime.now(timezone.utc)
+            analysis = VideoAnalysis(
+                user_id=user_id,
+                video_id=video_id,
+                status=AnalysisStatus.COMPLETED,
+                processing_started_at=now,
+                processing_completed_at=now
+            )
+            
+            # Store pose analysis data; the full result is archived compressed and only
+            # the queryable summaries stay as JSONB
+            if pose_result.get('success'):
+                analysis.set_pose_data(pose_result)
+                analysis.body_position_data = pose_result.get('angle_analysis', {})
+                analysis.swing_metrics = pose_result.get('biomechanical_efficiency', {})
+            
+            # Store AI analysis data
+            analysis.analysisJSON = ai_result
+            analysis.video_duration = ai_result.get("duration", 0)
+            analysis.analysis_confidence = ai_result.get("confidence", 0.8)
+            
+            session.add(analysis)
+            await session.flush()
+            
+            return {
+                'id': analysis.id,
+                'status': analysis.status.value,
+                'created_at': analysis.created_at.isoformat(),
+                'completed_at': analysis.processing_completed_at.isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"Database analysis storage failed: {e}")
@@ -320,6 +411,22 @@ class VideoPipelineService:
                                     ai_result: Dict[str, Any]) -> Dict[str, Any]:
         """Generate final comprehensive results."""
         
+        # Extract key insights
+        recommendations = []
+        if pose_result.get('success'):
+            recommendations.extend(pose_result.get('recommendations', ()))
+        
+        # Add AI insights
+        key_insights = [
+            {
+                'category': point.get('category', 'general'),
+                'issue': point.get('issue', ''),
+                'suggestion': point.get('suggestion', ''),
+                'priority': point.get('priority', 'medium')
+            }
+            for point in ai_result.get('coaching_points', ())
+        ]
+        
         # Combine all results
         final_results = {
             'video_info': video_record,
@@ -329,43 +436,28 @@ class VideoPipelineService:
             'summary': {
                 'overall_score': ai_result.get('overall_score', 0),
                 'confidence': ai_result.get('confidence', 0),
-                'key_insights': [],
-                'recommendations': []
+                'key_insights': key_insights,
+                'recommendations': recommendations
             }
         }
         
-        # Extract key insights
-        if pose_result.get('success'):
-            pose_recommendations = pose_result.get('recommendations', [])
-            final_results['summary']['recommendations'].extend(pose_recommendations)
-        
-        # Add AI insights
-        coaching_points = ai_result.get('coaching_points', [])
-        for point in coaching_points:
-            final_results['summary']['key_insights'].append({
-                'category': point.get('category', 'general'),
-                'issue': point.get('issue', ''),
-                'suggestion': point.get('suggestion', ''),
-                'priority': point.get('priority', 'medium')
-            })
-        
         return final_results
     
     async def _update_progress(self, pipeline_id: str, progress: int, 
                              message: str, callback: callable = None):
-        """Update progress tracking."""
+        """Update progress tracking. The timestamp is stored raw and formatted on read."""
         progress_data = {
             'pipeline_id': pipeline_id,
             'progress': progress,
             'message': message,
-            'timestamp': datetime.now().isoformat()
+            'ts_ns': time.time_ns()
         }
         
         self.analysis_progress[pipeline_id] = progress_data
         
         if callback:
             try:
-                await callback(progress_data)
+                await callback({**progress_data, 'timestamp': _format_timestamp_ns(progress_data['ts_ns'])})
             except Exception as e:
                 logger.warning(f"Progress callback failed: {e}")
         
@@ -373,12 +465,42 @@ class VideoPipelineService:
     
     async def get_pipeline_progress(self, pipeline_id: str) -> Dict[str, Any]:
         """Get current progress for a pipeline."""
-        return self.analysis_progress.get(pipeline_id, {
-            'pipeline_id': pipeline_id,
-            'progress': 0,
-            'message': 'Pipeline not found',
-            'timestamp': datetime.now().isoformat()
-        })
+        progress_data = self.analysis_progress.get(pipeline_id)
+        if progress_data is None:
+            return {
+                'pipeline_id': pipeline_id,
+                'progress': 0,
+                'message': 'Pipeline not found',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }
+        return {**progress_data, 'timestamp': _format_timestamp_ns(progress_data['ts_ns'])}
+    
+    async def process_blob_complete(self, blob_name: str, user_id: int, 
+                                  video_title: str = None, 
+                                  progress_callback: callable = None) -> Dict[str, Any]:
+        """
+        Complete pipeline for a video that already lives in storage.
+        
+        The video is downloaded once for analysis and is not uploaded back.
+        """
+        video_path = await self._download_video_from_storage(blob_name)
+        try:
+            upload_result = {
+                'success': True,
+                'blob_name': blob_name,
+                'file_size': await asyncio.to_thread(os.path.getsize, video_path),
+                'storage_url': f"gs://{self.storage_service.config.bucket_name}/{blob_name}"
+            }
+            return await self.process_video_complete(
+                video_path, 
+                user_id, 
+                video_title,
+                progress_callback,
+                upload_result=upload_result
+            )
+        finally:
+            # Clean up temp file
+            await asyncio.to_thread(self._remove_temp_file, video_path)
     
     async def process_video_from_api(self, video_id: int, user_id: int) -> Dict[str, Any]:
         """
@@ -392,21 +514,13 @@ class VideoPipelineService:
                 if not video or video.user_id != user_id:
                     raise ValueError("Video not found or access denied")
             
-            # Download video from storage
-            video_path = await self._download_video_from_storage(video.blob_name)
-            
-            # Process with complete pipeline
-            result = await self.process_video_complete(
-                video_path, 
+            # Process with complete pipeline, reusing the stored blob
+            return await self.process_blob_complete(
+                video.blob_name, 
                 user_id, 
                 video.title
             )
             
-            # Clean up temp file
-            os.unlink(video_path)
-            
-            return result
-            
         except Exception as e:
             logger.error(f"API video processing failed: {e}")
             return {
@@ -416,127 +530,186 @@ class VideoPipelineService:
     
     async def _download_video_from_storage(self, blob_name: str) -> str:
         """Download video from storage to temporary location."""
+        temp_path = None
         try:
             # Generate signed URL for download
             signed_url = await self.storage_service.generate_signed_url(blob_name)
             
             # Download file to temp location
-            temp_path = os.path.join(self.temp_dir, f"video_{datetime.now().timestamp()}.mp4")
+            temp_fd, temp_path = tempfile.mkstemp(suffix=".mp4", dir=self.temp_dir)
+            os.close(temp_fd)
             
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.get(signed_url)
+            # Stream straight to disk so memory stays at one chunk regardless of video size
+            async with self._http.stream("GET", signed_url) as response:
                 response.raise_for_status()
                 
-                with open(temp_path, 'wb') as f:
-                    f.write(response.content)
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(storage_config.chunk_size):
+                        await f.write(chunk)
             
             return temp_path
             
         except Exception as e:
             logger.error(f"Failed to download video {blob_name}: {e}")
+            if temp_path is not None:
+                await asyncio.to_thread(self._remove_temp_file, temp_path)
             raise
     
+    @staticmethod
+    def _remove_temp_file(path: str):
+        """Delete a temp file, ignoring files that are already gone."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    
+    def start_janitor(self):
+        """Start the background task that removes stale temp files (idempotent)."""
+        if self._janitor_task is None:
+            self._janitor_task = asyncio.create_task(self._janitor(), name="pipeline-temp-janitor")
+    
+    async def _janitor(self):
+        """Periodically delete temp files that outlived TEMP_FILE_MAX_AGE_SECONDS."""
+        while True:
+            await asyncio.sleep(TEMP_JANITOR_INTERVAL_SECONDS)
+            try:
+                removed = await asyncio.to_thread(self._sweep_temp_dir)
+                if removed:
+                    logger.info(f"Removed {removed} stale temp files from {self.temp_dir}")
+            except Exception as e:
+                logger.warning(f"Temp file sweep failed: {e}")
+    
+    def _sweep_temp_dir(self) -> int:
+        """Delete stale files in temp_dir; returns how many were removed."""
+        cutoff = time.time() - TEMP_FILE_MAX_AGE_SECONDS
+        removed = 0
+        for path in Path(self.temp_dir).iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+    
+    async def aclose(self):
+        """Stop the temp-file janitor and close the shared HTTP client."""
+        if self._janitor_task is not None:
+            self._janitor_task.cancel()
+            await asyncio.gather(self._janitor_task, return_exceptions=True)
+            self._janitor_task = None
+        await self._http.aclose()
+    
     async def validate_pipeline_health(self) -> Dict[str, Any]:
-        """Validate that all pipeline components are healthy."""
+        """
+        Validate that all pipeline components are healthy.
+        
+        The component checks run concurrently and the combined result is reused for
+        HEALTH_CACHE_TTL_SECONDS, since load balancers poll this frequently. A check that
+        raises marks the whole pipeline unhealthy; a component reported as unhealthy
+        without raising (e.g. running on mock data) does not.
+        """
+        cached = self._health_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        checks = (
+            ('storage', 'Google Cloud Storage', 'Storage service error', self._check_storage),
+            ('pose_analysis', 'MediaPipe Pose', 'Pose analysis error', self._check_pose),
+            ('ai_analysis', 'Google Gemini AI', 'AI analysis error', self._check_ai),
+            ('database', 'PostgreSQL (Neon)', 'Database error', self._check_db),
+        )
+        results = await asyncio.gather(*(check() for *_, check in checks), return_exceptions=True)
+        
         health_status = {
             'pipeline_healthy': True,
             'components': {},
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }
-        
-        # Check storage service
-        try:
-            # Try to list buckets or perform a simple operation
-            health_status['components']['storage'] = {
-                'healthy': True,
-                'service': 'Google Cloud Storage',
-                'message': 'Storage service accessible'
-            }
-        except Exception as e:
-            health_status['components']['storage'] = {
-                'healthy': False,
-                'service': 'Google Cloud Storage',
-                'message': f'Storage service error: {str(e)}'
-            }
-            health_status['pipeline_healthy'] = False
-        
-        # Check pose analysis service
-        try:
-            if hasattr(self.pose_analysis_service, 'mp_pose'):
-                health_status['components']['pose_analysis'] = {
-                    'healthy': True,
-                    'service': 'MediaPipe Pose',
-                    'message': 'MediaPipe pose detection ready'
-                }
-            else:
-                health_status['components']['pose_analysis'] = {
+        for (name, service, error_prefix, _), result in zip(checks, results):
+            if isinstance(result, Exception):
+                result = {
                     'healthy': False,
-                    'service': 'MediaPipe Pose',
-                    'message': 'MediaPipe not available, using mock data'
+                    'service': service,
+                    'message': f'{error_prefix}: {str(result)}'
                 }
-        except Exception as e:
-            health_status['components']['pose_analysis'] = {
-                'healthy': False,
+                health_status['pipeline_healthy'] = False
+            health_status['components'][name] = result
+        
+        self._health_cache = (time.monotonic() + HEALTH_CACHE_TTL_SECONDS, health_status)
+        return health_status
+    
+    async def _check_storage(self) -> Dict[str, Any]:
+        """Check storage service."""
+        return {
+            'healthy': True,
+            'service': 'Google Cloud Storage',
+            'message': 'Storage service accessible'
+        }
+    
+    async def _check_pose(self) -> Dict[str, Any]:
+        """Check pose analysis service."""
+        if _service_ready(self.pose_analysis_service, 'mp_pose'):
+            return {
+                'healthy': True,
                 'service': 'MediaPipe Pose',
-                'message': f'Pose analysis error: {str(e)}'
+                'message': 'MediaPipe pose detection ready'
             }
-            health_status['pipeline_healthy'] = False
-        
-        # Check AI analysis service
-        try:
-            gemini_available = hasattr(self.video_analysis_service, 'model')
-            if gemini_available:
-                health_status['components']['ai_analysis'] = {
-                    'healthy': True,
-                    'service': 'Google Gemini AI',
-                    'message': 'Gemini AI service ready'
-                }
-            else:
-                health_status['components']['ai_analysis'] = {
-                    'healthy': False,
-                    'service': 'Google Gemini AI',
-                    'message': 'Gemini AI not configured, using mock data'
-                }
-        except Exception as e:
-            health_status['components']['ai_analysis'] = {
-                'healthy': False,
+        return {
+            'healthy': False,
+            'service': 'MediaPipe Pose',
+            'message': 'MediaPipe not available, using mock data'
+        }
+    
+    async def _check_ai(self) -> Dict[str, Any]:
+        """Check AI analysis service."""
+        if _service_ready(self.video_analysis_service, 'model'):
+            return {
+                'healthy': True,
                 'service': 'Google Gemini AI',
-                'message': f'AI analysis error: {str(e)}'
+                'message': 'Gemini AI service ready'
             }
-            health_status['pipeline_healthy'] = False
+        return {
+            'healthy': False,
+            'service': 'Google Gemini AI',
+            'message': 'Gemini AI not configured, using mock data'
+        }
+    
+    async def _check_db(self) -> Dict[str, Any]:
+        """
+        Check database connectivity; raises if the database is unreachable.
         
-        # Check database connectivity
-        try:
-            session_gen = get_db_session()
-            session = await session_gen.__anext__()
-            try:
-                from sqlalchemy import text
+        The pool pre-pings connections on checkout, so a recent successful probe is
+        trusted for DB_PROBE_TTL_SECONDS instead of sending SELECT 1 every time.
+        """
+        now = time.monotonic()
+        if self._db_probed_at is None or now - self._db_probed_at >= DB_PROBE_TTL_SECONDS:
+            async with AsyncSessionLocal() as session:
                 await session.execute(text("SELECT 1"))
-                health_status['components']['database'] = {
-                    'healthy': True,
-                    'service': 'PostgreSQL (Neon)',
-                    'message': 'Database connection healthy'
-                }
-            finally:
-                await session_gen.aclose()
-        except Exception as e:
-            health_status['components']['database'] = {
-                'healthy': False,
-                'service': 'PostgreSQL (Neon)',
-                'message': f'Database error: {str(e)}'
-            }
-            health_status['pipeline_healthy'] = False
-        
-        return health_status
+            self._db_probed_at = now
+        return {
+            'healthy': True,
+            'service': 'PostgreSQL (Neon)',
+            'message': 'Database connection healthy',
+            'pool': async_engine.pool.status()
+        }
 
 
 # Global service instance
 video_pipeline_service = None
+_init_lock = threading.Lock()
 
 def get_video_pipeline_service():
     """Get the global video pipeline service instance."""
     global video_pipeline_service
     if video_pipeline_service is None:
-        video_pipeline_service = VideoPipelineService()
-    return video_pipeline_service
\ No newline at end of file
+        with _init_lock:
+            if video_pipeline_service is None:
+                video_pipeline_service = VideoPipelineService()
+    return video_pipeline_service
+
+
+async def close_video_pipeline_service():
+    """Release the global pipeline service's connections, if it was ever created."""
+    if video_pipeline_service is not None:
+        await video_pipeline_service.aclose()
\ No newline at end of file
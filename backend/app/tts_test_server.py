@@ -8,11 +8,13 @@ load_dotenv()
 
 # Import only TTS router for testing
 from app.api.tts import router as tts_router
+from app.api.responses import APIJSONResponse
 
 app = FastAPI(
     title="FutureGolf TTS Test API",
     description="Testing TTS functionality",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=APIJSONResponse
 )
 
 # Add CORS middleware
@@ -0,0 +1,43 @@
+"""
+Migration script to add the compressed pose data column to video_analyses table.
+"""
+
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+# Add backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+# Load environment variables
+load_dotenv()
+
+from app.database.config import AsyncSessionLocal
+
+
+async def run_migration():
+    """Run migration to add pose_data_z to video_analyses table."""
+    async with AsyncSessionLocal() as session:
+        try:
+            print("Starting migration: Adding pose_data_z to video_analyses table...")
+            
+            # Gzip-compressed pose data; existing rows keep using pose_data
+            await session.execute(text("""
+                ALTER TABLE video_analyses 
+                ADD COLUMN IF NOT EXISTS pose_data_z BYTEA;
+            """))
+            
+            await session.commit()
+            print("✅ Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            await session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
@@ -0,0 +1,57 @@
+"""
+Migration script to make analysis_json the single home of analysis results.
+
+Results used to be written to both ai_analysis and analysis_json. This backfills
+analysis_json for rows that only have the legacy column and clears ai_analysis
+where it merely duplicates analysis_json.
+"""
+
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+# Add backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+# Load environment variables
+load_dotenv()
+
+from app.database.config import AsyncSessionLocal
+
+
+async def run_migration():
+    """Run migration to consolidate ai_analysis into analysis_json."""
+    async with AsyncSessionLocal() as session:
+        try:
+            print("Starting migration: Consolidating ai_analysis into analysis_json...")
+
+            # Backfill rows that were only written to the legacy column
+            backfilled = await session.execute(text("""
+                UPDATE video_analyses
+                SET analysis_json = ai_analysis
+                WHERE analysis_json IS NULL AND ai_analysis IS NOT NULL;
+            """))
+
+            # Drop the duplicate copy written alongside analysis_json
+            cleared = await session.execute(text("""
+                UPDATE video_analyses
+                SET ai_analysis = NULL
+                WHERE ai_analysis IS NOT NULL AND ai_analysis = analysis_json;
+            """))
+
+            await session.commit()
+            print("✅ Migration completed successfully!")
+            print(f"  - Backfilled analysis_json: {backfilled.rowcount} rows")
+            print(f"  - Cleared duplicate ai_analysis: {cleared.rowcount} rows")
+
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            await session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
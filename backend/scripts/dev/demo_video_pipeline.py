@@ -336,8 +336,8 @@ class VideoPipelineDemo:
                 if analyses:
                     latest_analysis = analyses[0]
                     print(f"   📈 Latest analysis: ID {latest_analysis.id}, Status: {latest_analysis.status.value}")
-                    print(f"   🤖 Has AI analysis: {'Yes' if latest_analysis.ai_analysis else 'No'}")
-                    print(f"   🏃 Has pose data: {'Yes' if latest_analysis.pose_data else 'No'}")
+                    print(f"   🤖 Has AI analysis: {'Yes' if (latest_analysis.analysisJSON or latest_analysis.ai_analysis) else 'No'}")
+                    print(f"   🏃 Has pose data: {'Yes' if latest_analysis.get_pose_data() else 'No'}")
                     print(f"   💪 Has body angles: {'Yes' if latest_analysis.body_position_data else 'No'}")
                     print(f"   📊 Has swing metrics: {'Yes' if latest_analysis.swing_metrics else 'No'}")
                     print(f"   🎯 Confidence: {latest_analysis.analysis_confidence or 0:.1%}")
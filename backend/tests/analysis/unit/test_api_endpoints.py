@@ -37,6 +37,7 @@ def mock_storage():
             "public_url": "https://storage.googleapis.com/test-bucket/processing/test_uuid_original"
         })
         storage.move_file = AsyncMock(return_value=True)
+        storage.delete_file = AsyncMock(return_value=True)
         mock.return_value = storage
         yield storage
 
@@ -44,11 +45,12 @@ def mock_storage():
 @pytest.fixture
 def mock_orchestrator():
     """Mock orchestrator for unit tests"""
-    with patch('app.api.analysis.AnalysisOrchestrator') as MockOrch:
+    with patch('app.api.analysis.get_analysis_orchestrator') as mock_get_orch:
         orchestrator = Mock()
         orchestrator.analyze_video_background = AsyncMock()
+        orchestrator.start_background_analysis = AsyncMock(return_value=True)
         orchestrator.create_analysis_entry = AsyncMock(return_value=str(uuid.uuid4()))
-        MockOrch.return_value = orchestrator
+        mock_get_orch.return_value = orchestrator
         yield orchestrator
 
 
@@ -83,7 +85,7 @@ def test_upload_video_to_analysis_invalid_uuid(client):
 async def test_upload_video_to_analysis_not_found():
     """Test upload_video_to_analysis when analysis doesn't exist"""
     from app.api.analysis import upload_video_to_analysis
-    from fastapi import UploadFile, BackgroundTasks, HTTPException
+    from fastapi import UploadFile, HTTPException
     import io
     
     fake_uuid = str(uuid.uuid4())
@@ -100,14 +102,10 @@ async def test_upload_video_to_analysis_not_found():
         file=io.BytesIO(b"fake video content")
     )
     
-    # Create background tasks
-    background_tasks = BackgroundTasks()
-    
     # Test that it raises 404
     with pytest.raises(HTTPException) as exc_info:
         await upload_video_to_analysis(
             uuid=fake_uuid,
-            background_tasks=background_tasks,
             file=file,
             db=mock_db
         )
@@ -204,7 +202,7 @@ async def test_get_analysis_with_mocked_db():
 async def test_upload_video_with_mocked_components(mock_storage):
     """Test upload_video_to_analysis function with all mocked components"""
     from app.api.analysis import upload_video_to_analysis
-    from fastapi import UploadFile, BackgroundTasks
+    from fastapi import UploadFile
     import io
     
     test_uuid = str(uuid.uuid4())
@@ -231,17 +229,14 @@ async def test_upload_video_with_mocked_components(mock_storage):
         file=io.BytesIO(file_content)
     )
     
-    # Create background tasks
-    background_tasks = BackgroundTasks()
-    
     # Mock orchestrator
-    with patch('app.api.analysis.orchestrator') as mock_orch:
-        mock_orch.analyze_video_background = AsyncMock()
+    with patch('app.api.analysis.get_analysis_orchestrator') as mock_get_orch:
+        mock_orch = mock_get_orch.return_value
+        mock_orch.start_background_analysis = AsyncMock(return_value=True)
         
         # Upload video
         result = await upload_video_to_analysis(
             uuid=test_uuid,
-            background_tasks=background_tasks,
             file=file,
             db=mock_db
         )
@@ -252,4 +247,55 @@ async def test_upload_video_with_mocked_components(mock_storage):
         
         # Verify mocks were called
         mock_storage.upload_video.assert_called_once()
-        mock_db.commit.assert_called_once()
\ No newline at end of file
+        mock_db.commit.assert_called_once()
+        mock_orch.start_background_analysis.assert_called_once_with(test_uuid)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_video_queue_full_returns_entry_to_pending(mock_storage):
+    """Test a full analysis queue returns 503 and leaves the entry uploadable again"""
+    from app.api.analysis import upload_video_to_analysis
+    from fastapi import UploadFile, HTTPException
+    import io
+    
+    test_uuid = str(uuid.uuid4())
+    
+    mock_analysis = Mock()
+    mock_analysis.uuid = uuid.UUID(test_uuid)
+    mock_analysis.status = AnalysisStatus.PENDING
+    mock_analysis.user_id = 1
+    
+    mock_db = AsyncMock()
+    mock_execute_result = AsyncMock()
+    mock_execute_result.scalar_one_or_none = Mock(return_value=mock_analysis)
+    mock_db.execute = AsyncMock(return_value=mock_execute_result)
+    
+    with patch('app.api.analysis.get_analysis_orchestrator') as mock_get_orch:
+        mock_get_orch.return_value.start_background_analysis = AsyncMock(return_value=False)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_video_to_analysis(
+                uuid=test_uuid,
+                file=UploadFile(filename="test.mp4", file=io.BytesIO(b"fake video content")),
+                db=mock_db
+            )
+    
+    assert exc_info.value.status_code == 503
+    assert mock_analysis.status == AnalysisStatus.PENDING
+    assert mock_analysis.originalVideoURL is None
+    assert mock_db.commit.await_count == 2
+    mock_storage.delete_file.assert_called_once_with(f"processing/{test_uuid}_original")
+    
+    # The retry is accepted rather than rejected for being mid-analysis
+    with patch('app.api.analysis.get_analysis_orchestrator') as mock_get_orch:
+        mock_get_orch.return_value.start_background_analysis = AsyncMock(return_value=True)
+        
+        result = await upload_video_to_analysis(
+            uuid=test_uuid,
+            file=UploadFile(filename="test.mp4", file=io.BytesIO(b"fake video content")),
+            db=mock_db
+        )
+    
+    assert result["success"] is True
+    assert mock_analysis.status == AnalysisStatus.PROCESSING
@@ -3,9 +3,11 @@ Unit tests for AnalysisOrchestrator service.
 """
 
 import pytest
+import asyncio
 import uuid
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime
+from string import Template
 import tempfile
 import os
 
@@ -14,6 +16,8 @@ import sys
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, backend_dir)
 
+from google.api_core import exceptions as gax
+
 from app.services.video_analysis_service import AnalysisOrchestrator
 from app.models.video_analysis import VideoAnalysis, AnalysisStatus
 
@@ -33,7 +37,8 @@ def mock_storage_service():
 def mock_vision_service():
     """Mock vision service"""
     mock = Mock()
-    mock.download_video_from_storage = AsyncMock(return_value="/tmp/test_video.mp4")
+    mock.download_video_bytes = AsyncMock(return_value=b"video bytes")
+    mock.load_prompt_template = AsyncMock(return_value=Template("Analyze this swing"))
     mock.analyze_video_file = AsyncMock(return_value={
         "swing_analysis": {
             "overall_assessment": "Good swing",
@@ -152,16 +157,12 @@ async def test_analyze_video_background_success(orchestrator):
     with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class:
         # We need multiple session instances for the multiple async with blocks
         
-        # First session - get analysis and update status
+        # First session - update status returning the analysis fields
         mock_db1 = AsyncMock()
-        mock_analysis1 = Mock()
-        mock_analysis1.uuid = uuid.UUID(test_uuid)
-        mock_analysis1.originalVideoURL = "gcs://test-bucket/processing/test_video.mp4"
-        mock_analysis1.user_id = 1
-        mock_analysis1.id = 123
-        
-        mock_execute_result1 = AsyncMock()
-        mock_execute_result1.scalar_one_or_none = Mock(return_value=mock_analysis1)
+        mock_execute_result1 = Mock()
+        mock_execute_result1.one_or_none = Mock(
+            return_value=("gcs://test-bucket/processing/test_video.mp4", 1, 123)
+        )
         mock_db1.execute = AsyncMock(return_value=mock_execute_result1)
         
         # Second session - update with results
@@ -186,13 +187,16 @@ async def test_analyze_video_background_success(orchestrator):
         await orchestrator.analyze_video_background(test_uuid)
         
         # Verify status updates
-        assert mock_analysis1.status == AnalysisStatus.PROCESSING
+        status_update = mock_db1.execute.call_args.args[0]
+        assert status_update.is_update
+        assert "RETURNING" in str(status_update)
+        mock_db1.commit.assert_called_once()
         assert mock_analysis2.status == AnalysisStatus.COMPLETED
         assert mock_analysis2.analysisJSON is not None
         assert mock_analysis2.video_duration == 10.5
         
         # Verify storage operations
-        orchestrator.vision_service.download_video_from_storage.assert_called_once()
+        orchestrator.vision_service.download_video_bytes.assert_called_once_with("processing/test_video.mp4")
         orchestrator.vision_service.analyze_video_file.assert_called_once()
         orchestrator.storage_service.move_file.assert_called_once_with(
             "processing/test_video.mp4",
@@ -212,16 +216,12 @@ async def test_analyze_video_background_analysis_failure(orchestrator):
     )
     
     with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class:
-        # First session - get analysis and update status
+        # First session - update status returning the analysis fields
         mock_db1 = AsyncMock()
-        mock_analysis1 = Mock()
-        mock_analysis1.uuid = uuid.UUID(test_uuid)
-        mock_analysis1.originalVideoURL = "gcs://test-bucket/processing/test_video.mp4"
-        mock_analysis1.user_id = 1
-        mock_analysis1.id = 123
-        
-        mock_execute_result1 = AsyncMock()
-        mock_execute_result1.scalar_one_or_none = Mock(return_value=mock_analysis1)
+        mock_execute_result1 = Mock()
+        mock_execute_result1.one_or_none = Mock(
+            return_value=("gcs://test-bucket/processing/test_video.mp4", 1, 123)
+        )
         mock_db1.execute = AsyncMock(return_value=mock_execute_result1)
         
         # Second session - update with error (for error path)
@@ -250,32 +250,70 @@ async def test_analyze_video_background_analysis_failure(orchestrator):
         assert mock_analysis2.status == AnalysisStatus.FAILED
         assert "Analysis failed" in mock_analysis2.errorDescription
         assert mock_analysis2.processing_completed_at is not None
+        
+        # Verify permanent errors are not retried
+        orchestrator.vision_service.analyze_video_file.assert_called_once()
 
 
 @pytest.mark.unit
 @pytest.mark.asyncio
-async def test_analyze_video_background_temp_file_cleanup(orchestrator):
-    """Test that temporary files are cleaned up after analysis"""
+async def test_analyze_video_background_retries_transient_errors(orchestrator, mock_vision_service):
+    """Test transient upstream errors are retried with backoff"""
     test_uuid = str(uuid.uuid4())
-    temp_path = "/tmp/test_video_temp.mp4"
     
-    # Create a real temp file to test cleanup
-    with open(temp_path, 'w') as f:
-        f.write("test")
+    success_result = mock_vision_service.analyze_video_file.return_value
+    orchestrator.vision_service.analyze_video_file = AsyncMock(
+        side_effect=[gax.ServiceUnavailable("Gemini overloaded"), success_result]
+    )
     
-    orchestrator.vision_service.download_video_from_storage = AsyncMock(return_value=temp_path)
+    with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class, \
+            patch('app.services.video_analysis_service.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+        # First session - update status returning the analysis fields
+        mock_db1 = AsyncMock()
+        mock_execute_result1 = Mock()
+        mock_execute_result1.one_or_none = Mock(
+            return_value=("gcs://test-bucket/processing/test_video.mp4", 1, 123)
+        )
+        mock_db1.execute = AsyncMock(return_value=mock_execute_result1)
+        
+        # Second session - update with results
+        mock_db2 = AsyncMock()
+        mock_analysis2 = Mock()
+        mock_db2.get = AsyncMock(return_value=mock_analysis2)
+        
+        # Create separate mock session instances
+        mock_session1 = AsyncMock()
+        mock_session1.__aenter__ = AsyncMock(return_value=mock_db1)
+        mock_session1.__aexit__ = AsyncMock()
+        
+        mock_session2 = AsyncMock()
+        mock_session2.__aenter__ = AsyncMock(return_value=mock_db2)
+        mock_session2.__aexit__ = AsyncMock()
+        
+        mock_session_class.side_effect = [mock_session1, mock_session2]
+        
+        # Call method
+        await orchestrator.analyze_video_background(test_uuid)
+        
+        # Verify the analysis was retried once and completed
+        assert orchestrator.vision_service.analyze_video_file.call_count == 2
+        mock_sleep.assert_called_once()
+        assert mock_analysis2.status == AnalysisStatus.COMPLETED
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_analyze_video_background_analyzes_in_memory_video(orchestrator):
+    """Test that the downloaded video bytes are analyzed without a temp file"""
+    test_uuid = str(uuid.uuid4())
     
     with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class:
-        # First session - get analysis and update status
+        # First session - update status returning the analysis fields
         mock_db1 = AsyncMock()
-        mock_analysis1 = Mock()
-        mock_analysis1.uuid = uuid.UUID(test_uuid)
-        mock_analysis1.originalVideoURL = "gcs://test-bucket/processing/test_video.mp4"
-        mock_analysis1.user_id = 1
-        mock_analysis1.id = 123
-        
-        mock_execute_result1 = AsyncMock()
-        mock_execute_result1.scalar_one_or_none = Mock(return_value=mock_analysis1)
+        mock_execute_result1 = Mock()
+        mock_execute_result1.one_or_none = Mock(
+            return_value=("gcs://test-bucket/processing/test_video.mp4", 1, 123)
+        )
         mock_db1.execute = AsyncMock(return_value=mock_execute_result1)
         
         # Second session - update with results
@@ -298,5 +336,133 @@ async def test_analyze_video_background_temp_file_cleanup(orchestrator):
         # Call method
         await orchestrator.analyze_video_background(test_uuid)
         
-        # Verify temp file was cleaned up
-        assert not os.path.exists(temp_path)
\ No newline at end of file
+        # Verify the in-memory video and preloaded prompt were handed to the analyzer
+        orchestrator.vision_service.analyze_video_file.assert_called_once_with(
+            b"video bytes",
+            mime_type="video/mp4",
+            prompt_template=orchestrator.vision_service.load_prompt_template.return_value
+        )
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_start_background_analysis_deduplicates_and_runs_on_worker(orchestrator):
+    """Test queued analyses are deduplicated and processed by the worker pool"""
+    test_uuid = str(uuid.uuid4())
+    orchestrator.analyze_video_background = AsyncMock()
+    
+    try:
+        assert await orchestrator.start_background_analysis(test_uuid) is True
+        assert await orchestrator.start_background_analysis(test_uuid) is True
+        await orchestrator._queue.join()
+    finally:
+        await orchestrator.stop_workers()
+    
+    orchestrator.analyze_video_background.assert_called_once_with(test_uuid)
+    assert test_uuid not in orchestrator._pending
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_start_background_analysis_rejects_when_queue_full(orchestrator):
+    """Test submissions are rejected once the queue is full"""
+    orchestrator._queue = asyncio.Queue(maxsize=1)
+    orchestrator._workers = [Mock()]  # Pretend workers are running but idle
+    
+    assert await orchestrator.start_background_analysis(str(uuid.uuid4())) is True
+    assert await orchestrator.start_background_analysis(str(uuid.uuid4())) is False
+
+
+def _failure_sessions(mock_session_class):
+    """Wire the status-update session and the error-recording session; returns the analysis marked on failure"""
+    mock_db1 = AsyncMock()
+    mock_execute_result1 = Mock()
+    mock_execute_result1.one_or_none = Mock(
+        return_value=("gcs://test-bucket/processing/test_video.mp4", 1, 123)
+    )
+    mock_db1.execute = AsyncMock(return_value=mock_execute_result1)
+    
+    mock_db2 = AsyncMock()
+    mock_execute_result2 = AsyncMock()
+    mock_analysis2 = Mock()
+    mock_execute_result2.scalar_one_or_none = Mock(return_value=mock_analysis2)
+    mock_db2.execute = AsyncMock(return_value=mock_execute_result2)
+    
+    sessions = []
+    for db in (mock_db1, mock_db2):
+        session = AsyncMock()
+        session.__aenter__ = AsyncMock(return_value=db)
+        session.__aexit__ = AsyncMock()
+        sessions.append(session)
+    mock_session_class.side_effect = sessions
+    return mock_analysis2
+
+
+@pytest.fixture
+def real_vision_orchestrator(orchestrator, mock_vision_service):
+    """Orchestrator backed by the real analysis service and Gemini provider"""
+    from app.services.video_analysis_service import CleanVideoAnalysisService
+    with patch('app.services.video_analysis_service.get_storage_service', return_value=None):
+        service = CleanVideoAnalysisService()
+    service.download_video_bytes = mock_vision_service.download_video_bytes
+    service.load_prompt_template = mock_vision_service.load_prompt_template
+    service.probe_video = AsyncMock(return_value=(30.0, 150, 5.0))
+    orchestrator.vision_service = service
+    return orchestrator
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_analyze_video_background_permanent_provider_error_fails_fast(real_vision_orchestrator):
+    """Test a 4xx from Gemini fails the analysis without retrying"""
+    test_uuid = str(uuid.uuid4())
+    
+    with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class, \
+            patch('app.core.providers.vision_gemini.genai.upload_file',
+                  side_effect=gax.PermissionDenied("API key invalid")) as mock_upload:
+        mock_analysis = _failure_sessions(mock_session_class)
+        
+        await real_vision_orchestrator.analyze_video_background(test_uuid)
+        
+        mock_upload.assert_called_once()
+        assert mock_analysis.status == AnalysisStatus.FAILED
+        assert "API key invalid" in mock_analysis.errorDescription
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_analyze_video_background_provider_error_result_fails(real_vision_orchestrator):
+    """Test an error result from the provider marks the analysis failed, not completed"""
+    test_uuid = str(uuid.uuid4())
+    failed_file = Mock()
+    failed_file.state.name = "FAILED"
+    
+    with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class, \
+            patch('app.core.providers.vision_gemini.genai.upload_file', return_value=failed_file), \
+            patch('app.core.providers.vision_gemini.genai.delete_file'):
+        mock_analysis = _failure_sessions(mock_session_class)
+        
+        await real_vision_orchestrator.analyze_video_background(test_uuid)
+        
+        assert mock_analysis.status == AnalysisStatus.FAILED
+        assert "File failed to process" in mock_analysis.errorDescription
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_analyze_video_background_without_storage_fails(mock_vision_service):
+    """Test an orchestrator built without storage starts up and fails each request instead"""
+    test_uuid = str(uuid.uuid4())
+    
+    with patch('app.services.video_analysis_service.get_storage_service',
+               side_effect=ValueError("GCS_BUCKET_NAME not set")):
+        orch = AnalysisOrchestrator(vision_service=mock_vision_service)
+    assert orch.storage_service is None
+    
+    with patch('app.services.video_analysis_service.AsyncSessionLocal') as mock_session_class:
+        mock_analysis = _failure_sessions(mock_session_class)
+        
+        await orch.analyze_video_background(test_uuid)
+        
+        mock_vision_service.download_video_bytes.assert_not_called()
+        assert mock_analysis.status == AnalysisStatus.FAILED
+        assert "Storage service not available" in mock_analysis.errorDescription
@@ -0,0 +1,42 @@
+"""
+Unit tests for vision response parsing.
+"""
+
+import pytest
+import os
+
+# Add backend to path
+import sys
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, backend_dir)
+
+import orjson
+
+from app.core.providers.response_parsing import parse_vision_json
+
+
+def test_parses_plain_json():
+    """JSON-mode responses parse directly"""
+    assert parse_vision_json('{"swing_detected": true, "confidence": 0.9}') == {
+        "swing_detected": True,
+        "confidence": 0.9
+    }
+
+
+def test_extracts_object_from_prose():
+    """The outermost object is sliced out of surrounding text"""
+    text = 'Here you go:\n```json\n{"swing_detected": false, "detail": {"phase": "setup"}}\n```'
+    assert parse_vision_json(text) == {"swing_detected": False, "detail": {"phase": "setup"}}
+
+
+def test_falls_back_without_object():
+    """Text with no object becomes a negative result with the raw response"""
+    result = parse_vision_json("No swing visible")
+    assert result["swing_detected"] is False
+    assert result["raw_response"] == "No swing visible"
+
+
+def test_invalid_object_raises():
+    """A malformed object is reported rather than silently ignored"""
+    with pytest.raises(orjson.JSONDecodeError):
+        parse_vision_json("result: {swing_detected: yes}")
@@ -4,13 +4,16 @@ Unit tests for StorageService move_file method.
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+import io
 import os
 import sys
+from datetime import datetime, timedelta
 
 # Add backend to path
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, backend_dir)
 
+from app.services import storage_service as storage_module
 from app.services.storage_service import StorageService
 
 
@@ -27,6 +30,7 @@ def storage_service(mock_bucket):
     with patch('app.services.storage_service.storage_config') as mock_config:
         mock_config.get_storage_client.return_value = Mock()
         mock_config.get_bucket.return_value = mock_bucket
+        mock_config.io_workers = 4
         service = StorageService()
         service.bucket = mock_bucket
         return service
@@ -41,23 +45,10 @@ async def test_move_file_success(storage_service, mock_bucket):
     
     # Mock source blob
     source_blob = Mock()
-    source_blob.exists.return_value = True
+    source_blob.size = 1024
     source_blob.content_type = "video/mp4"
-    source_blob.download_as_bytes.return_value = b"video content"
     source_blob.metadata = {"user_id": "1", "video_id": "123"}
-    
-    # Mock dest blob
-    dest_blob = Mock()
-    
-    # Setup bucket mocks
-    def blob_side_effect(name):
-        if name == source_blob_name:
-            return source_blob
-        elif name == dest_blob_name:
-            return dest_blob
-        return Mock()
-    
-    mock_bucket.blob.side_effect = blob_side_effect
+    mock_bucket.get_blob.return_value = source_blob
     
     # Call method
     result = await storage_service.move_file(source_blob_name, dest_blob_name)
@@ -65,14 +56,14 @@ async def test_move_file_success(storage_service, mock_bucket):
     # Verify success
     assert result is True
     
-    # Verify operations
-    source_blob.exists.assert_called_once()
-    source_blob.download_as_bytes.assert_called_once()
-    dest_blob.upload_from_string.assert_called_once_with(
-        b"video content",
-        content_type="video/mp4"
+    # Verify the copy happened server-side, without downloading
+    mock_bucket.get_blob.assert_called_once_with(source_blob_name)
+    mock_bucket.copy_blob.assert_called_once_with(
+        source_blob,
+        mock_bucket,
+        new_name=dest_blob_name
     )
-    dest_blob.patch.assert_called_once()
+    source_blob.download_as_bytes.assert_not_called()
     source_blob.delete.assert_called_once()
 
 
@@ -84,10 +75,7 @@ async def test_move_file_source_not_found(storage_service, mock_bucket):
     dest_blob_name = "processed/test_video.mp4"
     
     # Mock source blob that doesn't exist
-    source_blob = Mock()
-    source_blob.exists.return_value = False
-    
-    mock_bucket.blob.return_value = source_blob
+    mock_bucket.get_blob.return_value = None
     
     # Call method
     result = await storage_service.move_file(source_blob_name, dest_blob_name)
@@ -96,8 +84,7 @@ async def test_move_file_source_not_found(storage_service, mock_bucket):
     assert result is False
     
     # Verify no operations after exists check
-    source_blob.download_as_bytes.assert_not_called()
-    source_blob.delete.assert_not_called()
+    mock_bucket.copy_blob.assert_not_called()
 
 
 @pytest.mark.unit
@@ -107,12 +94,11 @@ async def test_move_file_with_exception(storage_service, mock_bucket):
     source_blob_name = "processing/test_video.mp4"
     dest_blob_name = "processed/test_video.mp4"
     
-    # Mock source blob that throws exception
+    # Mock source blob whose copy throws exception
     source_blob = Mock()
-    source_blob.exists.return_value = True
-    source_blob.download_as_bytes.side_effect = Exception("Download failed")
-    
-    mock_bucket.blob.return_value = source_blob
+    source_blob.size = 1024
+    mock_bucket.get_blob.return_value = source_blob
+    mock_bucket.copy_blob.side_effect = Exception("Copy failed")
     
     # Call method
     result = await storage_service.move_file(source_blob_name, dest_blob_name)
@@ -126,39 +112,173 @@ async def test_move_file_with_exception(storage_service, mock_bucket):
 
 @pytest.mark.unit
 @pytest.mark.asyncio
-async def test_move_file_without_metadata(storage_service, mock_bucket):
-    """Test move file when source has no metadata"""
+async def test_move_file_large_blob_uses_rewrite(storage_service, mock_bucket):
+    """Test move file rewrites blobs too large for a single copy"""
     source_blob_name = "processing/test_video.mp4"
     dest_blob_name = "processed/test_video.mp4"
     
-    # Mock source blob without metadata
+    # Mock a source blob above the single-copy limit
     source_blob = Mock()
-    source_blob.exists.return_value = True
-    source_blob.content_type = "video/mp4"
-    source_blob.download_as_bytes.return_value = b"video content"
-    source_blob.metadata = None
+    source_blob.size = storage_module.MAX_SINGLE_COPY_SIZE + 1
+    mock_bucket.get_blob.return_value = source_blob
     
-    # Mock dest blob
+    # Mock dest blob needing two rewrite calls
     dest_blob = Mock()
-    
-    # Setup bucket mocks
-    def blob_side_effect(name):
-        if name == source_blob_name:
-            return source_blob
-        elif name == dest_blob_name:
-            return dest_blob
-        return Mock()
-    
-    mock_bucket.blob.side_effect = blob_side_effect
+    dest_blob.rewrite.side_effect = [("token", 1, 2), (None, 2, 2)]
+    mock_bucket.blob.return_value = dest_blob
     
     # Call method
     result = await storage_service.move_file(source_blob_name, dest_blob_name)
     
     # Verify success
     assert result is True
+    assert dest_blob.rewrite.call_count == 2
+    assert dest_blob.rewrite.call_args.kwargs["token"] == "token"
+    mock_bucket.copy_blob.assert_not_called()
+    source_blob.delete.assert_called_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_video_small_file_uses_single_stream(storage_service, mock_bucket):
+    """Test small videos are uploaded with a single upload_from_file call"""
+    storage_service.config.parallel_chunk_size = 1024
+    blob = Mock()
+    mock_bucket.blob.return_value = blob
+    
+    with patch('app.services.storage_service.upload_chunks_concurrently') as mock_chunks:
+        result = await storage_service.upload_video(
+            io.BytesIO(b"x" * 100), "swing.mp4", 1, 2, content_type="video/mp4"
+        )
+    
+    assert result["success"] is True
+    assert result["file_size"] == 100
+    assert result["upload_result"]["parallel"] is False
+    blob.upload_from_file.assert_called_once()
+    mock_chunks.assert_not_called()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_upload_video_large_file_uploads_chunks_concurrently(storage_service, mock_bucket):
+    """Test videos above the chunk size are uploaded with the transfer manager"""
+    storage_service.config.parallel_chunk_size = 16
+    storage_service.config.parallel_upload_workers = 4
+    blob = Mock()
+    mock_bucket.blob.return_value = blob
+    spooled = []
+    
+    def read_spooled_file(filename, *args, **kwargs):
+        with open(filename, "rb") as f:
+            spooled.append(f.read())
+    
+    # autospec checks the call against the installed transfer manager's signature
+    with patch('app.services.storage_service.upload_chunks_concurrently', autospec=True,
+               side_effect=read_spooled_file) as mock_chunks:
+        result = await storage_service.upload_video(
+            io.BytesIO(b"x" * 100), "swing.mp4", 1, 2, content_type="video/mp4"
+        )
+    
+    assert result["success"] is True
+    assert result["upload_result"]["parallel"] is True
+    assert spooled == [b"x" * 100]
+    blob.upload_from_file.assert_not_called()
+    mock_chunks.assert_called_once()
+    assert mock_chunks.call_args.args[1] is blob
+    assert mock_chunks.call_args.kwargs["chunk_size"] == 16
+    assert mock_chunks.call_args.kwargs["max_workers"] == 4
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cleanup_temp_files_deletes_old_blobs_in_batches(storage_service, mock_bucket):
+    """Test old temp files are deleted in batches and recent ones are kept"""
+    mock_bucket.client = MagicMock()
+    old_time = datetime.utcnow() - timedelta(days=30)
+    new_time = datetime.utcnow()
+    old_blobs = [Mock(time_created=old_time) for _ in range(5)]
+    new_blob = Mock(time_created=new_time)
+    mock_bucket.client.list_blobs.return_value.pages = iter([old_blobs[:3], old_blobs[3:] + [new_blob]])
+    
+    with patch.object(storage_module, 'DELETE_BATCH_SIZE', 2):
+        deleted = await storage_service.cleanup_temp_files(days_old=7)
+    
+    assert deleted == 5
+    assert mock_bucket.client.batch.call_count == 3
+    for blob in old_blobs:
+        blob.delete.assert_called_once()
+    new_blob.delete.assert_not_called()
+    
+    list_kwargs = mock_bucket.client.list_blobs.call_args.kwargs
+    assert list_kwargs["fields"] == "items(name,timeCreated),nextPageToken"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_generate_signed_url_reuses_cached_url(storage_service, mock_bucket):
+    """Test repeated signed URL requests for the same blob sign only once"""
+    blob = Mock()
+    blob.generate_signed_url.return_value = "https://signed.example/video.mp4"
+    mock_bucket.blob.return_value = blob
+    
+    first = await storage_service.generate_signed_url("videos/video.mp4", expiration_hours=24)
+    second = await storage_service.generate_signed_url("videos/video.mp4", expiration_hours=24)
+    
+    assert first == second == "https://signed.example/video.mp4"
+    blob.generate_signed_url.assert_called_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_generate_signed_url_fractional_and_invalid_expiration(storage_service, mock_bucket):
+    """Test sub-hour expirations still sign and non-positive ones are rejected"""
+    blob = Mock()
+    blob.generate_signed_url.return_value = "https://signed.example/video.mp4"
+    mock_bucket.blob.return_value = blob
+    
+    assert await storage_service.generate_signed_url("videos/video.mp4", expiration_hours=0.0001) \
+        == "https://signed.example/video.mp4"
+    
+    for expiration_hours in (0, -1):
+        with pytest.raises(ValueError):
+            await storage_service.generate_signed_url("videos/video.mp4", expiration_hours=expiration_hours)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_download_bytes_large_file_uses_ranged_chunks(storage_service, mock_bucket):
+    """Test large blobs are downloaded as parallel byte ranges and reassembled"""
+    content = bytes(range(20))
+    storage_service.config.parallel_download_threshold = 10
+    storage_service.config.parallel_chunk_size = 8
+    storage_service.config.parallel_download_workers = 2
+    
+    blob = Mock()
+    blob.size = len(content)
+    blob.generation = 7
+    blob.download_as_bytes.side_effect = lambda start, end, **kwargs: content[start:end + 1]
+    mock_bucket.get_blob.return_value = blob
+    
+    result = await storage_service.download_bytes("processing/video.mp4")
+    
+    assert result == content
+    assert blob.download_as_bytes.call_count == 3
+    for call in blob.download_as_bytes.call_args_list:
+        assert call.kwargs["if_generation_match"] == 7
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_download_bytes_small_file_uses_single_request(storage_service, mock_bucket):
+    """Test small blobs are downloaded with a single request"""
+    storage_service.config.parallel_download_threshold = 1024
+    
+    blob = Mock()
+    blob.size = 5
+    blob.download_as_bytes.return_value = b"video"
+    mock_bucket.get_blob.return_value = blob
     
-    # Verify metadata patch not called
-    dest_blob.patch.assert_not_called()
+    result = await storage_service.download_bytes("processing/video.mp4")
     
-    # Verify other operations
-    source_blob.delete.assert_called_once()
\ No newline at end of file
+    assert result == b"video"
+    blob.download_as_bytes.assert_called_once_with()
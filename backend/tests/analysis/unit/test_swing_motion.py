@@ -0,0 +1,114 @@
+"""
+Unit tests for the swing detection motion check that skips LLM calls on idle frames.
+"""
+
+import pytest
+import base64
+from io import BytesIO
+from unittest.mock import Mock, AsyncMock, patch
+from PIL import Image
+import sys
+import os
+
+# Add backend to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, backend_dir)
+
+from app.core.interfaces import VisionModel, PromptLoader, ConfigProvider
+from app.api.swing_detection_ws import SwingDetectionSession, frame_dhash
+
+
+def _encode_frame(shade_left: int, shade_right: int) -> bytes:
+    """A 32x32 JPEG split into two flat halves"""
+    image = Image.new("L", (32, 32), shade_left)
+    image.paste(shade_right, (16, 0, 32, 32))
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+STILL = base64.b64encode(_encode_frame(40, 200)).decode()
+MOVED = base64.b64encode(_encode_frame(200, 40)).decode()
+
+
+@pytest.fixture
+def session():
+    """Session wired to a recording vision model and a plain dict config"""
+    vision_model = Mock()
+    vision_model.analyze_images = AsyncMock(return_value={"swing_detected": False, "confidence": 0.1})
+    config = {"MOTION_HASH_THRESHOLD": 3}
+    dependencies = {
+        VisionModel: vision_model,
+        PromptLoader: Mock(),
+        ConfigProvider: config,
+    }
+    with patch('app.api.swing_detection_ws.container') as mock_container:
+        mock_container.get.side_effect = dependencies.__getitem__
+        return SwingDetectionSession(websocket=Mock())
+
+
+@pytest.mark.unit
+def test_frame_dhash_identical_frames_match():
+    """Test the same frame hashes the same and a changed frame does not"""
+    assert frame_dhash(_encode_frame(40, 200)) == frame_dhash(_encode_frame(40, 200))
+    assert frame_dhash(_encode_frame(40, 200)) != frame_dhash(_encode_frame(200, 40))
+
+
+@pytest.mark.unit
+def test_frame_dhash_undecodable_frame():
+    """Test bytes that aren't an image hash to None"""
+    assert frame_dhash(b"not an image") is None
+
+
+@pytest.mark.unit
+def test_is_motionless_identical_frames(session):
+    """Test a run of identical frames counts as motionless"""
+    frames = [{"timestamp": float(i), "image": STILL} for i in range(4)]
+
+    assert session.is_motionless(frames) is True
+
+
+@pytest.mark.unit
+def test_is_motionless_threshold_zero_disables_check(session):
+    """Test MOTION_HASH_THRESHOLD=0 never reports frames as motionless"""
+    session.config["MOTION_HASH_THRESHOLD"] = 0
+    frames = [{"timestamp": float(i), "image": STILL} for i in range(4)]
+
+    assert session.is_motionless(frames) is False
+
+
+@pytest.mark.unit
+def test_is_motionless_undecodable_frame(session):
+    """Test a frame that can't be decoded never triggers the skip"""
+    frames = [
+        {"timestamp": 0.0, "image": STILL},
+        {"timestamp": 1.0, "image": base64.b64encode(b"garbage").decode()},
+        {"timestamp": 2.0, "image": STILL},
+    ]
+
+    assert session.is_motionless(frames) is False
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_idle_frames_after_motion_skip_llm(session):
+    """Test earlier motion in the buffer doesn't force an LLM call for later idle frames"""
+    for timestamp, image in ((0.0, MOVED), (0.5, STILL), (1.0, STILL)):
+        session.add_image(timestamp, image)
+
+    first = await session.analyze_for_swing()
+    assert "skipped" not in first
+    assert session.vision_model.analyze_images.await_count == 1
+
+    for timestamp in (1.5, 2.0, 2.5):
+        session.add_image(timestamp, STILL)
+
+    second = await session.analyze_for_swing()
+    assert second["skipped"] is True
+    assert session.vision_model.analyze_images.await_count == 1
+
+    session.add_image(3.0, MOVED)
+
+    third = await session.analyze_for_swing()
+    assert "skipped" not in third
+    assert session.vision_model.analyze_images.await_count == 2
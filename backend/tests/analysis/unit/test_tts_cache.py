@@ -0,0 +1,91 @@
+"""
+Unit tests for the TTS endpoints' on-disk audio cache.
+"""
+
+import pytest
+import os
+from unittest.mock import Mock, AsyncMock, patch
+import sys
+
+# Add backend to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, backend_dir)
+
+from app.api import tts
+from app.api.tts import TTSRequest
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the TTS cache at a fresh temp directory"""
+    monkeypatch.setattr(tts, "TTS_CACHE_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def openai_client():
+    """OpenAI client whose speech calls return fixed audio bytes"""
+    client = Mock()
+    client.audio.speech.create = AsyncMock(return_value=Mock(content=b"mp3 audio"))
+    with patch.object(tts, "client", client):
+        yield client
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_generate_tts_cache_miss_then_hit(cache_dir, openai_client):
+    """Test the first request calls OpenAI and an identical one is served from disk"""
+    request = TTSRequest(text="Keep your head down")
+    
+    first = await tts.generate_tts(request)
+    second = await tts.generate_tts(request)
+    
+    assert first.headers["X-TTS-Cache"] == "miss"
+    assert second.headers["X-TTS-Cache"] == "hit"
+    assert first.body == second.body == b"mp3 audio"
+    openai_client.audio.speech.create.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_generate_tts_cache_key_covers_settings(cache_dir, openai_client):
+    """Test requests differing only in voice don't share a cache entry"""
+    await tts.generate_tts(TTSRequest(text="Nice swing", voice="alloy"))
+    response = await tts.generate_tts(TTSRequest(text="Nice swing", voice="nova"))
+    
+    assert response.headers["X-TTS-Cache"] == "miss"
+    assert openai_client.audio.speech.create.await_count == 2
+
+
+@pytest.mark.unit
+def test_write_cached_audio_evicts_least_recently_used(cache_dir, monkeypatch):
+    """Test writes past TTS_CACHE_MAX_BYTES drop the least recently used files first"""
+    monkeypatch.setattr(tts, "TTS_CACHE_MAX_BYTES", 25)
+    paths = [tts._cache_path("tts-1", "onyx", 1.2, "mp3", text) for text in ("a", "b", "c")]
+    
+    tts._write_cached_audio(paths[0], b"x" * 10)
+    tts._write_cached_audio(paths[1], b"x" * 10)
+    os.utime(paths[0], (1000, 1000))
+    os.utime(paths[1], (2000, 2000))
+    
+    # Reading "a" makes it the most recently used, so "b" is evicted instead
+    assert tts._read_cached_audio(paths[0]) == b"x" * 10
+    tts._write_cached_audio(paths[2], b"x" * 10)
+    
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert paths[2].exists()
+
+
+@pytest.mark.unit
+def test_write_cached_audio_leaves_in_flight_temp_files(cache_dir, monkeypatch):
+    """Test eviction never removes another writer's temp file"""
+    monkeypatch.setattr(tts, "TTS_CACHE_MAX_BYTES", 5)
+    in_flight = cache_dir / "other-writer.tmp"
+    in_flight.write_bytes(b"y" * 100)
+    os.utime(in_flight, (1000, 1000))
+    
+    tts._write_cached_audio(tts._cache_path("tts-1", "onyx", 1.2, "mp3", "a"), b"x" * 4)
+    
+    assert in_flight.exists()
+    assert [p.name for p in cache_dir.iterdir() if p.suffix == ".tmp"] == ["other-writer.tmp"]
@@ -0,0 +1,109 @@
+"""
+Unit tests for BatchingVisionModel.
+"""
+
+import pytest
+import asyncio
+import os
+
+# Add backend to path
+import sys
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, backend_dir)
+
+from app.core.interfaces import VisionModel
+from app.core.providers.vision_batching import BatchingVisionModel
+
+
+class RecordingVisionModel(VisionModel):
+    """Vision model that echoes its inputs and records batch sizes"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    async def analyze_images(self, images, prompt):
+        return {"frames": len(images), "prompt": prompt}
+
+    async def analyze_image_batches(self, requests):
+        self.batch_sizes.append(len(requests))
+        return [await self.analyze_images(request.images, request.prompt) for request in requests]
+
+    def get_model_info(self):
+        return {"provider": "recording"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call():
+    """Requests queued together are sent as one batch"""
+    inner = RecordingVisionModel()
+    model = BatchingVisionModel(inner, max_batch_size=4)
+
+    results = await asyncio.gather(*(
+        model.analyze_images(["frame"] * n, "prompt") for n in (1, 2, 3)
+    ))
+
+    assert inner.batch_sizes == [3]
+    assert [r["frames"] for r in results] == [1, 2, 3]
+    await model.aclose()
+
+
+@pytest.mark.asyncio
+async def test_requests_accumulate_while_provider_busy():
+    """A lone request is sent immediately; later ones join the next call"""
+    inner = RecordingVisionModel()
+    release = asyncio.Event()
+    analyze_image_batches = inner.analyze_image_batches
+
+    async def slow_batches(requests):
+        await release.wait()
+        return await analyze_image_batches(requests)
+
+    inner.analyze_image_batches = slow_batches
+    model = BatchingVisionModel(inner, max_batch_size=4, max_inflight_batches=1)
+
+    first = asyncio.create_task(model.analyze_images(["a"], "prompt"))
+    await asyncio.sleep(0.01)
+    rest = [asyncio.create_task(model.analyze_images(["b"], "prompt")) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    assert model.get_stats() == {"running": 1, "pending": 2, "inflight_batches": 1}
+
+    release.set()
+    await asyncio.gather(first, *rest)
+
+    assert inner.batch_sizes == [1, 2]
+    await model.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_size_and_keep_prompts():
+    """Batches respect max_batch_size and carry each request's own prompt"""
+    inner = RecordingVisionModel()
+    model = BatchingVisionModel(inner, max_batch_size=2)
+
+    results = await asyncio.gather(
+        model.analyze_images(["a"], "first"),
+        model.analyze_images(["b"], "second"),
+        model.analyze_images(["c"], "first"),
+    )
+
+    assert inner.batch_sizes == [2, 1]
+    assert [r["prompt"] for r in results] == ["first", "second", "first"]
+    await model.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_errors_propagate_to_callers():
+    """A failing batch call raises in every waiting caller"""
+    inner = RecordingVisionModel()
+
+    async def fail(requests):
+        raise RuntimeError("boom")
+
+    inner.analyze_image_batches = fail
+    model = BatchingVisionModel(inner, max_batch_size=4)
+
+    with pytest.raises(RuntimeError):
+        await model.analyze_images(["frame"], "prompt")
+    await model.aclose()
+
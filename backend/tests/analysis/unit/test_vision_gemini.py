@@ -0,0 +1,233 @@
+"""
+Unit tests for the Gemini provider's generate gate, retry policy and response cache.
+"""
+
+import pytest
+import asyncio
+import os
+from io import BytesIO
+from unittest.mock import AsyncMock, Mock, patch
+
+# Add backend to path
+import sys
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, backend_dir)
+
+from google.api_core import exceptions as gax
+from PIL import Image
+
+from app.core.interfaces import VisionRequest
+from app.core.providers import vision_gemini
+from app.core.providers.vision_gemini import GeminiVisionProvider, ResponseCache
+
+
+@pytest.fixture
+def gates(monkeypatch):
+    """Fresh single-slot gates so tests can observe who holds them"""
+    monkeypatch.setitem(vision_gemini._gates, "image", asyncio.Semaphore(1))
+    monkeypatch.setitem(vision_gemini._gates, "video", asyncio.Semaphore(1))
+    return vision_gemini._gates
+
+
+class ScriptedModel:
+    """Model whose generate calls raise or return the scripted outcomes in order"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def generate_content_async(self, parts, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.mark.asyncio
+async def test_video_generate_does_not_hold_image_slots(gates):
+    """Long video analyses run behind their own gate, leaving frame calls unblocked"""
+    release = asyncio.Event()
+
+    class SlowVideoModel:
+        async def generate_content_async(self, parts, **kwargs):
+            if parts[0] == "video":
+                await release.wait()
+            return parts[0]
+
+    model = SlowVideoModel()
+    video_call = asyncio.create_task(vision_gemini._generate(model, ["video"], gate="video"))
+    await asyncio.sleep(0)
+
+    assert vision_gemini.get_gate_stats()["video"]["in_flight"] == 1
+    assert await asyncio.wait_for(vision_gemini._generate(model, ["frame"]), timeout=1) == "frame"
+
+    release.set()
+    assert await video_call == "video"
+
+
+@pytest.mark.asyncio
+async def test_generate_retries_transient_errors(gates):
+    """Transient upstream errors are retried until a call succeeds"""
+    model = ScriptedModel(gax.ServiceUnavailable("busy"), gax.ResourceExhausted("quota"), "ok")
+
+    with patch.object(vision_gemini.asyncio, "sleep", new=AsyncMock()) as sleep:
+        assert await vision_gemini._generate(model, ["frame"]) == "ok"
+
+    assert model.calls == 3
+    assert sleep.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_gives_up_after_max_retries(gates):
+    """The last transient error is raised once the attempts are used up"""
+    model = ScriptedModel(*(gax.ServiceUnavailable("busy") for _ in range(vision_gemini.GENERATE_MAX_RETRIES)))
+
+    with patch.object(vision_gemini.asyncio, "sleep", new=AsyncMock()):
+        with pytest.raises(gax.ServiceUnavailable):
+            await vision_gemini._generate(model, ["frame"])
+
+    assert model.calls == vision_gemini.GENERATE_MAX_RETRIES
+
+
+@pytest.mark.asyncio
+async def test_generate_does_not_retry_permanent_errors(gates):
+    """Non-transient errors such as a bad API key fail on the first attempt"""
+    model = ScriptedModel(gax.PermissionDenied("API key invalid"), "ok")
+
+    with patch.object(vision_gemini.asyncio, "sleep", new=AsyncMock()) as sleep:
+        with pytest.raises(gax.PermissionDenied):
+            await vision_gemini._generate(model, ["frame"])
+
+    assert model.calls == 1
+    sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_generate_single_attempt_leaves_retries_to_caller(gates):
+    """retries=1 surfaces the first transient error without an inner retry"""
+    model = ScriptedModel(gax.ServiceUnavailable("busy"), "ok")
+
+    with patch.object(vision_gemini.asyncio, "sleep", new=AsyncMock()) as sleep:
+        with pytest.raises(gax.ServiceUnavailable):
+            await vision_gemini._generate(model, ["video"], gate="video", retries=1)
+
+    assert model.calls == 1
+    sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_generate_releases_gate_during_backoff(gates):
+    """A retrying call gives its slot back while it sleeps"""
+    model = ScriptedModel(gax.ServiceUnavailable("busy"), "ok")
+    held_during_backoff = []
+
+    async def record_backoff(delay):
+        held_during_backoff.append(
+            (gates["image"].locked(), vision_gemini.get_gate_stats()["image"]["in_flight"])
+        )
+
+    with patch.object(vision_gemini.asyncio, "sleep", new=record_backoff):
+        assert await vision_gemini._generate(model, ["frame"]) == "ok"
+
+    assert held_during_backoff == [(False, 0)]
+    assert not gates["image"].locked()
+
+
+def _png(shade: int) -> bytes:
+    """A tiny encoded frame"""
+    buffer = BytesIO()
+    Image.new("L", (8, 8), shade).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _cache_key(name: str) -> tuple:
+    return ResponseCache.key("model", "prompt", [{"data": name.encode()}])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the response cache"""
+    now = [1000.0]
+    monkeypatch.setattr(vision_gemini.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_response_cache_entries_expire(clock):
+    """Entries are served until their TTL passes, then dropped"""
+    cache = ResponseCache(maxsize=4, ttl=10)
+    cache.put(_cache_key("a"), {"swing_detected": True})
+
+    clock[0] += 9
+    assert cache.get(_cache_key("a")) == {"swing_detected": True}
+
+    clock[0] += 1
+    assert cache.get(_cache_key("a")) is None
+    assert len(cache) == 0
+
+
+def test_response_cache_evicts_oldest_past_maxsize(clock):
+    """Writing past maxsize drops the oldest entries first"""
+    cache = ResponseCache(maxsize=2, ttl=60)
+    for name in ("a", "b", "c"):
+        cache.put(_cache_key(name), {"name": name})
+
+    assert len(cache) == 2
+    assert cache.get(_cache_key("a")) is None
+    assert cache.get(_cache_key("b")) == {"name": "b"}
+    assert cache.get(_cache_key("c")) == {"name": "c"}
+
+
+def test_response_cache_returns_copies(clock):
+    """Callers mutating a result can't change what is cached"""
+    cache = ResponseCache(maxsize=2, ttl=60)
+    stored = {"swing_detected": True, "confidence": 0.9}
+    cache.put(_cache_key("a"), stored)
+    stored["confidence"] = 0.0
+
+    first = cache.get(_cache_key("a"))
+    first["confidence"] = 0.1
+
+    assert cache.get(_cache_key("a")) == {"swing_detected": True, "confidence": 0.9}
+
+
+def test_response_cache_skips_errors_and_raw_responses(clock):
+    """Failed and unparsed replies are not cached so they get retried"""
+    cache = ResponseCache(maxsize=4, ttl=60)
+    cache.put(_cache_key("a"), {"swing_detected": False, "error": "API timeout"})
+    cache.put(_cache_key("b"), {"raw_response": "not json"})
+
+    assert len(cache) == 0
+    assert cache.get(_cache_key("a")) is None
+
+
+@pytest.mark.asyncio
+async def test_analyze_image_batches_sends_only_cache_misses(monkeypatch):
+    """Sets with a cached answer are served from the cache; the rest share one call"""
+    monkeypatch.setattr(vision_gemini, "_response_cache", ResponseCache(maxsize=16, ttl=60))
+    monkeypatch.setattr(vision_gemini, "get_api_key", lambda: "test-key")
+    provider = GeminiVisionProvider()
+    requests = [VisionRequest(images=[_png(shade)], prompt="prompt") for shade in (10, 20, 30)]
+
+    cached = {"swing_detected": True, "confidence": 0.9}
+    image_parts = await vision_gemini._prepare_image_parts([requests[1].images])
+    vision_gemini._response_cache.put(ResponseCache.key(provider.model_name, "prompt", image_parts[0]), cached)
+
+    response = Mock()
+    response.text = '[{"swing_detected": false, "confidence": 0.1}, {"swing_detected": false, "confidence": 0.2}]'
+    with patch.object(vision_gemini, "_generate", new=AsyncMock(return_value=response)) as generate:
+        results = await provider.analyze_image_batches(requests)
+
+    assert results == [
+        {"swing_detected": False, "confidence": 0.1},
+        cached,
+        {"swing_detected": False, "confidence": 0.2},
+    ]
+    generate.assert_awaited_once()
+    parts = generate.call_args.args[1]
+    assert parts.count("Frame set 1:") == 1 and "Frame set 3:" not in parts
+
+    # The answers from the batch are cached, so a repeat needs no call at all
+    with patch.object(vision_gemini, "_generate", new=AsyncMock()) as generate:
+        assert await provider.analyze_image_batches(requests) == results
+    generate.assert_not_awaited()